@@ -0,0 +1,4 @@
+"""FL 실로 데이터 준비 도구"""
+from .partitioner import partition, load_spec
+
+__all__ = ["partition", "load_spec"]
@@ -0,0 +1,3 @@
+from .partitioner import main
+
+main()
@@ -0,0 +1,720 @@
+"""FL 실로별 데이터셋 분할기 (청크 스트리밍)
+
+test.ipynb처럼 원본 테이블을 pandas 프레임으로 통째로 올려 pd.merge/pivot_table로
+수평/수직 데이터를 만들면 RAM보다 큰 테이블은 처리할 수 없다. 이 모듈은 원본
+테이블(CSV/Parquet)을 청크 단위로 읽어 실로별 Parquet 샤드와 manifest를 만든다.
+
+- horizontal: 행을 실로에 나눈다. strategy=hash는 키 해시, range는 키 경계값으로 실로를
+  정하며, 같은 키(patient_id)의 행은 모든 테이블에서 같은 실로로 간다.
+- vertical: 열 그룹을 실로에 나눈다. 모든 실로가 기준 테이블(base)의 키를 같은 순서로
+  갖고 각자 맡은 열만 갖는다. 키 하나에 여러 행이 있는 테이블(처방 등)은 pivot 또는
+  aggfunc으로 키당 한 행으로 만든다 (노트북의 pivot_table + merge how="left").
+
+처리 순서:
+1. 스캔 (테이블별 프로세스): 청크를 읽어 키 해시로 버킷을 정하고 버킷별 Arrow IPC
+   파일에 이어 쓴다.
+2. 버킷 처리 (버킷별 프로세스): 같은 키는 모든 테이블에서 같은 버킷에 있으므로 조인과
+   피벗이 버킷 하나 안에서 끝난다. 버킷을 실로별 Parquet 샤드로 쓴다.
+
+메모리 예산은 동시에 실행하는 프로세스 수로 나누어 프로세스별 청크 크기와 버킷 수를
+정한다. horizontal은 버킷도 청크 단위로 읽으므로 키가 한쪽으로 몰려도 예산을 넘지
+않고, vertical은 버킷 하나를 통째로 올리므로 버킷 수를 늘려 예산에 맞춘다.
+
+명세 예시 (YAML, 경로는 명세 파일 기준 상대 경로):
+
+    output: out/silos
+    key: patient_id
+    tables:
+      patients: data/patients.csv
+      medication: data/medication.parquet
+    mode: horizontal
+    silos: [silo-1, silo-2, silo-3]
+    strategy: hash                # range이면 boundaries: [P3000, P6000] (실로 수 - 1개)
+
+키 열은 모든 테이블에서 같은 타입(정수 또는 문자열)이어야 한다. 정수 키의 range 경계는
+숫자로, 문자열 키는 사전순으로 비교하므로 문자열 키는 자릿수를 맞춰야 한다 (P03000).
+
+    mode: vertical
+    base: patients                # 모든 실로가 갖는 키 목록 (left join 기준)
+    groups:
+      - {silo: silo-1, table: patients, columns: [gender, age]}
+      - {silo: silo-2, table: medication,
+         pivot: {columns: drug_name, values: dosage, aggfunc: sum, fill_value: 0}}
+
+출력:
+    {output}/manifest.json              전체 요약 (원본, 버킷 수, 실로별 샤드)
+    {output}/{silo}/manifest.json       실로 디렉터리만 복사해도 읽을 수 있는 실로별 목록
+    {output}/{silo}/{table}/part-NNNNN.parquet   (horizontal)
+    {output}/{silo}/part-NNNNN.parquet           (vertical, 모든 실로에서 같은 번호의
+                                                  파일은 같은 키를 같은 순서로 갖는다)
+
+vertical의 part 파일은 모두 실로 manifest의 schema로 쓰므로 이어 붙여도 열 타입이 같다.
+"""
+import json
+import math
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import yaml
+
+DEFAULT_MEMORY_BUDGET = 1 << 30  # 전체 메모리 예산 (1GiB)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# 버킷 하나를 조인/피벗할 때 원본 크기 대비 필요한 메모리 배율 추정치 (vertical 버킷 수 계산용)
+WORKING_SET_FACTOR = 4
+MAX_BUCKETS = 512  # 스캔 프로세스가 테이블마다 여는 버킷 파일 수 상한
+MAX_PIVOT_VALUES = 10000  # pivot 열로 만들 수 있는 서로 다른 값 수 상한
+MIN_CHUNK_BYTES = 1 << 20
+COMPRESSION = "zstd"
+SPILL_DIR = "_spill"
+
+
+def parse_size(value) -> int:
+    """ "512MB", "2GiB", 1048576 -> 바이트 수"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    m = re.fullmatch(r"\s*([\d.]+)\s*([kmgt]?)(i?b)?\s*", str(value), re.IGNORECASE)
+    if not m:
+        raise ValueError(f"잘못된 크기 형식입니다: {value}")
+    return int(float(m.group(1)) * 1024 ** "bkmgt".index((m.group(2) or "b").lower()))
+
+
+# ---------------------------------------------------------------------------
+# 명세 확인
+# ---------------------------------------------------------------------------
+
+def load_spec(path) -> dict:
+    """YAML/JSON 명세 파일 로드 (tables/output 경로는 명세 파일 기준으로 변환)"""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        spec = yaml.safe_load(f) or {}
+    base_dir = path.resolve().parent
+    spec["tables"] = {name: str(base_dir / p) for name, p in (spec.get("tables") or {}).items()}
+    if spec.get("output"):
+        spec["output"] = str(base_dir / spec["output"])
+    return spec
+
+
+def _validate(spec: dict) -> dict:
+    """명세 확인 및 기본값 채우기 (잘못되면 ValueError)"""
+    spec = dict(spec)
+    for field in ("output", "key", "tables", "mode"):
+        if not spec.get(field):
+            raise ValueError(f"명세에 {field}가 필요합니다")
+    for name, path in spec["tables"].items():
+        if not Path(path).is_file():
+            raise ValueError(f"{name} 테이블 파일이 없습니다: {path}")
+        if Path(path).suffix.lower() not in (".csv", ".parquet", ".pq"):
+            raise ValueError(f"{name}: CSV 또는 Parquet 파일만 지원합니다")
+    spec["key_type"] = _common_key_type(spec["tables"], spec["key"])
+
+    if spec["mode"] == "horizontal":
+        silos = spec.get("silos") or []
+        if len(silos) < 1 or len(set(silos)) != len(silos):
+            raise ValueError("horizontal은 서로 다른 실로 이름 목록(silos)이 필요합니다")
+        spec.setdefault("strategy", "hash")
+        if spec["strategy"] == "range":
+            boundaries = [_coerce_boundary(b, spec["key_type"]) for b in spec.get("boundaries") or []]
+            if len(boundaries) != len(silos) - 1 or boundaries != sorted(boundaries):
+                raise ValueError("range는 정렬된 경계값(boundaries)이 실로 수 - 1개 필요합니다")
+            spec["boundaries"] = boundaries
+        elif spec["strategy"] != "hash":
+            raise ValueError("strategy는 hash 또는 range여야 합니다")
+    elif spec["mode"] == "vertical":
+        base = spec.get("base")
+        if base not in spec["tables"]:
+            raise ValueError("vertical은 tables 중 하나를 base로 지정해야 합니다")
+        groups = spec.get("groups") or []
+        if not groups:
+            raise ValueError("vertical은 실로별 열 그룹(groups)이 필요합니다")
+        for group in groups:
+            if not group.get("silo") or group.get("table") not in spec["tables"]:
+                raise ValueError(f"열 그룹에 silo와 tables에 있는 table이 필요합니다: {group}")
+            if not group.get("columns") and not group.get("pivot"):
+                raise ValueError(f"열 그룹에 columns 또는 pivot이 필요합니다: {group}")
+            pivot = group.get("pivot")
+            if pivot and not (pivot.get("columns") and pivot.get("values")):
+                raise ValueError(f"pivot에는 columns와 values가 필요합니다: {group}")
+        spec["silos"] = list(dict.fromkeys(g["silo"] for g in groups))
+    else:
+        raise ValueError("mode는 horizontal 또는 vertical이어야 합니다")
+    return spec
+
+
+def _common_key_type(tables: dict, key: str):
+    """
+    모든 테이블이 같이 쓸 키 열 타입 (정수끼리는 int64, 문자열끼리는 string)
+
+    테이블마다 키 타입이 다르면 해시/조인에서 같은 키가 만나지 못하므로 ValueError를 낸다.
+    """
+    types = {name: _source_key_type(path, key) for name, path in tables.items()}
+    if all(pa.types.is_integer(t) for t in types.values()):
+        return pa.int64()
+    if all(pa.types.is_string(t) or pa.types.is_large_string(t) for t in types.values()):
+        return pa.string()
+    raise ValueError(
+        f"키 열 {key}의 타입이 테이블마다 다르거나 지원하지 않는 타입입니다: "
+        + ", ".join(f"{name}={t}" for name, t in types.items())
+        + " (정수 또는 문자열로 통일하세요)"
+    )
+
+
+def _coerce_boundary(value, key_type):
+    """range 경계값을 키 타입으로 변환 (정수 키는 숫자로, 문자열 키는 사전순으로 비교한다)"""
+    if pa.types.is_integer(key_type):
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"정수 키의 경계값은 정수여야 합니다: {value!r}")
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"정수 키의 경계값은 정수여야 합니다: {value!r}") from None
+    if not isinstance(value, str):
+        raise ValueError(f"문자열 키의 경계값은 문자열이어야 합니다: {value!r} (따옴표로 감싸세요)")
+    return value
+
+
+# ---------------------------------------------------------------------------
+# 읽기/해시
+# ---------------------------------------------------------------------------
+
+def _is_parquet(path: str) -> bool:
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+def _estimate_bytes(path: str) -> int:
+    """메모리에 올렸을 때 크기 추정 (Parquet은 압축 전 크기, CSV는 파일 크기)"""
+    if _is_parquet(path):
+        metadata = pq.ParquetFile(path).metadata
+        return sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+    return os.path.getsize(path)
+
+
+def _source_schema(path: str):
+    """원본 테이블의 스키마 (CSV는 첫 블록으로 추론한 타입)"""
+    if _is_parquet(path):
+        return pq.read_schema(path)
+    return pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=MIN_CHUNK_BYTES)).schema
+
+
+def _source_key_type(path: str, key: str):
+    """원본 테이블의 키 열 타입"""
+    schema = _source_schema(path)
+    if key not in schema.names:
+        raise ValueError(f"{Path(path).name}에 키 열 {key}가 없습니다")
+    return schema.field(key).type
+
+
+def _iter_batches(path: str, key: str, key_type, chunk_bytes: int):
+    """원본 테이블을 약 chunk_bytes 크기의 RecordBatch로 읽는다 (키 열은 모든 테이블에서 key_type)"""
+    if _is_parquet(path):
+        source = pq.ParquetFile(path)
+        metadata = source.metadata
+        row_bytes = max(1, _estimate_bytes(path) // max(1, metadata.num_rows))
+        for batch in source.iter_batches(batch_size=max(1024, chunk_bytes // row_bytes)):
+            index = batch.schema.get_field_index(key)
+            if batch.schema.field(index).type != key_type:
+                batch = batch.set_column(index, pa.field(key, key_type), pc.cast(batch.column(index), key_type))
+            yield batch
+        return
+    # CSV는 첫 블록으로 타입을 정하므로 키 열 타입이 블록마다 달라지지 않게 고정한다
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=max(MIN_CHUNK_BYTES, chunk_bytes // 2)),
+        convert_options=pacsv.ConvertOptions(column_types={key: key_type}, strings_can_be_null=True),
+    )
+    yield from reader
+
+
+def _key_values(array) -> np.ndarray:
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _hash_keys(array) -> np.ndarray:
+    """키 -> uint64 해시 (프로세스/실행과 무관하게 같은 값)"""
+    return pd.util.hash_array(np.asarray(_key_values(array)))
+
+
+def _init_worker(threads: int):
+    # 프로세스마다 Arrow 스레드 풀을 나눠 써서 CPU를 과하게 점유하지 않게 한다
+    pa.set_cpu_count(threads)
+    pa.set_io_thread_count(threads)
+
+
+def _peak_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ---------------------------------------------------------------------------
+# 1단계: 스캔 -> 버킷 파일
+# ---------------------------------------------------------------------------
+
+def _bucket_path(spill_dir: str, table: str, bucket: int) -> Path:
+    return Path(spill_dir) / table / f"bucket-{bucket:05d}.arrow"
+
+
+def _scan_table(table: str, path: str, key: str, key_type, buckets: int, spill_dir: str, chunk_bytes: int,
+                distinct_columns: list) -> dict:
+    """테이블 하나를 청크 단위로 읽어 키 해시 % buckets 버킷 파일에 나눠 쓴다"""
+    (Path(spill_dir) / table).mkdir(parents=True, exist_ok=True)
+    writers = {}
+    bucket_rows = [0] * buckets
+    distinct = {c: set() for c in distinct_columns}
+    rows = null_keys = 0
+    schema = None
+    try:
+        for batch in _iter_batches(path, key, key_type, chunk_bytes):
+            if schema is None:
+                if key not in batch.schema.names:
+                    raise ValueError(f"{table}에 키 열 {key}가 없습니다")
+                schema = batch.schema
+            rows += batch.num_rows
+            keys = batch.column(key)
+            if keys.null_count:
+                null_keys += keys.null_count
+                batch = batch.filter(pc.is_valid(keys))
+                keys = batch.column(key)
+            if batch.num_rows == 0:
+                continue
+            for column, values in distinct.items():
+                values.update(pc.unique(batch.column(column)).to_pylist())
+                if len(values) > MAX_PIVOT_VALUES:
+                    raise ValueError(f"{table}.{column}의 서로 다른 값이 {MAX_PIVOT_VALUES}개를 넘어 pivot할 수 없습니다")
+
+            # 버킷 순서로 한 번 재배열한 뒤 버킷별 구간을 잘라(복사 없이) 쓴다
+            ids = (_hash_keys(keys) % np.uint64(buckets)).astype(np.int64)
+            order = np.argsort(ids, kind="stable")
+            ordered = batch.take(pa.array(order))
+            counts = np.bincount(ids, minlength=buckets)
+            start = 0
+            for bucket in np.flatnonzero(counts):
+                count = int(counts[bucket])
+                writer = writers.get(bucket)
+                if writer is None:
+                    sink = pa.OSFile(str(_bucket_path(spill_dir, table, bucket)), "wb")
+                    writer = writers[bucket] = (sink, pa.ipc.new_stream(sink, schema))
+                writer[1].write_batch(ordered.slice(start, count))
+                bucket_rows[bucket] += count
+                start += count
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        # 첫 블록으로 정한 키 타입과 맞지 않는 값이 뒤에 나온 경우 등
+        raise ValueError(f"{table} 읽기 실패: {e}") from None
+    finally:
+        for sink, writer in writers.values():
+            writer.close()
+            sink.close()
+    return {
+        "table": table,
+        "rows": rows,
+        "null_keys": null_keys,
+        "schema": schema,
+        "bucket_rows": bucket_rows,
+        "distinct": {c: sorted(v, key=str) for c, v in distinct.items()},
+        "peak_rss": _peak_rss(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# 2단계: 버킷 -> 실로별 샤드
+# ---------------------------------------------------------------------------
+
+class _ShardWriter:
+    """배치를 모아 row group 크기 단위로 Parquet에 쓴다 (메모리에는 row group 하나까지만 보관)"""
+
+    def __init__(self, path: Path, schema, row_group_bytes: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.row_group_bytes = row_group_bytes
+        self.rows = 0
+        self._buffer, self._buffered = [], 0
+        self._writer = pq.ParquetWriter(str(path), schema, compression=COMPRESSION)
+
+    def write(self, batch):
+        self._buffer.append(batch)
+        self._buffered += batch.nbytes
+        self.rows += batch.num_rows
+        if self._buffered >= self.row_group_bytes:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._writer.write_table(pa.Table.from_batches(self._buffer))
+            self._buffer, self._buffered = [], 0
+
+    def close(self) -> dict:
+        self._flush()
+        self._writer.close()
+        return {"rows": self.rows, "bytes": self.path.stat().st_size}
+
+
+def _read_bucket_batches(spill_dir: str, table: str, bucket: int):
+    path = _bucket_path(spill_dir, table, bucket)
+    if not path.exists():
+        return
+    with pa.memory_map(str(path)) as source:
+        yield from pa.ipc.open_stream(source)
+
+
+def _read_bucket(spill_dir: str, table: str, bucket: int, columns: list):
+    path = _bucket_path(spill_dir, table, bucket)
+    if not path.exists():
+        return None
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_stream(source).read_all().select(columns)
+
+
+def _part_name(bucket: int) -> str:
+    return f"part-{bucket:05d}.parquet"
+
+
+def _write_horizontal_bucket(bucket: int, spec: dict, spill_dir: str, output: str, row_group_bytes: int) -> list:
+    """버킷의 모든 테이블 행을 실로별 샤드로 나눠 쓴다 (청크 단위로 읽으므로 버킷 크기와 무관)"""
+    silos, key = spec["silos"], spec["key"]
+    boundaries = spec.get("boundaries") or []
+    shards = []
+    for table in spec["tables"]:
+        writers = {}
+        for batch in _read_bucket_batches(spill_dir, table, bucket):
+            if spec["strategy"] == "hash":
+                # 버킷 수가 실로 수의 배수이므로 버킷 하나는 통째로 한 실로에 속한다
+                writer_ids = np.full(batch.num_rows, bucket % len(silos))
+            else:
+                keys = _key_values(batch.column(key))
+                writer_ids = np.searchsorted(np.asarray(boundaries, dtype=keys.dtype), keys, side="right")
+            present = np.unique(writer_ids)
+            for silo_index in present:
+                part = batch if len(present) == 1 else batch.filter(pa.array(writer_ids == silo_index))
+                writer = writers.get(silo_index)
+                if writer is None:
+                    silo = silos[silo_index]
+                    writer = writers[silo_index] = _ShardWriter(
+                        Path(output) / silo / table / _part_name(bucket), batch.schema, row_group_bytes
+                    )
+                writer.write(part)
+        for silo_index, writer in writers.items():
+            silo = silos[silo_index]
+            shards.append({
+                "silo": silo, "table": table, "bucket": bucket,
+                "path": f"{table}/{_part_name(bucket)}", **writer.close(),
+            })
+    for shard in shards:
+        shard["peak_rss"] = _peak_rss()
+    return shards
+
+
+def _group_frame(group: dict, table, key: str, pivot_values: dict) -> pd.DataFrame:
+    """열 그룹 하나 -> 키를 인덱스로 하는 키당 한 행 프레임"""
+    frame = table.to_pandas()
+    pivot = group.get("pivot")
+    if pivot:
+        result = frame.pivot_table(
+            index=key, columns=pivot["columns"], values=pivot["values"],
+            aggfunc=pivot.get("aggfunc", "sum"), fill_value=pivot.get("fill_value", 0),
+        )
+        # 버킷마다 나오는 값이 다르므로 스캔 단계에서 모은 전체 값으로 열을 맞춘다
+        result = result.reindex(columns=pivot_values[group["table"]][pivot["columns"]])
+        result.columns = [f"{pivot.get('prefix', '')}{c}" for c in result.columns]
+        return result
+    columns = group["columns"]
+    if group.get("aggfunc"):
+        return frame.groupby(key)[columns].agg(group["aggfunc"])
+    if frame[key].duplicated().any():
+        raise ValueError(
+            f"{group['table']}에 같은 {key}의 행이 여러 개 있습니다 (pivot 또는 aggfunc을 지정하세요)"
+        )
+    return frame.set_index(key)[columns]
+
+
+def _group_columns(group: dict, key: str) -> list:
+    pivot = group.get("pivot")
+    if pivot:
+        return [key, pivot["columns"], pivot["values"]]
+    return [key] + list(group["columns"])
+
+
+def _group_source_schema(group: dict, source, key: str, key_type):
+    """열 그룹이 버킷에서 읽는 열의 스키마 (원본 스키마에서 필요한 열만)"""
+    fields = []
+    for column in _group_columns(group, key):
+        if column not in source.names:
+            raise ValueError(f"{group['table']}에 {column} 열이 없습니다")
+        fields.append(pa.field(key, key_type) if column == key else source.field(column))
+    return pa.schema(fields)
+
+
+def _vertical_schemas(spec: dict, sources: dict, pivot_values: dict) -> dict:
+    """
+    실로별 출력 스키마 (모든 part 파일을 이 스키마로 쓴다)
+
+    left join으로 생기는 빈 값 때문에 pandas 타입은 버킷마다 달라지므로(정수 -> float 등)
+    버킷 결과가 아니라 원본 스키마에 그룹 연산을 빈 테이블로 적용해 열 타입을 정한다.
+    """
+    key = spec["key"]
+    schemas = {}
+    for silo in spec["silos"]:
+        fields = [pa.field(key, spec["key_type"])]
+        for group in (g for g in spec["groups"] if g["silo"] == silo):
+            pivot = group.get("pivot")
+            if pivot:
+                fields += [pa.field(f"{pivot.get('prefix', '')}{c}", pa.float64())
+                           for c in pivot_values[group["table"]][pivot["columns"]]]
+                continue
+            source = _group_source_schema(group, sources[group["table"]], key, spec["key_type"])
+            empty = source.empty_table()
+            try:
+                part = _group_frame(group, empty, key, pivot_values)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{group['table']}에 aggfunc {group.get('aggfunc')}을 적용할 수 없습니다: {e}") from None
+            before = empty.to_pandas().dtypes
+            for column in part.columns:
+                fields.append(pa.field(column, _output_type(part[column].dtype, before[column],
+                                                            source.field(column).type)))
+        schemas[silo] = pa.schema(fields)
+    return schemas
+
+
+def _output_type(dtype, source_dtype, source_type):
+    """그룹 연산 결과 열의 Arrow 타입 (연산이 타입을 바꾸지 않았으면 원본 타입을 유지)"""
+    if dtype == source_dtype:
+        return source_type
+    try:
+        return pa.from_numpy_dtype(dtype)
+    except (TypeError, NotImplementedError, pa.ArrowNotImplementedError):
+        return source_type
+
+
+def _write_vertical_bucket(bucket: int, spec: dict, spill_dir: str, output: str, pivot_values: dict,
+                           sources: dict, schemas: dict) -> list:
+    """기준 테이블 키를 정렬해 모든 실로의 행 순서를 맞추고 실로별 열 그룹을 left join 하여 쓴다"""
+    key = spec["key"]
+    base = _read_bucket(spill_dir, spec["base"], bucket, [key])
+    if base is None or base.num_rows == 0:
+        return []
+    keys = pc.unique(base.column(key))
+    keys = pd.Index(keys.take(pc.sort_indices(keys)).to_pylist(), name=key)
+
+    shards = []
+    for silo in spec["silos"]:
+        frame = pd.DataFrame(index=keys)
+        for group in (g for g in spec["groups"] if g["silo"] == silo):
+            table = _read_bucket(spill_dir, group["table"], bucket, _group_columns(group, key))
+            if table is None:
+                table = _group_source_schema(group, sources[group["table"]], key, spec["key_type"]).empty_table()
+            part = _group_frame(group, table, key, pivot_values)
+            overlap = frame.columns.intersection(part.columns)
+            if len(overlap):
+                raise ValueError(f"{silo}의 열 이름이 겹칩니다: {list(overlap)} (pivot에 prefix를 지정하세요)")
+            frame = frame.join(part, how="left")
+            pivot = group.get("pivot")
+            if pivot:
+                # 처방이 없는 환자처럼 기준 키에만 있는 행도 피벗의 fill_value로 채운다
+                # 버킷마다 파일 스키마가 같도록 피벗 열은 항상 float64로 쓴다
+                frame[part.columns] = frame[part.columns].fillna(pivot.get("fill_value", 0)).astype("float64")
+        path = Path(output) / silo / _part_name(bucket)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        pq.write_table(table.cast(schemas[silo]), str(path), compression=COMPRESSION)
+        shards.append({
+            "silo": silo, "bucket": bucket, "path": _part_name(bucket),
+            "rows": len(frame), "bytes": path.stat().st_size, "peak_rss": _peak_rss(),
+        })
+    return shards
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+def _bucket_count(spec: dict, estimates: dict, per_worker: int, workers: int) -> int:
+    if spec["mode"] == "horizontal":
+        # 버킷은 병렬 처리 단위일 뿐이므로 작업자 수면 충분하다 (hash는 실로 수의 배수)
+        buckets = max(workers, 1)
+        if spec["strategy"] == "hash":
+            n = len(spec["silos"])
+            buckets = n * math.ceil(buckets / n)
+        return buckets
+    needed = math.ceil(sum(estimates.values()) * WORKING_SET_FACTOR / per_worker)
+    buckets = max(workers, needed, 1)
+    if buckets > MAX_BUCKETS:
+        print(f"경고: 메모리 예산에 맞추려면 버킷 {buckets}개가 필요하지만 {MAX_BUCKETS}개로 제한합니다")
+        buckets = MAX_BUCKETS
+    return buckets
+
+
+def _schema_fields(schema) -> list:
+    return [{"name": f.name, "type": str(f.type)} for f in schema] if schema is not None else []
+
+
+def _write_json(path: Path, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _prepare_output(output: Path, overwrite: bool):
+    if output.exists() and any(output.iterdir()):
+        if not overwrite:
+            raise ValueError(f"출력 디렉터리가 비어 있지 않습니다: {output} (overwrite로 덮어쓰기)")
+        shutil.rmtree(output)
+    output.mkdir(parents=True, exist_ok=True)
+
+
+def partition(spec: dict, memory_budget=DEFAULT_MEMORY_BUDGET, workers: int = DEFAULT_WORKERS,
+              overwrite: bool = False, keep_spill: bool = False) -> dict:
+    """
+    명세대로 원본 테이블을 실로별 샤드로 분할하고 전체 manifest 반환
+
+    memory_budget은 모든 작업 프로세스를 합친 예산이며 프로세스마다 memory_budget / workers를
+    쓴다. 작업 프로세스는 spawn으로 시작한다.
+    """
+    spec = _validate(spec)
+    memory_budget = parse_size(memory_budget)
+    workers = max(1, int(workers))
+    per_worker = memory_budget // workers
+    if per_worker < 4 * MIN_CHUNK_BYTES:
+        raise ValueError(f"작업 프로세스당 메모리 예산이 너무 작습니다 ({per_worker} bytes)")
+    chunk_bytes = per_worker // 4
+
+    output = Path(spec["output"])
+    _prepare_output(output, overwrite)
+    spill_dir = str(output / SPILL_DIR)
+    estimates = {name: _estimate_bytes(path) for name, path in spec["tables"].items()}
+    buckets = _bucket_count(spec, estimates, per_worker, workers)
+
+    distinct_columns = {name: [] for name in spec["tables"]}
+    for group in spec.get("groups") or []:
+        if group.get("pivot"):
+            distinct_columns[group["table"]].append(group["pivot"]["columns"])
+
+    started = time.perf_counter()
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(threads,)) as pool:
+        futures = [
+            pool.submit(_scan_table, name, path, spec["key"], spec["key_type"], buckets, spill_dir, chunk_bytes,
+                        distinct_columns[name])
+            for name, path in spec["tables"].items()
+        ]
+        scans = [f.result() for f in futures]
+        scanned = time.perf_counter()
+        pivot_values = {s["table"]: s["distinct"] for s in scans}
+
+        # 행이 있는 버킷만 큰 것부터 처리해 마지막에 큰 버킷 하나만 남는 일을 줄인다
+        sizes = [sum(s["bucket_rows"][b] for s in scans) for b in range(buckets)]
+        order = sorted((b for b in range(buckets) if sizes[b]), key=lambda b: -sizes[b])
+        if spec["mode"] == "horizontal":
+            write = partial(_write_horizontal_bucket, spec=spec, spill_dir=spill_dir, output=str(output),
+                            row_group_bytes=chunk_bytes)
+        else:
+            # 행이 없는 테이블은 스캔에서 스키마를 못 얻으므로 원본 파일에서 읽는다
+            sources = {s["table"]: s["schema"] or _source_schema(spec["tables"][s["table"]]) for s in scans}
+            vertical_schemas = _vertical_schemas(spec, sources, pivot_values)
+            write = partial(_write_vertical_bucket, spec=spec, spill_dir=spill_dir, output=str(output),
+                            pivot_values=pivot_values, sources=sources, schemas=vertical_schemas)
+        results = pool.map(write, order)
+        shards = sorted((s for result in results for s in result), key=lambda s: (s["silo"], s["bucket"]))
+    finished = time.perf_counter()
+    if not keep_spill:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    created_at = datetime.now(timezone.utc).isoformat()
+    layout = (
+        {"strategy": spec["strategy"], "boundaries": spec.get("boundaries")}
+        if spec["mode"] == "horizontal" else {"base": spec["base"], "groups": spec["groups"]}
+    )
+    silos = {}
+    for silo in spec["silos"]:
+        files = [{k: s[k] for k in ("path", "rows", "bytes", "bucket") + (("table",) if "table" in s else ())}
+                 for s in shards if s["silo"] == silo]
+        silo_manifest = {
+            "version": 1,
+            "created_at": created_at,
+            "silo": silo,
+            "mode": spec["mode"],
+            "key": spec["key"],
+            "key_type": str(spec["key_type"]),
+            **layout,
+            "rows": sum(f["rows"] for f in files),
+            "bytes": sum(f["bytes"] for f in files),
+            "files": files,
+        }
+        if spec["mode"] == "vertical":
+            # 모든 실로에서 files를 순서대로 이어 붙이면 행 순서(키)가 같다
+            silo_manifest["schema"] = _schema_fields(vertical_schemas[silo])
+        else:
+            silo_manifest["tables"] = {
+                s["table"]: {"schema": _schema_fields(s["schema"]),
+                             "rows": sum(f["rows"] for f in files if f.get("table") == s["table"])}
+                for s in scans
+            }
+        (output / silo).mkdir(parents=True, exist_ok=True)
+        _write_json(output / silo / "manifest.json", silo_manifest)
+        silos[silo] = {"rows": silo_manifest["rows"], "bytes": silo_manifest["bytes"], "files": len(files)}
+
+    manifest = {
+        "version": 1,
+        "created_at": created_at,
+        "mode": spec["mode"],
+        "key": spec["key"],
+        "key_type": str(spec["key_type"]),
+        **layout,
+        "sources": {
+            s["table"]: {
+                "path": spec["tables"][s["table"]], "rows": s["rows"], "null_keys": s["null_keys"],
+                "estimated_bytes": estimates[s["table"]], "schema": _schema_fields(s["schema"]),
+            }
+            for s in scans
+        },
+        "pivot_values": {t: v for t, v in pivot_values.items() if v},
+        "buckets": buckets,
+        "memory_budget": memory_budget,
+        "workers": workers,
+        "silos": silos,
+        "timing": {"scan_s": round(scanned - started, 3), "write_s": round(finished - scanned, 3)},
+        "peak_worker_rss": max([s["peak_rss"] for s in scans] + [s["peak_rss"] for s in shards]),
+    }
+    _write_json(output / "manifest.json", manifest)
+    return manifest
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FL 실로별 데이터셋 분할 (청크 스트리밍)")
+    parser.add_argument("spec", help="분할 명세 파일 (YAML/JSON)")
+    parser.add_argument("--memory-budget", default=DEFAULT_MEMORY_BUDGET, help="전체 메모리 예산 (예: 512MB)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="작업 프로세스 수")
+    parser.add_argument("--overwrite", action="store_true", help="출력 디렉터리가 있으면 지우고 다시 만든다")
+    parser.add_argument("--keep-spill", action="store_true", help="중간 버킷 파일을 남긴다 (디버깅용)")
+    parser.add_argument("--json", action="store_true", help="manifest를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = partition(
+            load_spec(args.spec), memory_budget=args.memory_budget, workers=args.workers,
+            overwrite=args.overwrite, keep_spill=args.keep_spill,
+        )
+    except ValueError as e:
+        parser.exit(1, f"오류: {e}\n")
+    if args.json:
+        print(json.dumps(manifest, ensure_ascii=False, indent=2))
+        return
+    print(f"{manifest['mode']} 분할 완료: 버킷 {manifest['buckets']}개, 작업자 {manifest['workers']}개, "
+          f"스캔 {manifest['timing']['scan_s']}s, 쓰기 {manifest['timing']['write_s']}s")
+    for name, source in manifest["sources"].items():
+        print(f"  원본 {name}: {source['rows']}행 (키 없음 {source['null_keys']}행)")
+    for silo, info in manifest["silos"].items():
+        print(f"  {silo}: {info['rows']}행, 파일 {info['files']}개, {info['bytes']} bytes")
+    print(f"  작업 프로세스 최대 RSS: {manifest['peak_worker_rss'] / (1 << 20):.1f} MiB")
@@ -1,4 +1,4 @@
 """API 라우터 모듈"""
-from . import nodes, containers
+from . import nodes, containers, stream, aio, metrics, topology, images, deployments, journal, profiling
 
-__all__ = ['nodes', 'containers']
+__all__ = ['nodes', 'containers', 'stream', 'aio', 'metrics', 'topology', 'images', 'deployments', 'journal', 'profiling']
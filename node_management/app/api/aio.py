@@ -0,0 +1,127 @@
+"""비동기 API 엔드포인트 (/api/aio)
+
+기존 동기 라우트와 같은 응답 형식을 유지하면서 Docker 호출을 이벤트 루프에서
+처리한다. 느린 데몬이 있어도 스레드풀 슬롯을 점유하지 않는다.
+"""
+import asyncio
+import httpx
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from models.schemas import ContainerAction
+from services import async_docker
+from services.docker_service import get_docker_hosts, invalidate_coalesced
+from config.settings import CLUSTER_LIST_TIMEOUT, STATUS_TOTAL_TIMEOUT
+
+router = APIRouter(prefix="/api/aio", tags=["aio"])
+
+
+async def _hosts() -> dict:
+    """
+    노드 목록 (설정을 다시 읽을 수 있으므로 이벤트 루프 밖에서 조회)
+
+    같은 요청에서 이어지는 get_docker_hosts 호출은 여기서 갱신한 목록을 그대로 쓴다.
+    """
+    return await run_in_threadpool(get_docker_hosts)
+
+
+async def _docker_call(awaitable):
+    """Docker 호출 오류를 동기 라우트와 같은 HTTP 오류로 변환 (차단된 노드는 503 그대로)"""
+    try:
+        return await awaitable
+    except async_docker.DockerAPIError as e:
+        raise HTTPException(status_code=e.status_code if e.status_code < 500 else 502, detail=e.message)
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"Docker 응답 시간 초과: {str(e) or type(e).__name__}")
+    except httpx.TransportError as e:
+        raise HTTPException(status_code=503, detail=f"Docker 연결 실패: {str(e) or type(e).__name__}")
+
+
+@router.get("/nodes/ping")
+async def ping_nodes():
+    """모든 노드를 동시에 ping (노드별/전체 제한 시간 적용)"""
+    node_ids = list(await _hosts())
+    tasks = [asyncio.create_task(async_docker.ping_node(n)) for n in node_ids]
+    done, pending = await asyncio.wait(tasks, timeout=STATUS_TOTAL_TIMEOUT) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    result = []
+    for node_id, task in zip(node_ids, tasks):
+        if task in done:
+            result.append({"id": node_id, **task.result()})
+        else:
+            result.append({
+                "id": node_id,
+                "status": "offline",
+                "rtt_ms": None,
+                "error": f"제한 시간 초과 ({STATUS_TOTAL_TIMEOUT}s)",
+            })
+    return result
+
+
+@router.post("/nodes/{node_id}/test")
+async def test_connection(node_id: str):
+    """서버 연결 테스트"""
+    if node_id not in await _hosts():
+        raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+    try:
+        client = async_docker.get_async_docker_client(node_id)
+        await client.ping()
+        version = await client.version()
+        return {
+            "ok": True,
+            "status": "online",
+            "version": version.get("Version", "unknown"),
+            "api_version": version.get("ApiVersion", "unknown")
+        }
+    except Exception as e:
+        return {
+            "ok": False,
+            "status": "offline",
+            "error": str(e)
+        }
+
+
+@router.get("/containers")
+async def list_containers(node_id: str, all: bool = True):
+    """특정 노드의 컨테이너 목록 조회"""
+    await _hosts()
+    return await _docker_call(async_docker.list_container_summaries(node_id, all=all))
+
+
+@router.get("/containers/all")
+async def list_all_containers(all: bool = True, timeout: float = CLUSTER_LIST_TIMEOUT):
+    """모든 노드의 컨테이너를 동시에 조회하여 병합"""
+    timeout = min(max(timeout, 0.1), CLUSTER_LIST_TIMEOUT)
+    await _hosts()
+    return await async_docker.list_cluster_containers(all=all, timeout=timeout)
+
+
+async def _container_action(action: ContainerAction, name: str):
+    await _hosts()
+    client = async_docker.get_async_docker_client(action.node_id)
+    await _docker_call(getattr(client, name)(action.container_id))
+    # 동기 라우트와 같이 직후 목록 조회가 작업 전 결과를 재사용하지 않도록 폐기
+    invalidate_coalesced(action.node_id)
+    return {"ok": True}
+
+
+@router.post("/containers/start")
+async def start_container(action: ContainerAction):
+    return await _container_action(action, "start")
+
+
+@router.post("/containers/stop")
+async def stop_container(action: ContainerAction):
+    return await _container_action(action, "stop")
+
+
+@router.post("/containers/restart")
+async def restart_container(action: ContainerAction):
+    return await _container_action(action, "restart")
+
+
+@router.get("/pool")
+def get_pool_stats():
+    """비동기 클라이언트 풀 통계"""
+    return async_docker.get_async_pool_stats()
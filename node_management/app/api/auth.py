@@ -0,0 +1,13 @@
+"""관리자 전용 API 인증 (X-Admin-Token 헤더)"""
+import secrets
+from typing import Optional
+from fastapi import Header, HTTPException
+from config.settings import ADMIN_TOKEN
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """FL_ADMIN_TOKEN과 같은 토큰을 보낸 요청만 허용 (토큰이 설정되지 않았으면 모두 거부)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="FL_ADMIN_TOKEN이 설정되지 않아 관리자 API가 비활성화되어 있습니다")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다")
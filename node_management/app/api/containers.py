@@ -1,43 +1,154 @@
 """컨테이너 관리 API 엔드포인트"""
-from fastapi import APIRouter
-from models.schemas import ContainerAction
-from services.docker_service import get_docker_client
+import asyncio
+import json
+from collections import Counter
+from contextlib import suppress
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from models.schemas import ContainerAction, BulkActionRequest, ExecRequest
+from services.docker_service import get_docker_client, invalidate_coalesced
+from services.container_service import (
+    list_container_summaries,
+    get_container_list_fingerprint,
+    list_cluster_containers,
+    iter_cluster_containers,
+    run_bulk_actions,
+)
+from services import stats_collector, async_docker, log_stream, exec_service
+from api.auth import require_admin
+from api.responses import split_param, project, paginate, etag_response, diff_response, with_keys
+from config.settings import (
+    CLUSTER_LIST_TIMEOUT,
+    LOGS_DEFAULT_TAIL,
+    LOGS_MAX_TARGETS,
+    LOGS_DISCONNECT_POLL,
+)
 
 router = APIRouter(prefix="/api/containers", tags=["containers"])
 
 
+def _docker_filters(status: Optional[str], name: Optional[str], label: Optional[str]) -> dict:
+    """Docker 데몬에서 바로 처리할 수 있는 필터 (status, name, label)"""
+    filters = {}
+    if status:
+        filters["status"] = split_param(status)
+    if name:
+        filters["name"] = [name]
+    if label:
+        filters["label"] = split_param(label)
+    return filters
+
+
+def _filter_image(items: list, image: Optional[str]) -> list:
+    """이미지 이름(태그) 부분 일치 필터"""
+    if not image:
+        return items
+    return [c for c in items if image in c.get("image", "")]
+
+
 @router.get("")
-def list_containers(node_id: str, all: bool = True):
-    """
-    특정 노드의 컨테이너 목록 조회
-    """
-    client = get_docker_client(node_id)
-    containers = client.containers.list(all=all)
-
-    result = []
-    for c in containers:
-        # 포트 정보 간단 정리
-        ports = []
-        if c.ports:
-            for k, v in c.ports.items():
-                if v:
-                    for m in v:
-                        host = m.get("HostIp")
-                        port = m.get("HostPort")
-                        ports.append(f"{host}:{port}->{k}")
-                else:
-                    ports.append(k)
-
-        result.append(
-            {
-                "id": c.short_id,
-                "name": c.name,
-                "image": ", ".join(c.image.tags) if c.image.tags else c.image.id,
-                "status": c.status,
-                "ports": ", ".join(ports),
-            }
+def list_containers(
+    request: Request,
+    node_id: str,
+    all: bool = True,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    image: Optional[str] = None,
+    label: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """
+    특정 노드의 컨테이너 목록 조회 (node_id=*이면 전체 노드 조회, 페이지네이션 없음)
+
+    status/label은 쉼표로 여러 값을 지정할 수 있고, fields로 응답 필드를 선택한다.
+    limit을 지정하면 id 순 커서 페이지네이션이 적용되며 다음 커서는 X-Next-Cursor 헤더로 전달된다.
+    since를 지정하면 해당 버전 이후 추가/삭제/변경된 컨테이너만 반환한다 (since=0이면 전체).
+    """
+    if node_id == "*":
+        if limit or cursor:
+            raise HTTPException(status_code=400, detail="node_id=*에는 limit/cursor를 사용할 수 없습니다 (노드별로 조회하세요)")
+        return list_all_containers(
+            request, all=all, stream=False, timeout=CLUSTER_LIST_TIMEOUT,
+            status=status, name=name, image=image, label=label, fields=fields, since=since,
         )
-    return result
+    filters = _docker_filters(status, name, label)
+    items = list_container_summaries(node_id, all=all, filters=filters)
+    # 업스트림 결과의 내용 지문으로 ETag를 만들어 304이면 필터링/선택/직렬화를 건너뛴다
+    state = get_container_list_fingerprint(node_id, items, all, filters)
+    if since is not None:
+        if limit:
+            raise HTTPException(status_code=400, detail="since와 limit은 함께 사용할 수 없습니다")
+        return diff_response(request, project(_filter_image(items, image), with_keys(fields, "id")), since)
+    if not limit:
+        return etag_response(request, lambda: project(_filter_image(items, image), fields), state=state)
+    page, next_cursor = paginate(_filter_image(items, image), limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return etag_response(request, lambda: project(page, fields), headers, state=state)
+
+
+@router.get("/all")
+def list_all_containers(
+    request: Request,
+    all: bool = True,
+    stream: bool = False,
+    timeout: float = CLUSTER_LIST_TIMEOUT,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    image: Optional[str] = None,
+    label: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """
+    모든 노드의 컨테이너를 동시에 조회하여 병합
+
+    일부 노드가 느리거나 오프라인이어도 제한 시간 안에 받은 결과와 노드별 오류를
+    함께 반환한다. stream=true이면 노드별 결과를 끝나는 순서대로 NDJSON으로 보낸다.
+    since를 지정하면 해당 버전 이후 바뀐 컨테이너만 반환한다 (stream과 함께 쓸 수 없음).
+    """
+    timeout = min(max(timeout, 0.1), CLUSTER_LIST_TIMEOUT)
+    filters = _docker_filters(status, name, label)
+    fields = with_keys(fields, "node_id", "id") if since is not None else with_keys(fields, "node_id")
+    if stream and since is not None:
+        raise HTTPException(status_code=400, detail="since와 stream은 함께 사용할 수 없습니다")
+    if stream:
+        def lines():
+            for result in iter_cluster_containers(all=all, timeout=timeout, filters=filters):
+                del result["fingerprint"]
+                result["containers"] = project(_filter_image(result["containers"], image), fields)
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    result = list_cluster_containers(all=all, timeout=timeout, filters=filters)
+    state = result.pop("fingerprint")
+    timings = []
+    for node in result["nodes"]:
+        # 매번 달라지는 소요 시간은 ETag가 유지되도록 Server-Timing 헤더로 전달
+        elapsed_ms = node.pop("elapsed_ms")
+        if elapsed_ms is not None:
+            timings.append(f'node;desc="{node["node_id"]}";dur={elapsed_ms}')
+    headers = {"Server-Timing": ", ".join(timings)} if timings else None
+
+    def build():
+        result["containers"] = project(_filter_image(result["containers"], image), fields)
+        counts = Counter(c["node_id"] for c in result["containers"])
+        for node in result["nodes"]:
+            node["count"] = counts.get(node["node_id"], 0)
+        return result
+
+    if since is not None:
+        build()
+        return diff_response(
+            request, result["containers"], since,
+            id_key=lambda c: f"{c['node_id']}/{c['id']}",
+            extra={"nodes": result["nodes"], "partial": result["partial"]},
+            headers=headers,
+        )
+    return etag_response(request, build, headers, state=state)
 
 
 @router.post("/start")
@@ -45,6 +156,7 @@ def start_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.start()
+    invalidate_coalesced(action.node_id)
     return {"ok": True}
 
 
@@ -53,6 +165,7 @@ def stop_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.stop()
+    invalidate_coalesced(action.node_id)
     return {"ok": True}
 
 
@@ -61,5 +174,198 @@ def restart_container(action: ContainerAction):
     client = get_docker_client(action.node_id)
     container = client.containers.get(action.container_id)
     container.restart()
+    invalidate_coalesced(action.node_id)
     return {"ok": True}
 
+
+
+@router.post("/bulk")
+def bulk_container_action(request: BulkActionRequest):
+    """
+    여러 노드의 컨테이너 start/stop/restart 일괄 실행
+
+    항목은 container_id 또는 라벨 셀렉터(label)로 대상을 지정하며,
+    전체/노드별 동시 실행 수 제한 안에서 병렬로 실행된다.
+    """
+    for item in request.items:
+        if not item.container_id and not item.label:
+            raise HTTPException(status_code=400, detail="container_id 또는 label 중 하나를 지정해야 합니다")
+    results = run_bulk_actions(
+        request.items,
+        concurrency=request.concurrency,
+        node_concurrency=request.node_concurrency,
+        stop_timeout=request.stop_timeout,
+    )
+    return {
+        "ok": all(r["ok"] for r in results),
+        "results": results,
+    }
+
+
+async def _until_disconnected(request: Request, entries):
+    """
+    클라이언트 연결이 끊기면 로그 스트림을 닫는다
+
+    follow 중 출력이 없으면 응답 쓰기 실패로 끊김을 알 수 없으므로 주기적으로 확인한다.
+    """
+    iterator = entries.__aiter__()
+    try:
+        while True:
+            next_entry = asyncio.ensure_future(iterator.__anext__())
+            while not (await asyncio.wait({next_entry}, timeout=LOGS_DISCONNECT_POLL))[0]:
+                if await request.is_disconnected():
+                    next_entry.cancel()
+                    with suppress(asyncio.CancelledError, StopAsyncIteration):
+                        await next_entry
+                    return
+            try:
+                entry = next_entry.result()
+            except StopAsyncIteration:
+                return
+            yield entry
+    finally:
+        await iterator.aclose()
+
+
+def _ndjson_logs(request: Request, entries) -> StreamingResponse:
+    async def lines():
+        try:
+            async for entry in _until_disconnected(request, entries):
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # 이미 200 응답이 시작됐으므로 오류는 마지막 줄로 전달
+            yield json.dumps({"stream": "error", "time": None, "line": str(e) or type(e).__name__},
+                             ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/exec", dependencies=[Depends(require_admin)])
+async def exec_in_containers(request: Request, body: ExecRequest):
+    """
+    여러 노드의 컨테이너에서 같은 명령을 동시에 실행하고 출력을 NDJSON으로 스트리밍 (X-Admin-Token 필요)
+
+    targets("node_id:container")로 직접 지정하거나 node_ids/role/name/label로 실행 중인
+    컨테이너를 고른다. 출력 줄마다 node_id/container/stream이 붙으며, 컨테이너별 종료는
+    type=exit, 마지막 줄은 type=done 요약이다.
+    """
+    plan = await exec_service.prepare_exec(body)
+
+    async def lines():
+        try:
+            async for event in _until_disconnected(request, exec_service.iter_exec(plan)):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # 이미 200 응답이 시작됐으므로 오류는 마지막 줄로 전달
+            yield json.dumps({"type": "error", "error": str(e) or type(e).__name__}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/exec/stats")
+def get_exec_stats():
+    """명령 실행 통계 (실행/실패/시간 초과 수, 출력 바이트)"""
+    return exec_service.get_exec_stats()
+
+
+async def _open_log_source(node_id: str, container_id: str) -> dict:
+    try:
+        return await log_stream.open_log_source(node_id, container_id)
+    except async_docker.DockerAPIError as e:
+        raise HTTPException(status_code=e.status_code if e.status_code < 500 else 502, detail=e.message)
+
+
+async def _error_lines(error: str):
+    yield {"stream": "error", "time": None, "line": error}
+
+
+@router.get("/logs")
+async def get_merged_logs(
+    request: Request,
+    targets: str,
+    tail: int = Query(LOGS_DEFAULT_TAIL, ge=0),
+    since: Optional[float] = None,
+    follow: bool = False,
+):
+    """
+    여러 컨테이너(노드 무관)의 로그를 타임스탬프 순으로 병합하여 NDJSON 스트림으로 전달
+
+    targets는 "node_id:container_id"를 쉼표로 나열한다. 줄마다 node_id, container, stream,
+    time, line이 포함되며, 조회에 실패한 컨테이너는 stream="error" 줄로 표시된다.
+    """
+    pairs = []
+    for target in split_param(targets):
+        node_id, sep, container_id = target.partition(":")
+        if not sep or not node_id or not container_id:
+            raise HTTPException(status_code=400, detail=f"잘못된 대상 형식입니다: {target}")
+        pairs.append((node_id, container_id))
+    if not pairs:
+        raise HTTPException(status_code=400, detail="targets를 지정해야 합니다")
+    if len(pairs) > LOGS_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"최대 {LOGS_MAX_TARGETS}개 컨테이너까지 조회할 수 있습니다")
+
+    opened = await asyncio.gather(
+        *(log_stream.open_log_source(n, c) for n, c in pairs), return_exceptions=True
+    )
+    sources = []
+    for (node_id, container_id), source in zip(pairs, opened):
+        if isinstance(source, Exception):
+            meta = {"node_id": node_id, "container": container_id}
+            error = source.detail if isinstance(source, HTTPException) else str(source)
+            sources.append((meta, _error_lines(error)))
+            continue
+        meta = {"node_id": node_id, "container": source["name"] or container_id}
+        sources.append((meta, log_stream.iter_log_lines(source, tail=tail, since=since, follow=follow)))
+    return _ndjson_logs(request, log_stream.merge_log_streams(sources, follow=follow))
+
+
+@router.get("/{container_id}/logs")
+async def get_container_logs(
+    request: Request,
+    container_id: str,
+    node_id: str,
+    tail: int = Query(LOGS_DEFAULT_TAIL, ge=0),
+    since: Optional[float] = None,
+    follow: bool = False,
+    stdout: bool = True,
+    stderr: bool = True,
+):
+    """
+    컨테이너 로그를 NDJSON 스트림으로 전달 ({"stream", "time", "line"} 한 줄씩)
+
+    Docker 로그 스트림을 받은 만큼 바로 전달하며 전체 로그를 메모리에 올리지 않는다.
+    follow=true이면 새 로그를 계속 전달하고, 클라이언트 연결이 끊기면 업스트림을 닫는다.
+    since는 유닉스 시각(초)이다.
+    """
+    source = await _open_log_source(node_id, container_id)
+    entries = log_stream.iter_log_lines(
+        source, tail=tail, since=since, follow=follow, stdout=stdout, stderr=stderr
+    )
+    return _ndjson_logs(request, entries)
+
+
+@router.get("/{container_id}/stats")
+def get_container_stats(
+    container_id: str,
+    node_id: str,
+    window: Literal["raw", "1m", "10m"] = "raw",
+    since: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    컨테이너 리소스 사용량 시계열 조회
+
+    백그라운드 수집기가 저장한 값을 반환하므로 조회 시 Docker 데몬을 호출하지 않는다.
+    """
+    result = stats_collector.get_container_stats(node_id, container_id, window, since, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="수집된 통계가 없습니다")
+    return result
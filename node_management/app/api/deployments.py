@@ -0,0 +1,57 @@
+"""FL 배포 API 엔드포인트"""
+import json
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from models.schemas import DeploymentRequest
+from services import fl_deployment
+from api.auth import require_admin
+from config.settings import CLUSTER_LIST_TIMEOUT
+
+router = APIRouter(prefix="/api/deployments", tags=["deployments"])
+
+
+@router.post("", dependencies=[Depends(require_admin)])
+def create_deployment(request: DeploymentRequest):
+    """
+    SuperLink(중앙 노드)와 SuperNode(클라이언트 노드)를 의존성 순서대로 병렬 배포
+
+    진행 상황을 NDJSON으로 스트리밍하며 마지막 줄은 type=done 결과다.
+    실패하면 이번 실행에서 만든 컨테이너와 네트워크를 제거한다.
+    """
+    plan = fl_deployment.prepare_deployment(request)
+
+    def lines():
+        for event in fl_deployment.iter_deployment(plan):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    # 첫 줄을 보내기 전에 연결이 끊겨 실행이 시작되지 않았으면 이름 예약을 해제한다
+    return StreamingResponse(
+        lines(), media_type="application/x-ndjson",
+        background=BackgroundTask(fl_deployment.release_deployment, plan),
+    )
+
+
+@router.get("")
+def list_deployments():
+    """최근 배포 상태 목록"""
+    return fl_deployment.list_deployments()
+
+
+@router.get("/stats")
+def get_deployment_stats():
+    """배포 통계 (실행/성공/실패, 생성/롤백한 컨테이너 수)"""
+    return fl_deployment.get_deployment_stats()
+
+
+@router.get("/{name}")
+def get_deployment(name: str):
+    """배포 상태와 단계별 진행 상태"""
+    return fl_deployment.get_deployment(name)
+
+
+@router.delete("/{name}", dependencies=[Depends(require_admin)])
+def delete_deployment(name: str, timeout: float = CLUSTER_LIST_TIMEOUT):
+    """fl.deployment 라벨로 모든 노드에서 배포 컨테이너 제거"""
+    timeout = min(max(timeout, 0.1), CLUSTER_LIST_TIMEOUT)
+    return fl_deployment.teardown_deployment(name, timeout=timeout)
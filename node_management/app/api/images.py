@@ -0,0 +1,39 @@
+"""이미지 배포 API 엔드포인트"""
+import json
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from models.schemas import ImageDistributeRequest
+from services import image_distribution
+from api.auth import require_admin
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+
+@router.post("/distribute", dependencies=[Depends(require_admin)])
+def distribute_image(request: ImageDistributeRequest):
+    """
+    중앙 노드에서 한 번 pull한 이미지를 클라이언트 노드로 병렬 전송
+
+    진행 상황을 NDJSON으로 스트리밍하며 마지막 줄은 type=done 결과다.
+    대상 노드에 이미 있는 레이어는 빼고 보낸다.
+    """
+    plan = image_distribution.prepare_distribution(
+        request.image,
+        node_ids=request.node_ids,
+        source_node_id=request.source_node_id,
+        pull=request.pull,
+        force=request.force,
+        concurrency=request.concurrency,
+    )
+
+    def lines():
+        for event in image_distribution.iter_distribution(plan):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/distribute/stats")
+def get_distribution_stats():
+    """이미지 배포 통계 (전송/건너뛴 노드와 레이어, 바이트 수)"""
+    return image_distribution.get_distribution_stats()
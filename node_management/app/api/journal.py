@@ -0,0 +1,64 @@
+"""컨테이너 이벤트 저널 API 엔드포인트"""
+from typing import Optional
+from fastapi import APIRouter, Query
+from services import event_journal
+from config.settings import JOURNAL_MAX_QUERY_LIMIT
+
+router = APIRouter(prefix="/api/journal", tags=["journal"])
+
+
+@router.get("/events")
+def list_events(
+    node_id: Optional[str] = None,
+    container_id: Optional[str] = None,
+    type: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    before_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=JOURNAL_MAX_QUERY_LIMIT),
+):
+    """
+    기록된 이벤트 조회 (최신순, since/until은 Unix 시각)
+
+    type: container, network, node(online/offline 전환), resync(이벤트 누락 가능 구간)
+    """
+    return event_journal.query_events(
+        node_id=node_id, container_id=container_id, type=type, action=action,
+        since=since, until=until, before_id=before_id, limit=limit,
+    )
+
+
+@router.get("/timeline/{node_id}/{container}")
+def get_timeline(
+    node_id: str,
+    container: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1, le=JOURNAL_MAX_QUERY_LIMIT),
+):
+    """컨테이너 생명주기 타임라인과 실행 구간 (container는 ID 또는 이름, limit을 넘으면 최근 이벤트만)"""
+    return event_journal.get_timeline(node_id, container, since=since, until=until, limit=limit)
+
+
+@router.get("/crashes")
+def get_crashes(
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    node_id: Optional[str] = None,
+    group_by: str = "container",
+):
+    """비정상 종료 횟수 (기본 최근 24시간, group_by: container 또는 node)"""
+    return event_journal.get_crash_counts(since=since, until=until, node_id=node_id, group_by=group_by)
+
+
+@router.post("/compact")
+def compact_journal():
+    """보관 기간이 지난 이벤트를 바로 정리"""
+    return event_journal.compact()
+
+
+@router.get("/stats")
+def get_journal_stats():
+    """저널 통계 (기록/버린 이벤트, 배치 크기, 파일 크기)"""
+    return event_journal.get_journal_stats()
@@ -0,0 +1,147 @@
+"""Prometheus 메트릭 엔드포인트"""
+import anyio.to_thread
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services import metrics, event_hub, stats_collector, circuit_breaker, topology, event_journal
+from services.docker_service import get_client_pool_stats, get_fanout_stats, get_docker_hosts, get_coalesce_stats
+from services.container_service import get_image_cache_stats
+from services.async_docker import get_async_pool_stats
+from config.server_manager import get_config_stats
+
+router = APIRouter(tags=["metrics"])
+
+
+def _cache_lines() -> list:
+    """캐시 적중/미스 카운터와 적중률"""
+    sync_pool = get_client_pool_stats()
+    async_pool = get_async_pool_stats()
+    image_cache = get_image_cache_stats()
+    topology_cache = topology.get_topology_stats()
+    coalesce = get_coalesce_stats()
+    caches = {
+        "docker_client": (sync_pool["hits"], sync_pool["misses"]),
+        "async_docker_client": (async_pool["hits"], async_pool["misses"]),
+        "image_tags": (image_cache["hits"], image_cache["refreshes"]),
+        "topology": (topology_cache["hits"], topology_cache["builds"]),
+        # 진행 중 호출 공유와 짧은 재사용을 모두 적중으로 본다
+        "docker_coalesce": (coalesce["coalesced"] + coalesce["cache_hits"], coalesce["upstream"]),
+    }
+    lines = []
+    lines += metrics.render_gauge(
+        "fl_cache_hits_total", "Cache hits",
+        [({"cache": name}, hits) for name, (hits, _) in caches.items()], type="counter",
+    )
+    lines += metrics.render_gauge(
+        "fl_cache_misses_total", "Cache misses",
+        [({"cache": name}, misses) for name, (_, misses) in caches.items()], type="counter",
+    )
+    lines += metrics.render_gauge(
+        "fl_cache_hit_ratio", "Cache hit ratio since start",
+        [({"cache": name}, round(h / (h + m), 4) if h + m else 0.0) for name, (h, m) in caches.items()],
+    )
+    lines += metrics.render_gauge(
+        "fl_docker_coalesced_total", "Docker queries served without their own upstream call",
+        [({"kind": "in_flight"}, coalesce["coalesced"]), ({"kind": "micro_cache"}, coalesce["cache_hits"])],
+        type="counter",
+    )
+    lines += metrics.render_gauge(
+        "fl_docker_clients", "Pooled Docker clients",
+        [({"layer": "sync"}, sync_pool["clients"]), ({"layer": "async"}, async_pool["clients"])],
+    )
+    return lines
+
+
+def _threadpool_lines() -> list:
+    """Starlette 스레드풀과 노드 fan-out 풀 포화도"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    fanout = get_fanout_stats()
+    lines = []
+    lines += metrics.render_gauge(
+        "fl_threadpool_in_use", "Worker threads currently busy",
+        [({"pool": "starlette"}, limiter.borrowed_tokens)],
+    )
+    lines += metrics.render_gauge(
+        "fl_threadpool_size", "Worker thread capacity",
+        [({"pool": "starlette"}, limiter.total_tokens), ({"pool": "node_fanout"}, fanout["max_workers"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_threadpool_threads", "Worker threads started",
+        [({"pool": "node_fanout"}, fanout["threads"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_threadpool_queued", "Tasks waiting for a worker",
+        [({"pool": "starlette"}, limiter.statistics().tasks_waiting),
+         ({"pool": "node_fanout"}, fanout["queued"])],
+    )
+    return lines
+
+
+def _component_lines() -> list:
+    config = get_config_stats()
+    events = event_hub.get_stats()
+    collector = stats_collector.get_collector_stats()
+    journal = event_journal.get_journal_counters()
+    lines = []
+    lines += metrics.render_gauge(
+        "fl_config_reloads_total", "servers.yaml re-parses after file changes",
+        [({}, config["reloads"])], type="counter",
+    )
+    lines += metrics.render_gauge(
+        "fl_config_writes_total", "servers.yaml writes",
+        [({}, config["writes"])], type="counter",
+    )
+    lines += metrics.render_gauge("fl_config_version", "Config version counter", [({}, config["version"])])
+    lines += metrics.render_gauge(
+        "fl_event_subscribers", "Connected SSE subscribers", [({}, events["subscribers"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_event_upstream_streams", "Docker event streams held open", [({}, events["upstream_streams"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_stats_series", "Container stats series held in memory", [({}, collector["series"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_stats_buffer_bytes", "Bytes held by container stats ring buffers", [({}, collector["buffer_bytes"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_stats_round_duration_ms", "Last stats collection round duration",
+        [({}, collector["last_round_ms"])],
+    )
+    lines += metrics.render_gauge(
+        "fl_journal_events_total", "Docker events written to or dropped from the event journal",
+        [({"result": "recorded"}, journal["recorded"]), ({"result": "dropped"}, journal["dropped"])],
+        type="counter",
+    )
+    lines += metrics.render_gauge("fl_journal_queued", "Events waiting for the journal writer", [({}, journal["queued"])])
+    return lines
+
+
+def _breaker_lines() -> list:
+    """노드별 서킷 브레이커 상태 (현재 상태만 1)"""
+    samples = []
+    for node_id in list(get_docker_hosts()):
+        current = circuit_breaker.get_state(node_id)["state"]
+        for state in (circuit_breaker.CLOSED, circuit_breaker.OPEN, circuit_breaker.HALF_OPEN):
+            samples.append(({"node": node_id, "state": state}, 1 if state == current else 0))
+    stats = circuit_breaker.get_breaker_stats()
+    lines = metrics.render_gauge("fl_node_circuit_state", "Per-node circuit breaker state", samples)
+    lines += metrics.render_gauge(
+        "fl_circuit_rejected_total", "Calls failed fast by an open circuit",
+        [({}, stats["rejected"])], type="counter",
+    )
+    lines += metrics.render_gauge(
+        "fl_circuit_transitions_total", "Circuit breaker transitions",
+        [({"to": "open"}, stats["opened"]), ({"to": "closed"}, stats["closed"])], type="counter",
+    )
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    lines = metrics.render_registered()
+    lines += _cache_lines()
+    lines += _threadpool_lines()
+    lines += _component_lines()
+    lines += _breaker_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
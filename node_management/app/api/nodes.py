@@ -1,28 +1,87 @@
 """서버 관리 API 엔드포인트"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import time
 from datetime import datetime
-import docker
 from models.schemas import ServerConfig
-from services.docker_service import get_docker_client, get_docker_hosts, refresh_docker_hosts
-from config.server_manager import load_servers, save_servers
+from services.docker_service import (
+    get_docker_client,
+    get_docker_hosts,
+    refresh_docker_hosts,
+    close_docker_client,
+    get_client_pool_stats,
+    get_coalesce_stats,
+)
+from services import health_monitor, circuit_breaker
+from config.server_manager import (
+    load_servers,
+    insert_server,
+    update_server,
+    delete_server,
+    get_server_versions,
+    get_config_version,
+    export_servers_yaml,
+    import_servers_yaml,
+)
+from config.settings import HEALTH_STALE_AFTER
+from api.auth import require_admin
+from api.responses import split_param, project, etag_response, diff_response, with_keys, PROCESS_TOKEN
 
 router = APIRouter(prefix="/api/nodes", tags=["nodes"])
 
 
 @router.get("")
-def list_nodes():
+def list_nodes(request: Request):
     """서버 목록 조회"""
     refresh_docker_hosts()
     hosts = get_docker_hosts()
-    return [
+    return etag_response(request, lambda: [
         {"id": node_id, "label": info.get("label", node_id)}
         for node_id, info in hosts.items()
-    ]
+    ], state=(PROCESS_TOKEN, get_config_version()))
+
+
+def _node_status_entry(node_id: str, info: dict, result: dict, now: float) -> dict:
+    """상태 스냅샷 항목으로 응답 항목 생성"""
+    age = max(0.0, now - result["checked_at"])
+    entry = {
+        "id": node_id,
+        "label": info.get("label", node_id),
+        "status": result["status"],
+        "type": info.get("type", "unknown"),
+        "role": info.get("role", "client"),
+        "base_url": info.get("base_url", ""),
+        "rtt_ms": result.get("rtt_ms"),
+        "last_check": datetime.fromtimestamp(result["checked_at"]).isoformat(),
+        "age_seconds": round(age, 2),
+        "stale": age > HEALTH_STALE_AFTER,
+        "circuit": circuit_breaker.get_state(node_id),
+    }
+    if "error" in result:
+        entry["error"] = result["error"]
+    return entry
 
 
 @router.get("/status")
-def get_nodes_status():
-    """모든 서버의 연결 상태 확인"""
+def get_nodes_status(
+    request: Request,
+    refresh: bool = False,
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """
+    모든 서버의 연결 상태 확인
+
+    백그라운드 모니터의 스냅샷을 반환한다. refresh=true이면 즉시 다시 점검한다.
+    status/role(쉼표 구분)로 필터링하고 fields로 응답 필드를 선택할 수 있다.
+    age_seconds는 매 요청 달라지므로, 변경 시에만 본문을 받으려면 fields에서 제외한다.
+    circuit은 노드별 서킷 브레이커 상태(closed/open/half_open, 연속 실패 수, 재시도 시각)다.
+    since를 지정하면 해당 버전 이후 추가/삭제/변경된 서버만 반환한다 (since=0이면 전체).
+    """
     try:
         # 최신 설정 로드 (전체 교체하여 삭제된 서버도 제거)
         try:
@@ -34,39 +93,80 @@ def get_nodes_status():
             if not hosts:
                 refresh_docker_hosts()
         
-        hosts = get_docker_hosts()
-        status_list = []
-        for node_id, info in hosts.items():
-            try:
-                client = docker.DockerClient(base_url=info["base_url"])
-                client.ping()  # 연결 테스트
-                status_list.append({
-                    "id": node_id,
-                    "label": info.get("label", node_id),
-                    "status": "online",
-                    "type": info.get("type", "unknown"),
-                    "role": info.get("role", "client"),
-                    "base_url": info.get("base_url", ""),
-                    "last_check": datetime.now().isoformat()
-                })
-            except Exception as e:
-                status_list.append({
-                    "id": node_id,
-                    "label": info.get("label", node_id),
-                    "status": "offline",
-                    "type": info.get("type", "unknown"),
-                    "role": info.get("role", "client"),
-                    "base_url": info.get("base_url", ""),
-                    "error": str(e),
-                    "last_check": datetime.now().isoformat()
-                })
-        return status_list
+        hosts = dict(get_docker_hosts())
+        # 버전을 스냅샷보다 먼저 읽는다 (ETag가 본문보다 오래된 쪽이면 다음 요청에서 다시 받을 뿐이다)
+        version = health_monitor.get_snapshot_version()
+        snapshot = health_monitor.get_snapshot()
+        # 강제 갱신이거나 아직 점검되지 않은 노드(새로 추가된 노드 등)만 즉시 점검
+        missing = [node_id for node_id in hosts if node_id not in snapshot]
+        if refresh:
+            snapshot = health_monitor.run_check(hosts.keys())
+        elif missing:
+            snapshot = health_monitor.run_check(missing)
+
+        now = time.time()
+
+        def build():
+            entries = [
+                _node_status_entry(node_id, info, snapshot[node_id], now)
+                for node_id, info in hosts.items()
+                if node_id in snapshot
+            ]
+            statuses, roles = split_param(status), split_param(role)
+            if statuses:
+                entries = [e for e in entries if e["status"] in statuses]
+            if roles:
+                entries = [e for e in entries if e["role"] in roles]
+            return entries
+
+        if since is not None:
+            return diff_response(request, project(build(), with_keys(fields, "id")), since)
+        selected = split_param(fields)
+        state = (
+            PROCESS_TOKEN, version, get_config_version(),
+            # stale/circuit은 점검 없이도 바뀌고, age_seconds를 고르면 매 요청 본문이 달라진다
+            [(n, now - r["checked_at"] > HEALTH_STALE_AFTER) for n, r in sorted(snapshot.items())],
+            [circuit_breaker.get_state(n) for n in hosts],
+            now if not selected or "age_seconds" in selected else None,
+        )
+        return etag_response(request, lambda: project(build(), fields), state=state)
     except Exception as e:
         # 전체 함수 레벨 에러 처리
         print(f"서버 상태 조회 오류: {e}")
         raise HTTPException(status_code=500, detail=f"서버 상태 조회 실패: {str(e)}")
 
 
+@router.get("/pool")
+def get_pool_stats():
+    """Docker 클라이언트 풀 재사용 통계 (hit/miss)"""
+    return get_client_pool_stats()
+
+
+@router.get("/coalesce")
+def get_query_coalesce_stats():
+    """동일 Docker 조회 합치기 통계 (실제 호출/공유/재사용 수)"""
+    return get_coalesce_stats()
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+def export_nodes():
+    """서버 설정을 servers.yaml 형식으로 내보내기"""
+    return PlainTextResponse(
+        export_servers_yaml(),
+        media_type="application/x-yaml",
+        headers={"Content-Disposition": 'attachment; filename="servers.yaml"'},
+    )
+
+
+@router.post("/import", dependencies=[Depends(require_admin)])
+async def import_nodes(request: Request):
+    """servers.yaml 형식 본문으로 서버 설정 전체 교체"""
+    body = (await request.body()).decode("utf-8", errors="replace")
+    count = await run_in_threadpool(import_servers_yaml, body)
+    await run_in_threadpool(refresh_docker_hosts)
+    return {"ok": True, "message": f"서버 {count}개를 가져왔습니다"}
+
+
 @router.get("/{node_id}")
 def get_node(node_id: str):
     """서버 상세 정보 조회"""
@@ -83,29 +183,23 @@ def get_node(node_id: str):
         "base_url": info.get("base_url", ""),
         "type": info.get("type", "remote"),
         "role": info.get("role", "client"),
-        "tls": info.get("tls", False)
+        "tls": info.get("tls", False),
+        "version": get_server_versions().get(node_id),
     }
 
 
 @router.post("")
 def add_node(server: ServerConfig):
     """서버 추가"""
-    servers = load_servers()
-    
-    # ID 중복 확인
-    if server.id in servers:
-        raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
-    
     # 서버 정보 추가 - 새로 추가하는 서버는 항상 클라이언트 서버
-    servers[server.id] = {
+    # (ID 중복은 저장소에서 원자적으로 확인)
+    insert_server(server.id, {
         "base_url": server.base_url,
         "label": server.label,
         "type": "remote",  # 클라이언트 서버는 항상 원격
         "role": "client",  # 새로 추가하는 서버는 항상 클라이언트
         "tls": server.tls
-    }
-    
-    save_servers(servers)
+    })
     refresh_docker_hosts()
     
     return {"ok": True, "message": f"서버 '{server.label}'가 추가되었습니다"}
@@ -113,7 +207,11 @@ def add_node(server: ServerConfig):
 
 @router.put("/{node_id}")
 def update_node(node_id: str, server: ServerConfig):
-    """서버 수정"""
+    """
+    서버 수정
+
+    version을 지정하면 조회 이후 다른 요청이 먼저 수정/삭제한 경우 409를 반환한다.
+    """
     servers = load_servers()
     
     if node_id not in servers:
@@ -130,29 +228,30 @@ def update_node(node_id: str, server: ServerConfig):
         final_role = existing_role
         final_type = "remote"
     
-    servers[node_id] = {
-        "base_url": server.base_url,
-        "label": server.label,
-        "type": final_type,
-        "role": final_role,
-        "tls": server.tls
-    }
+    update_server(
+        node_id,
+        {
+            "base_url": server.base_url,
+            "label": server.label,
+            "type": final_type,
+            "role": final_role,
+            "tls": server.tls
+        },
+        expected_version=server.version,
+        new_id=server.id if server.id != node_id else None,
+    )
     
     # ID가 변경된 경우
     if server.id != node_id:
-        if server.id in servers:
-            raise HTTPException(status_code=400, detail=f"서버 ID '{server.id}'가 이미 존재합니다")
-        servers[server.id] = servers.pop(node_id)
-    
-    save_servers(servers)
+        close_docker_client(node_id)
     refresh_docker_hosts()
     
     return {"ok": True, "message": f"서버 '{server.label}'가 수정되었습니다"}
 
 
 @router.delete("/{node_id}")
-def delete_node(node_id: str):
-    """서버 삭제"""
+def delete_node(node_id: str, version: Optional[int] = None):
+    """서버 삭제 (version을 지정하면 다른 요청이 먼저 수정한 경우 409)"""
     servers = load_servers()
     
     if node_id not in servers:
@@ -163,9 +262,8 @@ def delete_node(node_id: str):
         raise HTTPException(status_code=400, detail="중앙 서버는 삭제할 수 없습니다")
     
     label = servers[node_id].get("label", node_id)
-    del servers[node_id]
-    
-    save_servers(servers)
+    delete_server(node_id, expected_version=version)
+    close_docker_client(node_id)
     refresh_docker_hosts()
     
     return {"ok": True, "message": f"서버 '{label}'가 삭제되었습니다"}
@@ -180,9 +278,8 @@ def test_connection(node_id: str):
     if node_id not in hosts:
         raise HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
     
-    info = hosts[node_id]
     try:
-        client = docker.DockerClient(base_url=info["base_url"])
+        client = get_docker_client(node_id)
         client.ping()  # 연결 테스트
         
         # 추가 정보 가져오기
@@ -194,9 +291,11 @@ def test_connection(node_id: str):
             "api_version": version.get("ApiVersion", "unknown")
         }
     except Exception as e:
+        # 차단된 노드는 SDK 제한 시간을 기다리지 않고 마지막 오류로 즉시 응답
         return {
             "ok": False,
             "status": "offline",
-            "error": str(e)
+            "error": e.detail if isinstance(e, HTTPException) else str(e),
+            "circuit": circuit_breaker.get_state(node_id),
         }
 
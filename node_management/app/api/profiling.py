@@ -0,0 +1,88 @@
+"""관리자 프로파일링 API 엔드포인트 (X-Admin-Token 헤더 필요)"""
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from models.schemas import TraceRequest
+from services import profiler
+from api.auth import require_admin
+from config.settings import (
+    PROFILE_INTERVAL,
+    PROFILE_MAX_INTERVAL,
+    PROFILE_MAX_SECONDS,
+    PROFILE_TRACE_HISTORY,
+)
+
+router = APIRouter(prefix="/api/admin/profile", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/sample")
+def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval: float = Query(PROFILE_INTERVAL, gt=0, le=PROFILE_MAX_INTERVAL),
+    idle: bool = False,
+    format: Literal["folded", "json"] = "folded",
+):
+    """
+    seconds 동안 프로세스 전체 스택을 샘플링 (응답은 샘플링이 끝난 뒤 반환)
+
+    format=folded는 flamegraph.pl/speedscope에 바로 넣을 수 있는 folded stack 텍스트,
+    json은 요약과 함수별 상위 목록이다. idle=true이면 대기 중인 스레드도 포함한다.
+    """
+    profile = profiler.sample(seconds, interval, include_idle=idle)
+    if format == "folded":
+        return PlainTextResponse(profiler.folded_samples(profile))
+    return {
+        **{k: v for k, v in profile.items() if k != "stacks"},
+        "top": profiler.top_functions(profile),
+    }
+
+
+@router.get("/trace")
+def get_trace_config():
+    """현재 요청 트레이스 설정 (꺼져 있으면 null)"""
+    return {"tracing": profiler.get_trace_rules()}
+
+
+@router.post("/trace")
+def start_trace(request: TraceRequest):
+    """경로 패턴과 일치하는 요청의 span 트레이스 시작 (seconds가 지나거나 max_requests개 기록하면 종료)"""
+    return {"tracing": profiler.set_trace_rules(request.routes, request.seconds, request.max_requests)}
+
+
+@router.delete("/trace")
+def stop_trace():
+    """요청 트레이스 종료 (기록된 트레이스는 유지)"""
+    profiler.clear_trace_rules()
+    return {"tracing": None}
+
+
+@router.get("/traces")
+def get_traces(
+    format: Literal["json", "folded", "summary"] = "json",
+    limit: Optional[int] = Query(None, ge=1, le=PROFILE_TRACE_HISTORY),
+):
+    """
+    기록된 요청 트레이스
+
+    json은 요청별 span 목록(최신순), summary는 경로별 span 종류(config.load,
+    docker.client, docker.<작업> 등) 평균/최대 시간, folded는 경로별 self 시간(µs)을
+    값으로 하는 folded stack 텍스트다.
+    """
+    if format == "folded":
+        return PlainTextResponse(profiler.folded_traces())
+    if format == "summary":
+        return profiler.summarize_traces()
+    return profiler.list_traces(limit)
+
+
+@router.delete("/traces")
+def clear_traces():
+    """기록된 트레이스 삭제"""
+    profiler.clear_traces()
+    return {"cleared": True}
+
+
+@router.get("/stats")
+def get_profiler_stats():
+    """프로파일러 상태 (샘플링 실행 여부, 트레이스 설정, 기록 수)"""
+    return profiler.get_profiler_stats()
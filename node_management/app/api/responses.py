@@ -0,0 +1,173 @@
+"""목록 API 공통 응답 처리 (필터링 후 필드 선택, 커서 페이지네이션, ETag, since diff)"""
+import base64
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict, deque
+from typing import Optional
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from config.settings import DIFF_HISTORY_SIZE, DIFF_MAX_KEYS
+
+# 조회 조건 -> 최근 스냅샷 deque[(버전, {컬렉션: {id: 항목}})]
+_snapshots = OrderedDict()
+_snapshot_lock = threading.Lock()
+_snapshot_version = 0
+
+# 프로세스마다 다른 값: 프로세스 안에서만 의미가 있는 버전(카운터)을 ETag에 쓸 때 함께 넣는다
+PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+
+def split_param(value: Optional[str]) -> list:
+    """쉼표로 구분된 쿼리 파라미터를 목록으로 변환"""
+    if not value:
+        return []
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def project(items: list, fields: Optional[str]) -> list:
+    """fields에 지정된 키만 남긴다 (지정하지 않으면 전체)"""
+    keys = split_param(fields)
+    if not keys:
+        return items
+    return [{k: item[k] for k in keys if k in item} for item in items]
+
+
+def with_keys(fields: Optional[str], *keys) -> Optional[str]:
+    """fields를 지정한 경우 항목 구분에 필요한 키를 추가"""
+    if not fields:
+        return fields
+    missing = [k for k in keys if k not in split_param(fields)]
+    return ",".join([fields, *missing]) if missing else fields
+
+
+def _encode_cursor(value: str) -> str:
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode()).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다")
+
+
+def paginate(items: list, limit: Optional[int], cursor: Optional[str], key: str = "id"):
+    """
+    key 기준 커서 페이지네이션
+
+    (현재 페이지, 다음 페이지 커서 또는 None)을 반환한다. limit이 없으면 전체를 반환한다.
+    """
+    if not limit:
+        return items, None
+    ordered = sorted(items, key=lambda item: str(item.get(key, "")))
+    if cursor:
+        after = _decode_cursor(cursor)
+        ordered = [item for item in ordered if str(item.get(key, "")) > after]
+    page = ordered[:limit]
+    next_cursor = None
+    if len(ordered) > limit:
+        next_cursor = _encode_cursor(str(page[-1].get(key, "")))
+    return page, next_cursor
+
+
+def _query_key(request: Request, exclude=()) -> str:
+    params = sorted((k, v) for k, v in request.query_params.multi_items() if k not in exclude)
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+
+def etag_response(request: Request, content, headers: Optional[dict] = None, state=None) -> Response:
+    """
+    강한 ETag를 붙인 JSON 응답 (If-None-Match가 일치하면 본문 없이 304)
+
+    state를 지정하면 본문 대신 state(응답을 만드는 원본 상태의 버전)와 경로/쿼리로
+    ETag를 만들고, 본문을 만들기 전에 비교한다. 이때 content는 본문을 만드는 함수여도
+    되며 304이면 호출하지 않는다. state가 None이면 직렬화한 본문의 해시를 쓴다.
+    """
+    if state is not None:
+        tag = hashlib.sha256(f"{state}|{_query_key(request)}".encode()).hexdigest()[:32]
+        etag = '"s' + tag + '"'
+    else:
+        response = JSONResponse(content=content() if callable(content) else content, headers=headers)
+        etag = '"' + hashlib.sha256(response.body).hexdigest()[:32] + '"'
+    common = {"ETag": etag, "Cache-Control": "no-cache"}
+    if headers:
+        common.update(headers)
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=common)
+
+    if state is not None:
+        response = JSONResponse(content=content() if callable(content) else content, headers=headers)
+    response.headers.update(common)
+    return response
+
+
+def snapshot_key(request: Request) -> str:
+    """since를 제외한 경로와 쿼리로 스냅샷 키 생성 (조회 조건이 같아야 diff가 의미 있다)"""
+    return _query_key(request, exclude=("since",))
+
+
+def _index(items: list, id_key) -> dict:
+    key_of = id_key if callable(id_key) else (lambda item: str(item.get(id_key)))
+    return {key_of(item): item for item in items}
+
+
+def diff_snapshot(key: str, collections: dict, since: Optional[int], id_key="id"):
+    """
+    현재 목록을 스냅샷으로 기록하고 since 버전과의 차이 계산
+
+    collections는 {컬렉션 이름: 항목 목록}이며 id_key(키 이름 또는 함수)로 항목을 구분한다.
+    내용이 직전 스냅샷과 같으면 버전을 올리지 않는다. (버전, diff)를 반환하며, since
+    스냅샷이 없으면(너무 오래됨, 다른 워커 프로세스, since=0) diff는 None이다.
+    diff는 {컬렉션 이름: {"added": [항목], "removed": [id], "changed": [항목]}} 형식이다.
+    """
+    global _snapshot_version
+    current = {name: _index(items, id_key) for name, items in collections.items()}
+    with _snapshot_lock:
+        history = _snapshots.get(key)
+        if history is None:
+            history = _snapshots[key] = deque(maxlen=DIFF_HISTORY_SIZE)
+        if history and history[-1][1] == current:
+            version = history[-1][0]
+        else:
+            _snapshot_version += 1
+            version = _snapshot_version
+            history.append((version, current))
+        _snapshots.move_to_end(key)
+        while len(_snapshots) > DIFF_MAX_KEYS:
+            _snapshots.popitem(last=False)
+        base = next((snap for v, snap in history if v == since), None)
+
+    if base is None:
+        return version, None
+    diff = {}
+    for name, items in current.items():
+        before = base.get(name, {})
+        diff[name] = {
+            "added": [item for k, item in items.items() if k not in before],
+            "removed": [k for k in before if k not in items],
+            "changed": [item for k, item in items.items() if k in before and before[k] != item],
+        }
+    return version, diff
+
+
+def diff_response(request: Request, items: list, since: int, id_key="id", extra: Optional[dict] = None,
+                  headers: Optional[dict] = None) -> Response:
+    """
+    since 버전 이후 바뀐 항목만 담은 목록 응답
+
+    {"version", "since", "reset", "added", "removed"(id 목록), "changed"}를 반환한다.
+    since 스냅샷이 없으면 reset=true와 함께 전체 항목을 added로 보낸다.
+    """
+    version, diff = diff_snapshot(snapshot_key(request), {"items": items}, since, id_key)
+    if diff is None:
+        changes = {"added": items, "removed": [], "changed": []}
+    else:
+        changes = diff["items"]
+    body = {"version": version, "since": since, "reset": diff is None, **changes}
+    if extra:
+        body.update(extra)
+    return etag_response(request, body, headers)
@@ -0,0 +1,51 @@
+"""실시간 이벤트 스트림 API (Server-Sent Events)"""
+import asyncio
+import json
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from services import event_hub
+from config.settings import SSE_HEARTBEAT_INTERVAL
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+
+
+def _format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.get("")
+async def stream_events(request: Request):
+    """
+    컨테이너/노드 상태 변화를 SSE로 전달
+
+    이벤트 종류: container, network, node, resync(전체 재조회 필요)
+    """
+    queue = event_hub.subscribe()
+
+    async def event_source():
+        try:
+            yield _format_sse({"type": "ready"})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # 프록시 유휴 타임아웃 방지용 주석
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _format_sse(event)
+        finally:
+            event_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def get_stream_stats():
+    """이벤트 허브 통계 (구독자 수, 업스트림 스트림 수)"""
+    return event_hub.get_stats()
@@ -0,0 +1,79 @@
+"""네트워크 토폴로지 API 엔드포인트"""
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from services import topology
+from api.responses import etag_response, diff_snapshot, snapshot_key
+from config.settings import CLUSTER_LIST_TIMEOUT
+
+router = APIRouter(prefix="/api/topology", tags=["topology"])
+
+
+def _topology_response(request: Request, result: dict, since: Optional[int]):
+    """
+    그래프 응답 (version은 since로 다시 보낼 응답 버전)
+
+    since를 지정하면 nodes/edges를 각각 {"added", "removed", "changed"}로 바꾸고,
+    positions는 새로 추가된 노드 좌표만 남긴다. since 버전을 모르면 reset=true와 함께
+    전체를 added로 보낸다.
+    """
+    version, diff = diff_snapshot(
+        snapshot_key(request), {"nodes": result["nodes"], "edges": result["edges"]}, since
+    )
+    result["version"] = version
+    if since is None:
+        return etag_response(request, result)
+
+    nodes, edges = result.pop("nodes"), result.pop("edges")
+    positions = result.pop("positions", None)
+    body = {**result, "since": since, "reset": diff is None}
+    if diff is None:
+        diff = {
+            "nodes": {"added": nodes, "removed": [], "changed": []},
+            "edges": {"added": edges, "removed": [], "changed": []},
+        }
+    body.update(diff)
+    if positions is not None:
+        added = {n["id"] for n in diff["nodes"]["added"]}
+        body["positions"] = {k: v for k, v in positions.items() if k in added}
+    return etag_response(request, body)
+
+
+@router.get("")
+def get_topology(
+    request: Request,
+    node_id: Optional[str] = None,
+    layout: bool = False,
+    empty_networks: bool = False,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """
+    노드 ↔ 네트워크 ↔ 컨테이너 그래프 조회 (node_id를 생략하거나 *이면 전체 노드)
+
+    layout=true이면 계층형 레이아웃 좌표(positions)를 함께 반환하고,
+    empty_networks=true이면 연결된 컨테이너가 없는 네트워크도 포함한다.
+    since를 지정하면 해당 버전 이후 바뀐 요소만 반환한다.
+    """
+    if not node_id or node_id == "*":
+        return get_cluster_topology(request, layout=layout, empty_networks=empty_networks, since=since)
+    result = topology.get_node_topology(node_id, empty_networks=empty_networks, layout=layout)
+    return _topology_response(request, result, since)
+
+
+@router.get("/all")
+def get_cluster_topology(
+    request: Request,
+    layout: bool = False,
+    empty_networks: bool = False,
+    timeout: float = CLUSTER_LIST_TIMEOUT,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """모든 노드의 토폴로지를 병합 (일부 노드 실패 시 partial=true)"""
+    timeout = min(max(timeout, 0.1), CLUSTER_LIST_TIMEOUT)
+    result = topology.get_cluster_topology(empty_networks=empty_networks, layout=layout, timeout=timeout)
+    return _topology_response(request, result, since)
+
+
+@router.get("/stats")
+def get_topology_stats():
+    """토폴로지 캐시 통계 (조회/적중/이벤트 반영 수)"""
+    return topology.get_topology_stats()
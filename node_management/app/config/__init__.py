@@ -1,4 +1,4 @@
 """설정 모듈"""
-from . import settings, server_manager
+from . import settings, registry, server_manager
 
-__all__ = ['settings', 'server_manager']
+__all__ = ['settings', 'registry', 'server_manager']
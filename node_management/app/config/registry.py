@@ -0,0 +1,350 @@
+"""노드 레지스트리 저장소 백엔드
+
+- YamlRegistry: 기존 servers.yaml. 쓰기는 파일 잠금 아래에서 읽고 수정한 뒤
+  임시 파일로 쓰고 원자적으로 교체한다 (여러 워커가 동시에 써도 유실 없음).
+- SqliteRegistry: WAL 모드 SQLite. 노드 단위 추가/수정/삭제와 낙관적 동시성 제어용
+  version 컬럼을 사용하므로 변경 비용이 전체 노드 수와 무관하다.
+
+모든 쓰기 메서드는 (쓰기 직전 시그니처, 쓰기 후 시그니처)를 반환한다. 호출자는
+직전 시그니처가 자신이 캐시한 값과 같으면 변경분만 캐시에 반영할 수 있다.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+import yaml
+from fastapi import HTTPException
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내 잠금만 사용
+    fcntl = None
+
+# SQLite 전용 컬럼으로 저장하는 필드 (나머지는 extra JSON)
+_COLUMNS = ("base_url", "label", "type", "role", "tls")
+
+
+def default_servers() -> dict:
+    """기본 서버 설정 (중앙 서버만 포함)"""
+    return {
+        "main": {
+            "base_url": "unix://var/run/docker.sock",
+            "label": "중앙 서버",
+            "type": "local",
+            "role": "central"
+        }
+    }
+
+
+def config_version(cfg: dict) -> int:
+    """버전 컬럼이 없는 저장소(YAML)에서 쓰는 내용 기반 버전"""
+    return zlib.crc32(json.dumps(cfg, sort_keys=True, ensure_ascii=False).encode())
+
+
+def _already_exists(node_id: str):
+    return HTTPException(status_code=400, detail=f"서버 ID '{node_id}'가 이미 존재합니다")
+
+
+def _not_found():
+    return HTTPException(status_code=404, detail="서버를 찾을 수 없습니다")
+
+
+def _version_conflict(current: int):
+    return HTTPException(
+        status_code=409,
+        detail=f"다른 요청이 먼저 서버 설정을 변경했습니다 (현재 버전: {current})",
+    )
+
+
+def parse_servers_yaml(text: str) -> dict:
+    """YAML 텍스트를 검증하여 서버 설정 dict로 변환"""
+    try:
+        data = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise HTTPException(status_code=400, detail=f"YAML 형식 오류: {e}")
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="서버 ID를 키로 하는 매핑이어야 합니다")
+    for node_id, cfg in data.items():
+        if not isinstance(cfg, dict) or not cfg.get("base_url"):
+            raise HTTPException(status_code=400, detail=f"서버 '{node_id}'에 base_url이 없습니다")
+    return {str(k): v for k, v in data.items()}
+
+
+def dump_servers_yaml(servers: dict) -> str:
+    return yaml.dump(servers, allow_unicode=True, default_flow_style=False, sort_keys=False)
+
+
+class YamlRegistry:
+    """servers.yaml 파일 저장소"""
+
+    name = "yaml"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def signature(self):
+        """변경 감지용 (st_ino, st_mtime_ns, st_size), 파일이 없으면 None"""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def normalize(cfg: dict) -> dict:
+        """저장 후 다시 읽었을 때의 형태 (YAML은 그대로)"""
+        return dict(cfg)
+
+    def read(self) -> dict:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        # YAML이 None을 반환할 수 있음
+        return data if data is not None else {}
+
+    def versions(self) -> dict:
+        return {node_id: config_version(cfg) for node_id, cfg in self.read().items()}
+
+    @contextmanager
+    def _locked(self):
+        """프로세스 내 + 프로세스 간(flock) 쓰기 잠금"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            lock_path = self.path.with_name(self.path.name + ".lock")
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, servers: dict):
+        """임시 파일에 쓴 뒤 os.replace로 교체 (읽는 쪽은 항상 완전한 파일을 본다)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(dump_servers_yaml(servers))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _modify(self, fn):
+        with self._locked():
+            before = self.signature()
+            servers = self.read() if before is not None else {}
+            fn(servers)
+            self._write(servers)
+            return before, self.signature()
+
+    def _check_version(self, servers: dict, node_id: str, expected_version):
+        if node_id not in servers:
+            raise _not_found()
+        current = config_version(servers[node_id])
+        if expected_version is not None and expected_version != current:
+            raise _version_conflict(current)
+
+    def replace_all(self, servers: dict):
+        def fn(current):
+            current.clear()
+            current.update(servers)
+        return self._modify(fn)
+
+    def insert(self, node_id: str, cfg: dict):
+        def fn(servers):
+            if node_id in servers:
+                raise _already_exists(node_id)
+            servers[node_id] = cfg
+        return self._modify(fn)
+
+    def update(self, node_id: str, cfg: dict, expected_version=None, new_id: str = None):
+        def fn(servers):
+            self._check_version(servers, node_id, expected_version)
+            if new_id and new_id != node_id:
+                if new_id in servers:
+                    raise _already_exists(new_id)
+                # 순서를 유지하면서 키 교체
+                items = [(new_id if k == node_id else k, cfg if k == node_id else v) for k, v in servers.items()]
+                servers.clear()
+                servers.update(items)
+            else:
+                servers[node_id] = cfg
+        return self._modify(fn)
+
+    def delete(self, node_id: str, expected_version=None):
+        def fn(servers):
+            self._check_version(servers, node_id, expected_version)
+            del servers[node_id]
+        return self._modify(fn)
+
+
+class SqliteRegistry:
+    """WAL 모드 SQLite 저장소 (노드 단위 추가/수정/삭제, 낙관적 버전 관리)"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS nodes (
+        id TEXT PRIMARY KEY,
+        position INTEGER NOT NULL,
+        base_url TEXT NOT NULL,
+        label TEXT NOT NULL,
+        type TEXT NOT NULL DEFAULT 'remote',
+        role TEXT NOT NULL DEFAULT 'client',
+        tls INTEGER NOT NULL DEFAULT 0,
+        extra TEXT NOT NULL DEFAULT '{}',
+        version INTEGER NOT NULL DEFAULT 1,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS nodes_position ON nodes(position);
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+    """
+
+    def __init__(self, path, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 연결 (autocommit, 트랜잭션은 명시적으로 시작)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션: 시작 시 쓰기 잠금을 잡고 revision을 1 올린다"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self._revision(conn)
+            yield conn
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._local.last = (before, before + 1)
+
+    @staticmethod
+    def _revision(conn) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    def signature(self):
+        """변경 감지용 revision (쓰기 트랜잭션마다 1씩 증가)"""
+        return self._revision(self._conn())
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM nodes LIMIT 1").fetchone() is None
+
+    @staticmethod
+    def _row_values(cfg: dict) -> dict:
+        extra = {k: v for k, v in cfg.items() if k not in _COLUMNS}
+        return {
+            "base_url": cfg.get("base_url", ""),
+            "label": cfg.get("label", ""),
+            "type": cfg.get("type", "remote"),
+            "role": cfg.get("role", "client"),
+            "tls": int(bool(cfg.get("tls", False))),
+            "extra": json.dumps(extra, ensure_ascii=False),
+            "updated_at": time.time(),
+        }
+
+    @staticmethod
+    def _row_config(row) -> dict:
+        base_url, label, type_, role, tls, extra = row
+        cfg = {"base_url": base_url, "label": label, "type": type_, "role": role, "tls": bool(tls)}
+        cfg.update(json.loads(extra))
+        return cfg
+
+    @classmethod
+    def normalize(cls, cfg: dict) -> dict:
+        """저장 후 다시 읽었을 때의 형태 (기본값이 채워진 컬럼 포함)"""
+        values = cls._row_values(cfg)
+        return cls._row_config((values["base_url"], values["label"], values["type"],
+                                values["role"], values["tls"], values["extra"]))
+
+    def read(self) -> dict:
+        rows = self._conn().execute(
+            "SELECT id, base_url, label, type, role, tls, extra FROM nodes ORDER BY position"
+        ).fetchall()
+        return {row[0]: self._row_config(row[1:]) for row in rows}
+
+    def versions(self) -> dict:
+        return dict(self._conn().execute("SELECT id, version FROM nodes").fetchall())
+
+    def _current_version(self, conn, node_id: str, expected_version):
+        row = conn.execute("SELECT version FROM nodes WHERE id = ?", (node_id,)).fetchone()
+        if row is None:
+            raise _not_found()
+        if expected_version is not None and expected_version != row[0]:
+            raise _version_conflict(row[0])
+        return row[0]
+
+    def replace_all(self, servers: dict):
+        with self._transaction() as conn:
+            # 버전은 이어서 증가시켜 교체 전에 읽은 버전으로는 수정할 수 없게 한다
+            versions = dict(conn.execute("SELECT id, version FROM nodes").fetchall())
+            conn.execute("DELETE FROM nodes")
+            for position, (node_id, cfg) in enumerate(servers.items(), start=1):
+                conn.execute(
+                    "INSERT INTO nodes (id, position, base_url, label, type, role, tls, extra, version, updated_at) "
+                    "VALUES (:id, :position, :base_url, :label, :type, :role, :tls, :extra, :version, :updated_at)",
+                    {"id": node_id, "position": position, "version": versions.get(node_id, 0) + 1,
+                     **self._row_values(cfg)},
+                )
+        return self._local.last
+
+    def insert(self, node_id: str, cfg: dict):
+        with self._transaction() as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO nodes (id, position, base_url, label, type, role, tls, extra, updated_at) "
+                    "VALUES (:id, (SELECT COALESCE(MAX(position), 0) + 1 FROM nodes), "
+                    ":base_url, :label, :type, :role, :tls, :extra, :updated_at)",
+                    {"id": node_id, **self._row_values(cfg)},
+                )
+            except sqlite3.IntegrityError:
+                raise _already_exists(node_id)
+        return self._local.last
+
+    def update(self, node_id: str, cfg: dict, expected_version=None, new_id: str = None):
+        with self._transaction() as conn:
+            version = self._current_version(conn, node_id, expected_version)
+            params = {"id": node_id, "new_id": new_id or node_id, "version": version, **self._row_values(cfg)}
+            try:
+                conn.execute(
+                    "UPDATE nodes SET id = :new_id, base_url = :base_url, label = :label, type = :type, "
+                    "role = :role, tls = :tls, extra = :extra, updated_at = :updated_at, "
+                    "version = version + 1 WHERE id = :id AND version = :version",
+                    params,
+                )
+            except sqlite3.IntegrityError:
+                raise _already_exists(new_id)
+        return self._local.last
+
+    def delete(self, node_id: str, expected_version=None):
+        with self._transaction() as conn:
+            version = self._current_version(conn, node_id, expected_version)
+            conn.execute("DELETE FROM nodes WHERE id = ? AND version = ?", (node_id, version))
+        return self._local.last
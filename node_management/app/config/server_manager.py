@@ -1,50 +1,258 @@
-"""서버 설정 파일 관리"""
-from .settings import SERVERS_FILE
+"""서버 설정(노드 레지스트리) 관리
+
+저장소는 REGISTRY_BACKEND로 선택한다 (yaml: servers.yaml, sqlite: WAL 모드 SQLite).
+읽기는 프로세스 내 캐시를 사용하고, 저장소 시그니처(파일 inode/mtime/size 또는
+SQLite revision)가 바뀐 경우에만 다시 읽는다. 감시 스레드가 실행 중이면 읽기
+경로에서는 저장소 I/O 없이 캐시만 사용한다.
+
+노드 추가/수정/삭제는 노드 단위로 저장소에 반영하며, 다른 워커의 변경이 끼어들지
+않았다면 캐시도 변경분만 갱신한다.
+"""
+from .settings import SERVERS_FILE, CONFIG_POLL_INTERVAL, REGISTRY_BACKEND, REGISTRY_DB_FILE
+from .registry import (
+    YamlRegistry,
+    SqliteRegistry,
+    default_servers,
+    parse_servers_yaml,
+    dump_servers_yaml,
+)
+import copy
+import threading
 import yaml
 from fastapi import HTTPException
 
+# 설정 캐시 상태
+_registry = None
+_cache = None
+_signature = None  # 저장소가 반환한 변경 감지 시그니처
+_version = 0
+_lock = threading.RLock()
+_stats = {"reloads": 0, "writes": 0}
+
+# 변경 감시 스레드
+_watcher = None
+_watcher_stop = threading.Event()
+
+
+def _default_servers():
+    """기본 서버 설정 (중앙 서버만 포함)"""
+    return default_servers()
+
+
+def _get_registry():
+    """설정된 저장소 백엔드 (처음 호출 시 생성)"""
+    global _registry
+    with _lock:
+        if _registry is None:
+            if REGISTRY_BACKEND == "sqlite":
+                registry = SqliteRegistry(REGISTRY_DB_FILE)
+                if registry.is_empty():
+                    # 처음 전환할 때 기존 servers.yaml을 가져온다
+                    registry.replace_all(_initial_servers())
+                _registry = registry
+            else:
+                _registry = YamlRegistry(SERVERS_FILE)
+        return _registry
+
+
+def _initial_servers() -> dict:
+    if not SERVERS_FILE.exists():
+        return _default_servers()
+    try:
+        with open(SERVERS_FILE, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        if data:
+            return data
+    except (yaml.YAMLError, IOError) as e:
+        print(f"서버 설정 파일 로드 오류: {e}")
+    return _default_servers()
+
+
+def _set_cache(servers: dict, signature):
+    global _cache, _signature, _version
+    _cache = servers
+    _signature = signature
+    _version += 1
+
+
+def _reload_if_changed() -> bool:
+    """저장소가 바뀌었으면 다시 읽어 캐시 갱신"""
+    with _lock:
+        registry = _get_registry()
+        signature = registry.signature()
+        if _cache is not None and signature == _signature:
+            return False
+
+        if signature is None:
+            # 기본값 생성
+            save_servers(_default_servers())
+            return True
 
-def load_servers():
-    """서버 설정 로드"""
-    if SERVERS_FILE.exists():
         try:
-            with open(SERVERS_FILE, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                # YAML이 None을 반환할 수 있음
-                return data if data is not None else {}
+            data = registry.read()
         except (yaml.YAMLError, IOError) as e:
             print(f"서버 설정 파일 로드 오류: {e}")
             # 기본값 반환
-            default = {
-                "main": {
-                    "base_url": "unix://var/run/docker.sock",
-                    "label": "중앙 서버",
-                    "type": "local",
-                    "role": "central"
-                }
-            }
-            save_servers(default)
-            return default
+            save_servers(_default_servers())
+            return True
+
+        _set_cache(data, signature)
+        _stats["reloads"] += 1
+        return True
+
+
+def _ensure_fresh():
+    """감시 스레드가 없으면 호출 시점에 저장소 변경을 확인"""
+    if _cache is None or not is_config_watcher_running():
+        _reload_if_changed()
+
+
+def _after_write(signatures, apply):
+    """
+    쓰기 후 캐시 갱신
+
+    쓰기 직전 시그니처가 캐시와 같으면(중간에 다른 워커의 변경 없음) apply로
+    변경분만 반영하고, 아니면 저장소에서 전체를 다시 읽는다.
+    """
+    before, after = signatures
+    _stats["writes"] += 1
+    if _cache is not None and before == _signature:
+        servers = _cache if apply is None else apply(dict(_cache))
+        _set_cache(servers, after)
     else:
-        # 기본값 생성
-        default = {
-            "main": {
-                "base_url": "unix://var/run/docker.sock",
-                "label": "중앙 서버",
-                "type": "local",
-                "role": "central"
+        _reload_if_changed()
+
+
+def load_servers():
+    """서버 설정 로드 (캐시 사본 반환)"""
+    _ensure_fresh()
+    with _lock:
+        return copy.deepcopy(_cache)
+
+
+def save_servers(servers: dict):
+    """서버 설정 전체 저장 (전체 교체)"""
+    with _lock:
+        try:
+            signatures = _get_registry().replace_all(servers)
+        except (IOError, OSError) as e:
+            print(f"서버 설정 파일 저장 오류: {e}")
+            raise HTTPException(status_code=500, detail=f"서버 설정 저장 실패: {e}")
+        # 방금 쓴 내용으로 캐시를 직접 갱신 (다시 읽지 않음)
+        registry = _get_registry()
+        _after_write(
+            (_signature, signatures[1]),
+            lambda _: {k: registry.normalize(v) for k, v in servers.items()},
+        )
+
+
+def insert_server(node_id: str, cfg: dict):
+    """노드 추가 (이미 있으면 400)"""
+    with _lock:
+        _ensure_fresh()  # 저장소가 없으면 기본값부터 생성
+        signatures = _get_registry().insert(node_id, cfg)
+
+        def apply(servers):
+            servers[node_id] = _get_registry().normalize(cfg)
+            return servers
+        _after_write(signatures, apply)
+
+
+def update_server(node_id: str, cfg: dict, expected_version: int = None, new_id: str = None):
+    """
+    노드 수정 (new_id를 주면 ID 변경)
+
+    expected_version이 현재 버전과 다르면 409를 반환한다 (낙관적 동시성 제어).
+    """
+    with _lock:
+        _ensure_fresh()
+        signatures = _get_registry().update(node_id, cfg, expected_version, new_id)
+        target = new_id or node_id
+
+        def apply(servers):
+            # 순서를 유지하면서 교체
+            return {
+                (target if k == node_id else k): (_get_registry().normalize(cfg) if k == node_id else v)
+                for k, v in servers.items()
             }
+        _after_write(signatures, apply)
+
+
+def delete_server(node_id: str, expected_version: int = None):
+    """노드 삭제 (expected_version이 현재 버전과 다르면 409)"""
+    with _lock:
+        _ensure_fresh()
+        signatures = _get_registry().delete(node_id, expected_version)
+
+        def apply(servers):
+            servers.pop(node_id, None)
+            return servers
+        _after_write(signatures, apply)
+
+
+def get_server_versions() -> dict:
+    """node_id -> 버전 (수정/삭제 요청의 version 값으로 사용)"""
+    return _get_registry().versions()
+
+
+def export_servers_yaml() -> str:
+    """현재 설정을 servers.yaml 형식으로 내보내기"""
+    return dump_servers_yaml(load_servers())
+
+
+def import_servers_yaml(text: str) -> int:
+    """servers.yaml 형식 텍스트로 전체 설정 교체, 가져온 노드 수 반환"""
+    servers = parse_servers_yaml(text)
+    save_servers(servers)
+    return len(servers)
+
+
+def get_config_version() -> int:
+    """설정 버전 (변경될 때마다 증가, 다른 캐시의 키로 사용)"""
+    _ensure_fresh()
+    return _version
+
+
+def get_config_stats() -> dict:
+    """설정 캐시 통계"""
+    with _lock:
+        return {
+            **_stats,
+            "version": _version,
+            "watching": is_config_watcher_running(),
+            "backend": _registry.name if _registry is not None else REGISTRY_BACKEND,
         }
-        save_servers(default)
-        return default
 
 
-def save_servers(servers: dict):
-    """서버 설정 저장"""
-    try:
-        with open(SERVERS_FILE, 'w', encoding='utf-8') as f:
-            yaml.dump(servers, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
-    except IOError as e:
-        print(f"서버 설정 파일 저장 오류: {e}")
-        raise HTTPException(status_code=500, detail=f"서버 설정 저장 실패: {e}")
+def _watch_loop(interval: float):
+    while not _watcher_stop.wait(interval):
+        try:
+            _reload_if_changed()
+        except Exception as e:
+            print(f"서버 설정 감시 오류: {e}")
+
+
+def is_config_watcher_running() -> bool:
+    return _watcher is not None and _watcher.is_alive()
+
+
+def start_config_watcher(interval: float = CONFIG_POLL_INTERVAL):
+    """저장소 변경 감시 스레드 시작"""
+    global _watcher
+    if is_config_watcher_running():
+        return
+    _reload_if_changed()
+    _watcher_stop.clear()
+    _watcher = threading.Thread(
+        target=_watch_loop, args=(interval,), name="config-watcher", daemon=True
+    )
+    _watcher.start()
+
 
+def stop_config_watcher():
+    """저장소 변경 감시 스레드 종료"""
+    global _watcher
+    _watcher_stop.set()
+    if _watcher is not None:
+        _watcher.join(timeout=5)
+        _watcher = None
@@ -1,4 +1,5 @@
 """애플리케이션 설정 상수"""
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent
@@ -6,3 +7,134 @@ CONFIG_DIR = BASE_DIR / "config"
 CONFIG_DIR.mkdir(exist_ok=True)
 SERVERS_FILE = CONFIG_DIR / "servers.yaml"
 
+# 노드 레지스트리 저장소: "yaml"(servers.yaml) 또는 "sqlite"(여러 워커 동시 수정에 안전)
+REGISTRY_BACKEND = os.environ.get("FL_REGISTRY_BACKEND", "yaml")
+REGISTRY_DB_FILE = CONFIG_DIR / "registry.db"
+
+
+# Docker 클라이언트 커넥션 풀 설정
+DOCKER_MAX_POOL_SIZE = 10  # 노드당 keep-alive HTTP 커넥션 수
+DOCKER_CONNECT_TIMEOUT = 3.0  # 클라이언트 생성(API 버전 협상) 제한 시간(초), fan-out 노드별 제한 시간보다 짧게
+DOCKER_CALL_TIMEOUT = 60  # 생성 후 API 호출 기본 제한 시간(초, docker-py 기본값, 이미지 전송 등 긴 호출 포함)
+
+# 동일 Docker 조회 합치기 (single-flight) 설정
+DOCKER_COALESCE_ENABLED = True  # 같은 (노드, 작업, 인자)로 동시에 들어온 조회는 업스트림 호출 하나를 공유
+DOCKER_MICRO_CACHE_TTL = 0.5  # 끝난 조회 결과를 재사용하는 시간(초), 0이면 사용 안 함 (이벤트 수신 시 무효화)
+DOCKER_FINGERPRINT_MAX_KEYS = 1024  # 내용 지문(ETag용)을 보관할 조회 조건 수 상한 (오래 안 쓴 것부터 제거)
+
+# 노드 fan-out 설정 (상태 점검, 전체 컨테이너 조회 등)
+NODE_FANOUT_WORKERS = 32  # 노드 동시 호출 스레드 수 상한
+NODE_PING_TIMEOUT = 3.0  # 노드별 ping 제한 시간(초)
+STATUS_TOTAL_TIMEOUT = 5.0  # 전체 상태 조회 제한 시간(초)
+
+# 노드별 서킷 브레이커 설정
+BREAKER_FAILURE_THRESHOLD = 3  # 연속 연결 실패가 이 횟수에 도달하면 차단
+BREAKER_BACKOFF_BASE = 2.0  # 첫 차단 시간(초), 재차단마다 2배
+BREAKER_BACKOFF_MAX = 60.0  # 최대 차단 시간(초)
+BREAKER_BACKOFF_JITTER = 0.2  # 차단 시간 무작위 편차 비율 (±20%)
+
+# 백그라운드 상태 모니터 설정
+HEALTH_CHECK_INTERVAL = 10.0  # 점검 주기(초)
+HEALTH_CHECK_JITTER = 0.2  # 주기 대비 무작위 편차 비율 (±20%)
+HEALTH_STALE_AFTER = 30.0  # 이 시간(초)보다 오래된 결과는 stale로 표시
+
+# 서버 설정 파일 변경 감시 주기(초)
+CONFIG_POLL_INTERVAL = 2.0
+
+# 이미지 ID -> 태그 캐시 유효 시간(초)
+IMAGE_CACHE_TTL = 300.0
+
+# 실시간 이벤트 스트림(SSE) 설정
+EVENT_QUEUE_SIZE = 1000  # 구독자별 대기 이벤트 상한 (초과 시 resync)
+EVENT_RECONCILE_INTERVAL = 5.0  # 노드별 이벤트 구독 동기화 주기(초)
+EVENT_RETRY_MAX = 30.0  # 이벤트 스트림 재연결 최대 대기(초)
+SSE_HEARTBEAT_INTERVAL = 15.0  # SSE keep-alive 주석 전송 주기(초)
+
+# 전체 노드 컨테이너 조회 제한 시간(초)
+CLUSTER_LIST_TIMEOUT = 10.0
+
+# 목록 API diff(since=버전) 모드 설정
+DIFF_HISTORY_SIZE = 16  # 조회 조건별로 보관할 이전 스냅샷 수 (이보다 오래된 since는 전체 재전송)
+DIFF_MAX_KEYS = 256  # 스냅샷을 보관할 조회 조건 수 상한 (오래 안 쓴 것부터 제거)
+
+# 이미지 배포(중앙 노드 save -> 클라이언트 노드 load) 설정
+IMAGE_DIST_CONCURRENCY = 4  # 기본 동시 전송 노드 수
+IMAGE_DIST_MAX_CONCURRENCY = 16  # 요청으로 지정할 수 있는 동시 전송 상한 (중앙 노드 디스크/업링크 보호)
+IMAGE_DIST_CHUNK_SIZE = 1024 * 1024  # docker save 스트림을 읽는 단위(바이트)
+IMAGE_DIST_PROGRESS_INTERVAL = 1.0  # 전송/pull 진행 이벤트 최소 간격(초)
+
+# FL 배포(SuperLink/SuperNode) 오케스트레이터 설정
+DEPLOY_CONCURRENCY = 64  # 기본 동시 실행 단계 수 (준비 확인 동안 대기만 하므로 사일로 수만큼 넉넉하게)
+DEPLOY_MAX_CONCURRENCY = 256  # 요청으로 지정할 수 있는 동시 실행 상한
+DEPLOY_NETWORK = "fl-net"  # 배포 컨테이너를 연결할 브리지 네트워크 (없으면 노드마다 생성)
+DEPLOY_READY_TIMEOUT = 60.0  # 단계별 준비 확인 제한 시간(초)
+DEPLOY_READY_INTERVAL = 0.5  # 준비 확인 주기(초)
+DEPLOY_READY_MIN_UPTIME = 2.0  # 기본 준비 조건: 시작 후 이 시간(초) 동안 running 유지
+FL_SUPERLINK_IMAGE = "flwr/superlink:1.23.0"
+FL_SUPERNODE_IMAGE = "flwr/supernode:1.23.0"
+FL_FLEET_PORT = 9092  # SuperNode가 접속하는 SuperLink Fleet API 포트
+FL_SUPERLINK_PORTS = {"9091/tcp": 9091, "9092/tcp": 9092, "9093/tcp": 9093}  # ServerAppIo, Fleet, Control API
+
+# 네트워크 토폴로지 캐시 설정
+TOPOLOGY_CACHE_TTL = 300.0  # 이벤트로 갱신되더라도 이 시간(초)이 지나면 다시 조회 (놓친 이벤트 보정)
+
+# 일괄 컨테이너 작업 동시 실행 상한
+BULK_MAX_CONCURRENCY = 16  # 전체
+BULK_NODE_CONCURRENCY = 4  # 노드별
+
+# 비동기 Docker 클라이언트 설정
+ASYNC_DOCKER_MAX_CONNECTIONS = 50  # 노드당 최대 동시 커넥션 수
+ASYNC_DOCKER_TIMEOUT = 30.0  # 요청 기본 제한 시간(초)
+
+# 컨테이너 로그 스트리밍 설정
+LOGS_DEFAULT_TAIL = 200  # 기본 tail 줄 수
+LOGS_MAX_LINE_BYTES = 64 * 1024  # 줄바꿈 없이 이 크기를 넘으면 잘라서 전달
+LOGS_MAX_TARGETS = 20  # 병합 조회 최대 컨테이너 수
+LOGS_MERGE_WINDOW = 0.25  # follow 병합 시 출력 없는 스트림을 기다리는 시간(초)
+LOGS_QUEUE_SIZE = 256  # 병합 시 스트림별 대기 줄 수 상한 (초과 시 업스트림 읽기 일시 정지)
+LOGS_DISCONNECT_POLL = 1.0  # 출력이 없을 때 클라이언트 연결 종료 확인 주기(초)
+
+# 여러 컨테이너 동시 명령 실행(exec) 설정
+EXEC_CONCURRENCY = 32  # 기본 동시 실행 컨테이너 수
+EXEC_MAX_CONCURRENCY = 128  # 요청으로 지정할 수 있는 동시 실행 상한
+EXEC_TIMEOUT = 30.0  # 컨테이너별 기본 제한 시간(초)
+EXEC_MAX_TIMEOUT = 600.0  # 요청으로 지정할 수 있는 제한 시간 상한(초)
+EXEC_MAX_TARGETS = 500  # 한 번에 실행할 수 있는 최대 컨테이너 수
+EXEC_MAX_OUTPUT_BYTES = 1024 * 1024  # 컨테이너별 전달할 최대 출력 크기 (넘으면 나머지는 버림)
+EXEC_QUEUE_SIZE = 1024  # 응답으로 보내기 전 대기할 출력 줄 수 상한 (초과 시 업스트림 읽기 일시 정지)
+
+# 컨테이너 리소스 통계 수집 설정
+STATS_ENABLED = True
+STATS_INTERVAL = 10.0  # 수집 주기(초)
+STATS_WORKERS = 16  # stats 동시 조회 스레드 수
+STATS_RAW_POINTS = 360  # 원본 샘플 보관 수 (10초 간격 1시간)
+STATS_ROLLUP_POINTS = 1008  # 롤업 보관 수 (1분: 16.8시간, 10분: 7일)
+STATS_EVICT_AFTER = 3600.0  # 이 시간(초) 동안 수집되지 않은 컨테이너 시계열 삭제
+STATS_MEMORY_BUDGET = 256 * 1024 * 1024  # 시계열 버퍼 메모리 상한 (바이트)
+# 시계열 하나가 가득 찼을 때 크기: (원본 + 롤업 2종) 포인트 x (시간 + 필드 7개) x 8바이트 ≈ 152KB
+STATS_SERIES_BYTES = (STATS_RAW_POINTS + 2 * STATS_ROLLUP_POINTS) * 8 * 8
+STATS_MAX_SERIES = STATS_MEMORY_BUDGET // STATS_SERIES_BYTES  # 최대 컨테이너 시계열 수 (약 1760개)
+
+# 컨테이너 이벤트 저널 (SQLite) 설정
+JOURNAL_ENABLED = True
+JOURNAL_DB_FILE = CONFIG_DIR / "events.db"
+JOURNAL_QUEUE_SIZE = 50000  # 기록 대기 이벤트 상한 (초과분은 버리고 dropped로 집계)
+JOURNAL_BATCH_SIZE = 500  # 트랜잭션 하나로 넣는 최대 이벤트 수
+JOURNAL_FLUSH_INTERVAL = 0.5  # 첫 이벤트를 받은 뒤 배치를 모으는 최대 시간(초)
+JOURNAL_RETENTION = 7 * 86400  # 이벤트 보관 기간(초)
+JOURNAL_COMPACT_INTERVAL = 3600.0  # 보관 기간 정리 및 빈 페이지 반환 주기(초)
+JOURNAL_DELETE_CHUNK = 5000  # 정리할 때 트랜잭션 하나에서 지우는 행 수 (쓰기 잠금 시간 제한)
+JOURNAL_QUERY_LIMIT = 1000  # 조회 기본 행 수
+JOURNAL_MAX_QUERY_LIMIT = 10000  # 조회 최대 행 수
+
+# 관리자 토큰 (FL_ADMIN_TOKEN 환경 변수가 없으면 관리자 전용 API 전체 비활성화)
+ADMIN_TOKEN = os.environ.get("FL_ADMIN_TOKEN")
+
+# 관리자 프로파일링 설정
+PROFILE_MAX_SECONDS = 60.0  # 샘플링 프로파일 최대 시간(초)
+PROFILE_INTERVAL = 0.01  # 기본 샘플링 간격(초, 100Hz)
+PROFILE_MIN_INTERVAL = 0.001  # 요청으로 지정할 수 있는 최소 샘플링 간격(초)
+PROFILE_MAX_INTERVAL = 1.0  # 요청으로 지정할 수 있는 최대 샘플링 간격(초)
+PROFILE_TRACE_HISTORY = 200  # 보관할 요청 트레이스 수
+PROFILE_TRACE_MAX_SECONDS = 3600.0  # 요청 트레이스를 켜 둘 수 있는 최대 시간(초)
+PROFILE_TRACE_MAX_SPANS = 2000  # 요청 하나에 기록하는 최대 span 수
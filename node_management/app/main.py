@@ -1,12 +1,44 @@
 """FastAPI 애플리케이션 진입점"""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
-from api import nodes, containers
+from api import nodes, containers, stream, aio, metrics, topology, images, deployments, journal, profiling
 from services.docker_service import get_docker_hosts
+from services import health_monitor, event_hub, async_docker, stats_collector, event_journal
+from services.metrics import RequestMetricsMiddleware
+from services.profiler import ProfilingMiddleware
+from config.server_manager import start_config_watcher, stop_config_watcher
+from config.settings import STATS_ENABLED, JOURNAL_ENABLED
 
-app = FastAPI(title="FL Container Dashboard")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """백그라운드 작업 시작/종료"""
+    start_config_watcher()
+    if JOURNAL_ENABLED:
+        event_journal.start()
+    event_hub.start()
+    health_monitor.start()
+    if STATS_ENABLED:
+        stats_collector.start()
+    yield
+    await stats_collector.stop()
+    await health_monitor.stop()
+    await event_hub.stop()
+    await event_journal.stop()
+    await async_docker.close_all()
+    stop_config_watcher()
+
+
+app = FastAPI(title="FL Container Dashboard", lifespan=lifespan)
+# 큰 목록 응답 압축 (SSE는 미들웨어가 자동 제외)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+app.add_middleware(RequestMetricsMiddleware)
+# 관리자가 트레이스를 켠 경로의 요청만 span 기록 (꺼져 있으면 바로 통과)
+app.add_middleware(ProfilingMiddleware)
 
 # 정적 파일 및 템플릿 설정
 BASE_DIR = Path(__file__).parent.parent
@@ -16,6 +48,14 @@ app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="stat
 # API 라우터 등록
 app.include_router(nodes.router)
 app.include_router(containers.router)
+app.include_router(stream.router)
+app.include_router(aio.router)
+app.include_router(metrics.router)
+app.include_router(topology.router)
+app.include_router(images.router)
+app.include_router(deployments.router)
+app.include_router(journal.router)
+app.include_router(profiling.router)
 
 
 @app.get("/")
@@ -1,4 +1,5 @@
 """Pydantic 모델 정의"""
+from typing import Dict, List, Literal, Optional, Union
 from pydantic import BaseModel
 
 
@@ -9,9 +10,96 @@ class ServerConfig(BaseModel):
     # type 필드 제거 - 역할에 따라 자동 결정됨
     # role 필드 제거 - 새로 추가하는 서버는 항상 "client"
     tls: bool = False
+    # 수정 시 조회했던 버전 (지정하면 그 사이 다른 변경이 있을 때 409)
+    version: Optional[int] = None
 
 
 class ContainerAction(BaseModel):
     node_id: str
     container_id: str
 
+
+
+class BulkActionItem(BaseModel):
+    node_id: str
+    action: Literal["start", "stop", "restart"]
+    # container_id 또는 라벨 셀렉터("key=value" / "key") 중 하나 지정
+    container_id: Optional[str] = None
+    label: Optional[str] = None
+
+
+class BulkActionRequest(BaseModel):
+    items: List[BulkActionItem]
+    concurrency: Optional[int] = None  # 전체 동시 실행 수 (기본값: 설정값)
+    node_concurrency: Optional[int] = None  # 노드별 동시 실행 수 (기본값: 설정값)
+    stop_timeout: int = 10  # stop/restart 시 컨테이너 종료 대기 시간(초)
+
+
+class ImageDistributeRequest(BaseModel):
+    image: str
+    node_ids: Optional[List[str]] = None  # 생략하면 모든 클라이언트 노드
+    source_node_id: Optional[str] = None  # 생략하면 중앙 노드(role: central)
+    pull: bool = True  # 중앙 노드에서 먼저 pull
+    force: bool = False  # 대상 노드에 이미 있어도 레이어를 빼지 않고 전체 전송
+    concurrency: Optional[int] = None  # 동시에 전송할 노드 수 (기본값: 설정값)
+
+
+class ReadinessCheck(BaseModel):
+    # 지정한 조건을 모두 만족해야 다음 단계로 진행 (running 상태는 항상 확인)
+    log_pattern: Optional[str] = None  # 로그에 이 문자열이 나타나야 함
+    tcp_port: Optional[int] = None  # 노드 호스트의 이 포트에 TCP 연결이 되어야 함
+    min_uptime: Optional[float] = None  # 시작 후 이 시간(초) 동안 running 유지 (기본값: 설정값)
+    timeout: Optional[float] = None  # 준비 확인 제한 시간(초) (기본값: 설정값)
+
+
+class FlContainerSpec(BaseModel):
+    # command/environment 값의 {superlink}, {partition_id}, {num_partitions},
+    # {node_id}, {deployment}는 컨테이너마다 치환된다
+    image: Optional[str] = None
+    command: Optional[List[str]] = None
+    environment: Dict[str, str] = {}
+    ports: Optional[Dict[str, int]] = None  # 컨테이너 포트("9092/tcp") -> 호스트 포트
+    readiness: ReadinessCheck = ReadinessCheck()
+
+
+class SuperLinkSpec(FlContainerSpec):
+    node_id: Optional[str] = None  # 생략하면 중앙 노드(role: central)
+
+
+class SuperNodeSpec(FlContainerSpec):
+    node_ids: Optional[List[str]] = None  # 생략하면 모든 클라이언트 노드
+    per_node: int = 1  # 노드별 SuperNode 수
+
+
+class DeploymentRequest(BaseModel):
+    name: str  # 컨테이너 이름 접두사와 fl.deployment 라벨 값
+    superlink: SuperLinkSpec = SuperLinkSpec()
+    supernodes: SuperNodeSpec = SuperNodeSpec()
+    network: Optional[str] = None  # 기본값: 설정값
+    superlink_address: Optional[str] = None  # 다른 노드의 SuperNode가 접속할 주소 (기본값: 중앙 노드 호스트)
+    pull: Literal["missing", "always", "never"] = "missing"
+    concurrency: Optional[int] = None  # 동시 실행 단계 수 (기본값: 설정값)
+
+
+class ExecRequest(BaseModel):
+    # 문자열이면 sh -c로 실행
+    cmd: Union[str, List[str]]
+    # 대상 선택: targets("node_id:container")를 주면 그대로 사용하고,
+    # 아니면 node_ids/role로 노드를, name/label로 실행 중인 컨테이너를 고른다
+    targets: Optional[List[str]] = None
+    node_ids: Optional[List[str]] = None  # 생략하면 모든 노드
+    role: Optional[str] = None  # central / client
+    name: Optional[str] = None  # 컨테이너 이름 필터 (Docker name 필터)
+    label: Optional[str] = None  # 라벨 셀렉터 ("key=value" / "key", 쉼표로 여러 개)
+    env: Optional[Dict[str, str]] = None
+    workdir: Optional[str] = None
+    user: Optional[str] = None
+    concurrency: Optional[int] = None  # 동시 실행 컨테이너 수 (기본값: 설정값)
+    timeout: Optional[float] = None  # 컨테이너별 제한 시간(초) (기본값: 설정값)
+
+
+class TraceRequest(BaseModel):
+    # 요청 경로 패턴 (fnmatch, 예: "/api/nodes/status", "/api/containers*")
+    routes: List[str]
+    seconds: float = 300.0  # 트레이스를 켜 둘 시간(초)
+    max_requests: int = 100  # 이만큼 기록하면 자동으로 끈다
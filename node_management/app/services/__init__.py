@@ -1,4 +1,4 @@
 """서비스 모듈"""
-from . import docker_service
+from . import metrics, circuit_breaker, docker_service, container_service, async_docker, event_hub, health_monitor, stats_collector, log_stream, topology, image_distribution, fl_deployment, exec_service, event_journal, profiler
 
-__all__ = ['docker_service']
+__all__ = ['metrics', 'circuit_breaker', 'docker_service', 'container_service', 'async_docker', 'event_hub', 'health_monitor', 'stats_collector', 'log_stream', 'topology', 'image_distribution', 'fl_deployment', 'exec_service', 'event_journal', 'profiler']
@@ -0,0 +1,294 @@
+"""비동기 Docker 서비스 계층
+
+docker SDK는 동기 호출이라 요청마다 Starlette 스레드풀 슬롯을 하나씩 점유한다.
+여기서는 httpx.AsyncClient로 Docker Engine API를 직접 호출하여 (unix 소켓/TCP)
+노드별 커넥션 풀 위에서 많은 요청을 이벤트 루프 하나로 다중화한다.
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import httpx
+from fastapi import HTTPException
+from services import circuit_breaker, profiler
+from services.docker_service import get_docker_hosts, get_connection_key
+from services.metrics import classify_operation, observe_docker_call
+from services.container_service import (
+    cached_image_tags,
+    store_image_tags,
+    summarize_container,
+)
+from config.settings import (
+    ASYNC_DOCKER_MAX_CONNECTIONS,
+    ASYNC_DOCKER_TIMEOUT,
+    NODE_PING_TIMEOUT,
+    CLUSTER_LIST_TIMEOUT,
+)
+
+# node_id -> AsyncDockerClient
+_async_clients = {}
+_async_stats = {"hits": 0, "misses": 0, "closed": 0}
+
+
+class DockerAPIError(Exception):
+    """Docker Engine API 오류 응답"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+def _build_transport(base_url: str, tls: bool):
+    """docker base_url을 httpx 전송 계층과 요청 URL로 변환"""
+    limits = httpx.Limits(
+        max_connections=ASYNC_DOCKER_MAX_CONNECTIONS,
+        max_keepalive_connections=ASYNC_DOCKER_MAX_CONNECTIONS,
+    )
+    if base_url.startswith("unix://"):
+        # docker SDK 관례: unix://var/run/docker.sock == /var/run/docker.sock
+        path = "/" + base_url[len("unix://"):].lstrip("/")
+        return httpx.AsyncHTTPTransport(uds=path, limits=limits), "http://docker"
+
+    parts = urlsplit(base_url)
+    if parts.scheme not in ("tcp", "http", "https"):
+        raise ValueError(f"지원하지 않는 Docker 주소 형식입니다: {base_url}")
+    scheme = "https" if tls or parts.scheme == "https" else "http"
+    return httpx.AsyncHTTPTransport(limits=limits), f"{scheme}://{parts.netloc}"
+
+
+class AsyncDockerClient:
+    """노드 하나에 대한 비동기 Docker Engine API 클라이언트 (keep-alive 풀 유지)"""
+
+    def __init__(self, base_url: str, tls: bool = False, timeout: float = ASYNC_DOCKER_TIMEOUT,
+                 node_id: str = ""):
+        transport, http_base = _build_transport(base_url, tls)
+        self.base_url = base_url
+        self.node_id = node_id
+        # 버전 접두사 없이 호출하면 데몬의 현재 API 버전이 사용되어 협상 왕복이 필요 없다
+        self._http = httpx.AsyncClient(base_url=http_base, transport=transport, timeout=timeout)
+
+    async def _send(self, request: httpx.Request, stream: bool = False) -> httpx.Response:
+        """요청 전송 (메트릭/서킷 브레이커 기록, 오류 응답은 DockerAPIError)"""
+        operation = classify_operation(request.method, request.url.path)
+        circuit_breaker.before_call(self.node_id)
+        started = time.perf_counter()
+        try:
+            response = await self._http.send(request, stream=stream)
+        except Exception as e:
+            observe_docker_call(self.node_id, operation, time.perf_counter() - started, True)
+            if isinstance(e, httpx.TransportError):
+                circuit_breaker.record_failure(self.node_id, str(e) or type(e).__name__)
+            raise
+        observe_docker_call(
+            self.node_id, operation, time.perf_counter() - started, response.status_code >= 400
+        )
+        circuit_breaker.record_success(self.node_id)
+        if response.status_code >= 400:
+            if stream:
+                await response.aread()
+                await response.aclose()
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise DockerAPIError(response.status_code, message)
+        return response
+
+    async def _request(self, method: str, path: str, timeout=None, **kwargs) -> httpx.Response:
+        extra = {"timeout": timeout} if timeout is not None else {}
+        return await self._send(self._http.build_request(method, path, **kwargs, **extra))
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, params=None, json=None):
+        """
+        본문을 읽지 않은 스트리밍 응답 (읽기 제한 시간 없음)
+
+        블록을 벗어나면(취소 포함) 업스트림 연결을 닫는다.
+        """
+        timeout = httpx.Timeout(ASYNC_DOCKER_TIMEOUT, read=None)
+        request = self._http.build_request(method, path, params=params, json=json, timeout=timeout)
+        response = await self._send(request, stream=True)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def get_json(self, path: str, params=None, timeout=None):
+        response = await self._request("GET", path, params=params, timeout=timeout)
+        return response.json()
+
+    async def ping(self, timeout: float = NODE_PING_TIMEOUT) -> bool:
+        await self._request("GET", "/_ping", timeout=timeout)
+        return True
+
+    async def version(self) -> dict:
+        return await self.get_json("/version")
+
+    async def containers(self, all: bool = True, filters: dict = None) -> list:
+        params = {"all": "1" if all else "0"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return await self.get_json("/containers/json", params=params)
+
+    async def inspect_container(self, container_id: str) -> dict:
+        return await self.get_json(f"/containers/{container_id}/json")
+
+    async def images(self) -> list:
+        return await self.get_json("/images/json", params={"all": "1"})
+
+    async def start(self, container_id: str):
+        await self._request("POST", f"/containers/{container_id}/start")
+
+    async def stop(self, container_id: str, timeout: int = 10):
+        # 컨테이너 종료 대기 시간만큼 HTTP 제한 시간을 늘린다
+        await self._request(
+            "POST", f"/containers/{container_id}/stop",
+            params={"t": timeout}, timeout=ASYNC_DOCKER_TIMEOUT + timeout,
+        )
+
+    async def restart(self, container_id: str, timeout: int = 10):
+        await self._request(
+            "POST", f"/containers/{container_id}/restart",
+            params={"t": timeout}, timeout=ASYNC_DOCKER_TIMEOUT + timeout,
+        )
+
+    async def exec_create(self, container_id: str, cmd: list, env: list = None,
+                          workdir: str = None, user: str = None) -> str:
+        """exec 인스턴스 생성 (stdout/stderr만 연결, TTY 없음) 후 exec ID 반환"""
+        body = {"AttachStdout": True, "AttachStderr": True, "Tty": False, "Cmd": cmd}
+        if env:
+            body["Env"] = env
+        if workdir:
+            body["WorkingDir"] = workdir
+        if user:
+            body["User"] = user
+        response = await self._request("POST", f"/containers/{container_id}/exec", json=body)
+        return response.json()["Id"]
+
+    def exec_start(self, exec_id: str):
+        """
+        exec 실행 출력 스트림 (stream()과 같은 컨텍스트 매니저)
+
+        Upgrade 헤더 없이 시작하면 데몬이 다중화 프레임 출력을 응답 본문으로 보내고
+        명령이 끝나면 연결을 닫는다.
+        """
+        return self.stream("POST", f"/exec/{exec_id}/start", json={"Detach": False, "Tty": False})
+
+    async def exec_inspect(self, exec_id: str) -> dict:
+        return await self.get_json(f"/exec/{exec_id}/json")
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+def _close_later(client: AsyncDockerClient):
+    """폐기된 클라이언트를 백그라운드에서 종료"""
+    _async_stats["closed"] += 1
+    try:
+        asyncio.get_running_loop().create_task(client.aclose())
+    except RuntimeError:
+        pass
+
+
+def get_async_docker_client(node_id: str) -> AsyncDockerClient:
+    """특정 노드의 비동기 클라이언트 반환 (노드별로 재사용, 설정 변경 시 재생성)"""
+    with profiler.span("docker.client", node_id):
+        return _acquire_async_client(node_id)
+
+
+def _acquire_async_client(node_id: str) -> AsyncDockerClient:
+    hosts = get_docker_hosts()
+    if node_id not in hosts:
+        raise HTTPException(status_code=404, detail="Unknown node")
+
+    # 설정에서 사라진 노드의 클라이언트 정리
+    for stale_id in [n for n in _async_clients if n not in hosts]:
+        _close_later(_async_clients.pop(stale_id)[1])
+
+    key = get_connection_key(node_id)
+    entry = _async_clients.get(node_id)
+    if entry is not None and entry[0] == key:
+        _async_stats["hits"] += 1
+        return entry[1]
+
+    _async_stats["misses"] += 1
+    if entry is not None:
+        _close_later(entry[1])
+    cfg = hosts[node_id]
+    client = AsyncDockerClient(cfg["base_url"], tls=bool(cfg.get("tls", False)), node_id=node_id)
+    _async_clients[node_id] = (key, client)
+    return client
+
+
+async def close_all():
+    """모든 비동기 클라이언트 종료 (lifespan 종료 시 호출)"""
+    clients = [entry[1] for entry in _async_clients.values()]
+    _async_clients.clear()
+    await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+def get_async_pool_stats() -> dict:
+    return {**_async_stats, "clients": len(_async_clients)}
+
+
+async def ping_node(node_id: str, timeout: float = NODE_PING_TIMEOUT) -> dict:
+    """노드 하나에 ping을 보내고 상태와 왕복 시간(ms) 반환"""
+    started = time.perf_counter()
+    try:
+        await get_async_docker_client(node_id).ping(timeout=timeout)
+        return {"status": "online", "rtt_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except Exception as e:
+        return {
+            "status": "offline",
+            "rtt_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": e.detail if isinstance(e, HTTPException) else (str(e) or type(e).__name__),
+        }
+
+
+async def list_container_summaries(node_id: str, all: bool = True) -> list:
+    """노드의 컨테이너 목록 조회 (동기 버전과 같은 응답 형식, 이미지 태그 캐시 공유)"""
+    client = get_async_docker_client(node_id)
+    raw_containers = await client.containers(all=all)
+    image_ids = {c.get("ImageID", "") for c in raw_containers}
+    owner = get_connection_key(node_id)
+    tags = cached_image_tags(node_id, owner, image_ids)
+    if tags is None:
+        tags = store_image_tags(node_id, owner, await client.images(), image_ids)
+    return [summarize_container(c, tags) for c in raw_containers]
+
+
+async def list_cluster_containers(all: bool = True, timeout: float = CLUSTER_LIST_TIMEOUT) -> dict:
+    """모든 노드의 컨테이너를 동시에 조회하여 병합 (일부 노드 실패 시 partial=true)"""
+    node_ids = list(get_docker_hosts())
+
+    async def one(node_id):
+        started = time.perf_counter()
+        try:
+            containers = await list_container_summaries(node_id, all=all)
+            error = None
+        except Exception as e:
+            containers, error = [], str(e) or type(e).__name__
+        return node_id, containers, error, round((time.perf_counter() - started) * 1000, 2)
+
+    tasks = [asyncio.create_task(one(n)) for n in node_ids]
+    done, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    merged, nodes = [], []
+    for node_id, task in zip(node_ids, tasks):
+        if task in done:
+            _, containers, error, elapsed_ms = task.result()
+        else:
+            containers, error, elapsed_ms = [], f"제한 시간 초과 ({timeout}s)", None
+        merged.extend({**c, "node_id": node_id} for c in containers)
+        nodes.append({
+            "node_id": node_id,
+            "ok": error is None,
+            "error": error,
+            "elapsed_ms": elapsed_ms,
+            "count": len(containers),
+        })
+    return {"containers": merged, "nodes": nodes, "partial": any(not n["ok"] for n in nodes)}
@@ -0,0 +1,198 @@
+"""노드별 서킷 브레이커
+
+연결 실패가 연속으로 쌓인 노드는 차단(open)하여, 이후 호출이 Docker SDK 제한 시간을
+다시 기다리지 않고 마지막 오류로 즉시 실패하게 한다. 차단 시간이 지나면 half-open으로
+바꾸고 백그라운드 probe 하나만 노드를 점검하며, 성공하면 닫고(closed) 실패하면
+지수 백오프(+지터)로 더 오래 차단한다.
+"""
+import math
+import random
+import threading
+import time
+import requests
+from fastapi import HTTPException
+from config.settings import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_BACKOFF_BASE,
+    BREAKER_BACKOFF_MAX,
+    BREAKER_BACKOFF_JITTER,
+)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_breakers = {}  # node_id -> _Breaker
+_lock = threading.Lock()
+_local = threading.local()
+_probe_fn = None
+_stats = {"opened": 0, "closed": 0, "rejected": 0, "probes": 0}
+
+
+class NodeUnavailableError(HTTPException):
+    """차단된 노드 호출 시 즉시 발생하는 503 오류"""
+
+    def __init__(self, node_id: str, error: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"노드 '{node_id}' 연결 차단 중 (최근 오류: {error})",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        self.node_id = node_id
+
+
+class _Breaker:
+    __slots__ = ("state", "failures", "opens", "last_error", "opened_at", "retry_at")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0  # 연속 실패 수
+        self.opens = 0  # 닫히지 않고 연속으로 차단된 횟수 (백오프 단계)
+        self.last_error = None
+        self.opened_at = None
+        self.retry_at = None
+
+
+def _backoff(opens: int) -> float:
+    delay = min(BREAKER_BACKOFF_MAX, BREAKER_BACKOFF_BASE * 2 ** (opens - 1))
+    return delay * (1 + random.uniform(-BREAKER_BACKOFF_JITTER, BREAKER_BACKOFF_JITTER))
+
+
+def _open(breaker: _Breaker):
+    now = time.time()
+    breaker.state = OPEN
+    breaker.opens += 1
+    breaker.opened_at = now
+    breaker.retry_at = now + _backoff(breaker.opens)
+    _stats["opened"] += 1
+
+
+def set_probe(fn):
+    """half-open 상태에서 노드 복구를 확인할 함수 등록 (실패 시 예외 발생)"""
+    global _probe_fn
+    _probe_fn = fn
+
+
+def is_probing() -> bool:
+    """현재 스레드가 probe 중인지 (probe 호출은 차단/기록 대상에서 제외)"""
+    return getattr(_local, "probing", False)
+
+
+def before_call(node_id: str):
+    """노드 호출 전 확인: 차단 중이면 NodeUnavailableError 발생"""
+    if is_probing():
+        return
+    start_probe = False
+    with _lock:
+        breaker = _breakers.get(node_id)
+        if breaker is None or breaker.state == CLOSED:
+            return
+        now = time.time()
+        if breaker.state == OPEN and now >= breaker.retry_at:
+            breaker.state = HALF_OPEN
+            start_probe = True
+        _stats["rejected"] += 1
+        error, retry_after = breaker.last_error, max(0.0, breaker.retry_at - now)
+    if start_probe:
+        _start_probe(node_id)
+    raise NodeUnavailableError(node_id, error, retry_after)
+
+
+def record_failure(node_id: str, error: str):
+    """연결 실패 기록 (연속 실패가 임계값에 도달하면 차단)"""
+    if is_probing():
+        return
+    with _lock:
+        breaker = _breakers.get(node_id)
+        if breaker is None:
+            breaker = _breakers[node_id] = _Breaker()
+        breaker.failures += 1
+        breaker.last_error = error
+        if breaker.state == CLOSED and breaker.failures >= BREAKER_FAILURE_THRESHOLD:
+            _open(breaker)
+            print(f"노드 연결 차단 ({node_id}): {error}")
+
+
+def record_success(node_id: str):
+    """호출 성공 기록 (닫힌 상태의 연속 실패 수 초기화)"""
+    if is_probing():
+        return
+    with _lock:
+        breaker = _breakers.get(node_id)
+        if breaker is not None and breaker.state == CLOSED:
+            breaker.failures = 0
+
+
+def reset(node_id: str):
+    """노드 브레이커 초기화 (노드 삭제, 연결 정보 변경 시)"""
+    with _lock:
+        _breakers.pop(node_id, None)
+
+
+def _start_probe(node_id: str):
+    threading.Thread(
+        target=_run_probe, args=(node_id,), name=f"breaker-probe-{node_id}", daemon=True
+    ).start()
+
+
+def _run_probe(node_id: str):
+    _local.probing = True
+    _stats["probes"] += 1
+    try:
+        if _probe_fn is None:
+            raise RuntimeError("probe 함수가 등록되지 않았습니다")
+        _probe_fn(node_id)
+        error = None
+    except Exception as e:
+        error = str(e) or type(e).__name__
+
+    with _lock:
+        breaker = _breakers.get(node_id)
+        if breaker is None or breaker.state != HALF_OPEN:
+            return
+        if error is None:
+            _breakers[node_id] = _Breaker()
+            _stats["closed"] += 1
+        else:
+            breaker.last_error = error
+            _open(breaker)
+    if error is None:
+        print(f"노드 연결 복구 ({node_id})")
+
+
+def guard_api_client(api, node_id: str):
+    """docker APIClient의 send를 감싸 차단 확인 및 연결 실패/성공 기록"""
+    original_send = api.send
+
+    def send(request, **kwargs):
+        before_call(node_id)
+        try:
+            response = original_send(request, **kwargs)
+        except requests.exceptions.RequestException as e:
+            record_failure(node_id, str(e) or type(e).__name__)
+            raise
+        # HTTP 응답을 받았다면 데몬은 살아 있다 (4xx/5xx 포함)
+        record_success(node_id)
+        return response
+
+    api.send = send
+    return api
+
+
+def get_state(node_id: str) -> dict:
+    """상태 응답용 브레이커 상태"""
+    with _lock:
+        breaker = _breakers.get(node_id)
+        if breaker is None:
+            return {"state": CLOSED, "failures": 0, "retry_at": None}
+        return {
+            "state": breaker.state,
+            "failures": breaker.failures,
+            "retry_at": round(breaker.retry_at, 3) if breaker.state != CLOSED else None,
+        }
+
+
+def get_breaker_stats() -> dict:
+    with _lock:
+        states = {CLOSED: 0, OPEN: 0, HALF_OPEN: 0}
+        for breaker in _breakers.values():
+            states[breaker.state] += 1
+    return {**_stats, "states": states}
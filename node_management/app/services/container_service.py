@@ -0,0 +1,289 @@
+"""컨테이너 조회 서비스
+
+고수준 ``client.containers.list()``는 컨테이너마다 inspect와 ``images.get``을
+추가로 호출한다. 여기서는 ``/containers/json`` 한 번과 노드별 이미지 태그
+캐시(``/images/json`` 일괄 조회)로 목록을 만든다.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services.docker_service import (
+    get_docker_client,
+    get_docker_hosts,
+    get_connection_key,
+    iter_nodes_concurrently,
+    coalesced_call,
+    get_result_fingerprint,
+    invalidate_coalesced,
+)
+from config.settings import (
+    IMAGE_CACHE_TTL,
+    CLUSTER_LIST_TIMEOUT,
+    BULK_MAX_CONCURRENCY,
+    BULK_NODE_CONCURRENCY,
+)
+
+# node_id -> {"owner": 연결 식별자, "tags": {image_id: [tag, ...]}, "loaded_at": float}
+_image_tags = {}
+_image_tags_lock = threading.Lock()
+_image_cache_stats = {"hits": 0, "refreshes": 0, "invalidations": 0}
+
+
+def invalidate_image_cache(node_id: str = None):
+    """이미지 태그 캐시 무효화 (이미지 이벤트 수신 시 호출)"""
+    with _image_tags_lock:
+        if node_id is None:
+            _image_tags.clear()
+        else:
+            _image_tags.pop(node_id, None)
+        _image_cache_stats["invalidations"] += 1
+
+
+def get_image_cache_stats() -> dict:
+    with _image_tags_lock:
+        return {**_image_cache_stats, "nodes": len(_image_tags)}
+
+
+def _parse_image_tags(images) -> dict:
+    """/images/json 결과를 image_id -> 태그 목록으로 변환"""
+    tags = {}
+    for image in images:
+        repo_tags = image.get("RepoTags") or []
+        tags[image["Id"]] = [t for t in repo_tags if t != "<none>:<none>"]
+    return tags
+
+
+def cached_image_tags(node_id: str, owner, image_ids):
+    """
+    캐시된 image_id -> 태그 목록 반환 (갱신이 필요하면 None)
+
+    owner는 연결 식별자로, 노드의 연결 설정이 바뀌면 캐시를 버린다.
+    """
+    now = time.monotonic()
+    with _image_tags_lock:
+        entry = _image_tags.get(node_id)
+        fresh = (
+            entry is not None
+            and entry["owner"] == owner
+            and now - entry["loaded_at"] < IMAGE_CACHE_TTL
+            and all(i in entry["tags"] for i in image_ids)
+        )
+        if fresh:
+            _image_cache_stats["hits"] += 1
+            return entry["tags"]
+    return None
+
+
+def store_image_tags(node_id: str, owner, images, image_ids) -> dict:
+    """일괄 조회한 이미지 목록으로 캐시 갱신"""
+    tags = _parse_image_tags(images)
+    # 일괄 조회에도 없는 ID는 빈 태그로 기록해 반복 갱신을 막는다
+    for image_id in image_ids:
+        tags.setdefault(image_id, [])
+    with _image_tags_lock:
+        _image_tags[node_id] = {"owner": owner, "tags": tags, "loaded_at": time.monotonic()}
+        _image_cache_stats["refreshes"] += 1
+    return tags
+
+
+def get_image_tags(node_id: str, api, image_ids, owner=None) -> dict:
+    """
+    image_id -> 태그 목록 반환
+
+    캐시가 없거나 만료됐거나 모르는 이미지 ID가 있을 때만 일괄 갱신한다.
+    """
+    owner = owner if owner is not None else api.base_url
+    tags = cached_image_tags(node_id, owner, image_ids)
+    if tags is None:
+        tags = store_image_tags(node_id, owner, api.images(all=True), image_ids)
+    return tags
+
+
+def _format_ports(ports) -> str:
+    """/containers/json의 Ports 목록을 기존 표시 형식으로 변환"""
+    result = []
+    for p in ports or []:
+        key = f"{p.get('PrivatePort')}/{p.get('Type', 'tcp')}"
+        if p.get("PublicPort"):
+            result.append(f"{p.get('IP')}:{p.get('PublicPort')}->{key}")
+        else:
+            result.append(key)
+    return ", ".join(result)
+
+
+def summarize_container(raw: dict, tags: dict) -> dict:
+    """/containers/json 항목을 대시보드 응답 형식으로 변환"""
+    image_id = raw.get("ImageID", "")
+    image_tags = tags.get(image_id)
+    names = raw.get("Names") or []
+    return {
+        "id": raw["Id"][:12],
+        "name": names[0].lstrip("/") if names else raw["Id"][:12],
+        "image": ", ".join(image_tags) if image_tags else image_id,
+        "status": raw.get("State", ""),
+        "ports": _format_ports(raw.get("Ports")),
+    }
+
+
+def list_container_summaries(node_id: str, all: bool = True, filters: dict = None) -> list:
+    """
+    노드의 컨테이너 목록 조회 (Docker API 왕복 1회, 캐시 미스 시 2회)
+
+    filters는 Docker /containers/json 필터(status, name, label 등)로 그대로 전달된다.
+    같은 조건의 동시 조회는 하나로 합쳐지며, 반환된 목록은 공유되므로 수정하지 않는다.
+    """
+    def fetch():
+        api = get_docker_client(node_id).api
+        return collect_container_summaries(
+            node_id, api, all=all, owner=get_connection_key(node_id), filters=filters
+        )
+    return coalesced_call(node_id, "containers", _list_params(all, filters), fetch, fingerprint=True)
+
+
+def _list_params(all: bool, filters: dict):
+    return (all, json.dumps(filters or {}, sort_keys=True))
+
+
+def get_container_list_fingerprint(node_id: str, items: list, all: bool = True, filters: dict = None):
+    """list_container_summaries 결과의 내용 지문 (ETag용, 알 수 없으면 None)"""
+    return get_result_fingerprint(node_id, "containers", _list_params(all, filters), items)
+
+
+def collect_container_summaries(node_id: str, api, all: bool = True, owner=None, filters: dict = None) -> list:
+    """주어진 APIClient로 컨테이너 목록 조회"""
+    raw_containers = api.containers(all=all, filters=filters or None)
+    image_ids = {c.get("ImageID", "") for c in raw_containers}
+    tags = get_image_tags(node_id, api, image_ids, owner=owner)
+    return [summarize_container(c, tags) for c in raw_containers]
+
+
+def iter_cluster_containers(all: bool = True, timeout: float = CLUSTER_LIST_TIMEOUT, filters: dict = None):
+    """
+    등록된 모든 노드의 컨테이너를 동시에 조회하여 노드별 결과를 끝나는 순서대로 반환
+
+    느리거나 오프라인인 노드는 error가 채워진 결과로 반환된다. fingerprint는 노드 결과의
+    내용 지문(ETag용, 알 수 없으면 None)이며 응답으로 내보내기 전에 제거한다.
+    """
+    node_ids = list(get_docker_hosts())
+    for node_id, containers, error, elapsed_ms in iter_nodes_concurrently(
+        lambda n: list_container_summaries(n, all=all, filters=filters), node_ids, timeout
+    ):
+        yield {
+            "node_id": node_id,
+            "ok": error is None,
+            "containers": [{**c, "node_id": node_id} for c in containers or []],
+            "error": error,
+            "elapsed_ms": elapsed_ms,
+            "fingerprint": get_container_list_fingerprint(node_id, containers, all, filters) if error is None else None,
+        }
+
+
+def list_cluster_containers(all: bool = True, timeout: float = CLUSTER_LIST_TIMEOUT, filters: dict = None) -> dict:
+    """
+    모든 노드의 컨테이너 목록을 병합 (일부 노드 실패 시 partial=true)
+
+    fingerprint는 노드별 내용 지문과 오류를 합친 값이며, 지문을 모르는 노드가 있으면 None이다.
+    """
+    order = {node_id: i for i, node_id in enumerate(get_docker_hosts())}
+    results = list(iter_cluster_containers(all=all, timeout=timeout, filters=filters))
+    # 완료 순서와 무관하게 설정 순서로 정렬하여 응답을 결정적으로 유지
+    results.sort(key=lambda r: order.get(r["node_id"], len(order)))
+    merged = []
+    nodes = []
+    parts = []
+    for result in results:
+        fingerprint = result.pop("fingerprint")
+        if result["ok"] and fingerprint is None:
+            parts.append(None)
+        else:
+            parts.append(f"{result['node_id']}:{fingerprint}:{result['error']}")
+        containers = result.pop("containers")
+        result["count"] = len(containers)
+        merged.extend(containers)
+        nodes.append(result)
+    return {
+        "containers": merged,
+        "nodes": nodes,
+        "partial": any(not n["ok"] for n in nodes),
+        "fingerprint": None if None in parts else "|".join(parts),
+    }
+
+
+def _resolve_targets(item) -> list:
+    """일괄 작업 항목을 (container_id, name) 목록으로 전개"""
+    if item.container_id:
+        return [(item.container_id, None)]
+    api = get_docker_client(item.node_id).api
+    matched = api.containers(all=True, filters={"label": [item.label]})
+    return [(c["Id"][:12], (c.get("Names") or ["/"])[0].lstrip("/")) for c in matched]
+
+
+def _run_action(node_id: str, container_id: str, action: str, stop_timeout: int):
+    """저수준 API로 컨테이너 작업 실행 (inspect 왕복 없음)"""
+    api = get_docker_client(node_id).api
+    if action == "start":
+        api.start(container_id)
+    elif action == "stop":
+        api.stop(container_id, timeout=stop_timeout)
+    elif action == "restart":
+        api.restart(container_id, timeout=stop_timeout)
+    invalidate_coalesced(node_id)
+
+
+def run_bulk_actions(items, concurrency: int = None, node_concurrency: int = None, stop_timeout: int = 10) -> list:
+    """
+    여러 노드의 컨테이너 작업을 병렬 실행하고 항목별 결과 반환
+
+    전체 동시 실행 수와 노드별 동시 실행 수를 각각 제한한다.
+    라벨 셀렉터 항목은 일치하는 컨테이너마다 결과가 하나씩 생긴다.
+    """
+    concurrency = max(1, min(concurrency or BULK_MAX_CONCURRENCY, BULK_MAX_CONCURRENCY))
+    node_concurrency = max(1, node_concurrency or BULK_NODE_CONCURRENCY)
+    node_slots = {
+        node_id: threading.BoundedSemaphore(node_concurrency)
+        for node_id in {item.node_id for item in items}
+    }
+
+    def resolve(item):
+        try:
+            return item, _resolve_targets(item), None
+        except Exception as e:
+            return item, [], str(e)
+
+    def execute(item, container_id, name):
+        started = time.perf_counter()
+        result = {
+            "node_id": item.node_id,
+            "container_id": container_id,
+            "action": item.action,
+        }
+        if name:
+            result["name"] = name
+        try:
+            with node_slots[item.node_id]:
+                _run_action(item.node_id, container_id, item.action, stop_timeout)
+            result.update(ok=True, error=None)
+        except Exception as e:
+            result.update(ok=False, error=str(e))
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    # 요청 항목 순서를 유지하기 위해 결과 dict와 Future를 함께 보관
+    pending = []
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bulk-action") as executor:
+        for item, targets, error in executor.map(resolve, items):
+            if error is not None or not targets:
+                pending.append({
+                    "node_id": item.node_id,
+                    "container_id": None,
+                    "label": item.label,
+                    "action": item.action,
+                    "ok": False,
+                    "error": error or "셀렉터와 일치하는 컨테이너가 없습니다",
+                    "elapsed_ms": None,
+                })
+                continue
+            for container_id, name in targets:
+                pending.append(executor.submit(execute, item, container_id, name))
+        return [p if isinstance(p, dict) else p.result() for p in pending]
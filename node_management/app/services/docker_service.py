@@ -1,18 +1,63 @@
 """Docker 클라이언트 관리 서비스"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 import docker
 from fastapi import HTTPException
-from config.server_manager import load_servers
+from config.server_manager import load_servers, get_config_version
+from services import circuit_breaker, profiler
+from services.metrics import instrument_api_client, observe_docker_call
+from config.settings import (
+    DOCKER_COALESCE_ENABLED,
+    DOCKER_MICRO_CACHE_TTL,
+    DOCKER_FINGERPRINT_MAX_KEYS,
+    DOCKER_MAX_POOL_SIZE,
+    DOCKER_CONNECT_TIMEOUT,
+    DOCKER_CALL_TIMEOUT,
+    NODE_FANOUT_WORKERS,
+    NODE_PING_TIMEOUT,
+    STATUS_TOTAL_TIMEOUT,
+)
 
 # 전역 상태 (기존 DOCKER_HOSTS 대체)
 _docker_hosts = {}
+_docker_hosts_version = None  # _docker_hosts를 만든 설정 버전
+
+# 노드별 장기 DockerClient 레지스트리: node_id -> (연결 키, 클라이언트)
+_clients = {}
+_clients_lock = threading.Lock()
+_pool_stats = {"hits": 0, "misses": 0, "rebuilds": 0, "closed": 0}
+
+# 동일 조회 합치기: (node_id, 연결 키, 작업, 인자) -> 진행 중인 _Flight / (만료 시각, 결과)
+_flights = {}
+_recent = {}
+_generations = {}  # node_id -> 무효화 횟수 (진행 중에 무효화된 결과는 캐시하지 않음)
+# 조회 키 -> (내용 지문, 결과): 내용이 같은 결과는 같은 객체를 재사용해 지문을 다시 계산하지 않음
+_fingerprints = OrderedDict()
+_flights_lock = threading.Lock()
+_coalesce_stats = {"calls": 0, "upstream": 0, "coalesced": 0, "cache_hits": 0, "errors": 0, "invalidations": 0}
+
+# 노드 fan-out(상태 점검, 전체 조회 등)용 공유 스레드 풀 (지연 생성)
+_fanout_executor = None
+_fanout_executor_lock = threading.Lock()
 
 
 def refresh_docker_hosts():
-    """DOCKER_HOSTS를 최신 설정으로 갱신 (중복 코드 제거)"""
-    global _docker_hosts
-    latest_servers = load_servers()
+    """DOCKER_HOSTS를 최신 설정으로 갱신 (설정 버전이 같으면 그대로 유지)"""
+    global _docker_hosts, _docker_hosts_version
+    with profiler.span("config.check"):
+        version = get_config_version()
+    if version == _docker_hosts_version:
+        return _docker_hosts
+    with profiler.span("config.load"):
+        latest_servers = load_servers()
     _docker_hosts.clear()
     _docker_hosts.update(latest_servers)
+    _docker_hosts_version = version
+    _prune_clients()
     return _docker_hosts
 
 
@@ -23,12 +68,360 @@ def get_docker_hosts():
     return _docker_hosts
 
 
+def _client_key(cfg: dict) -> tuple:
+    """클라이언트 재사용 여부를 판단하는 연결 키 (base_url, tls)"""
+    return (cfg.get("base_url"), bool(cfg.get("tls", False)))
+
+
+def get_connection_key(node_id: str) -> tuple:
+    """노드의 현재 연결 키 (설정에 없으면 None)"""
+    cfg = get_docker_hosts().get(node_id)
+    return _client_key(cfg) if cfg is not None else None
+
+
+def _create_client(node_id: str, cfg: dict) -> docker.DockerClient:
+    """keep-alive 커넥션 풀을 가진 새 DockerClient 생성 (호출별 메트릭 계측)"""
+    started = time.perf_counter()
+    try:
+        # 생성 시 API 버전 협상(/version)이 일어나므로 실패도 기록
+        # 응답 없는 노드에서 fan-out 스레드가 오래 묶이지 않도록 협상은 짧은 제한 시간으로 한다
+        with profiler.span("docker.connect", node_id):
+            client = docker.DockerClient(
+                base_url=cfg["base_url"],
+                tls=bool(cfg.get("tls", False)),
+                max_pool_size=DOCKER_MAX_POOL_SIZE,
+                timeout=DOCKER_CONNECT_TIMEOUT,
+            )
+    except Exception:
+        observe_docker_call(node_id, "version", time.perf_counter() - started, True)
+        raise
+    observe_docker_call(node_id, "version", time.perf_counter() - started, False)
+    client.api.timeout = DOCKER_CALL_TIMEOUT
+    instrument_api_client(client.api, node_id)
+    circuit_breaker.guard_api_client(client.api, node_id)
+    return client
+
+
+def _close_quietly(client: docker.DockerClient):
+    """클라이언트 종료 (소켓 정리 실패는 무시)"""
+    try:
+        client.close()
+    except Exception as e:
+        print(f"Docker 클라이언트 종료 오류: {e}")
+
+
 def get_docker_client(node_id: str) -> docker.DockerClient:
-    """특정 노드의 Docker 클라이언트 반환"""
+    """
+    특정 노드의 Docker 클라이언트 반환 (노드별 풀에서 재사용)
+
+    연결이 차단된 노드는 NodeUnavailableError(503)로 즉시 실패한다. 클라이언트 생성
+    (API 버전 협상)은 잠금 밖에서 하므로 응답 없는 노드가 다른 노드 조회를 막지 않는다.
+    """
+    with profiler.span("docker.client", node_id):
+        return _acquire_docker_client(node_id)
+
+
+def _acquire_docker_client(node_id: str) -> docker.DockerClient:
     hosts = get_docker_hosts()
     if node_id not in hosts:
         raise HTTPException(status_code=404, detail="Unknown node")
 
     cfg = hosts[node_id]
-    return docker.DockerClient(base_url=cfg["base_url"])
+    key = _client_key(cfg)
+    with _clients_lock:
+        entry = _clients.get(node_id)
+        if entry is not None and entry[0] == key:
+            _pool_stats["hits"] += 1
+            return entry[1]
+    if entry is not None:
+        # 연결 정보가 바뀌었으므로 이전 주소의 실패 이력은 버린다
+        circuit_breaker.reset(node_id)
+
+    circuit_breaker.before_call(node_id)
+    try:
+        client = _create_client(node_id, cfg)
+    except Exception as e:
+        circuit_breaker.record_failure(node_id, str(e) or type(e).__name__)
+        raise
+    circuit_breaker.record_success(node_id)
+
+    stale = None
+    with _clients_lock:
+        entry = _clients.get(node_id)
+        if entry is not None and entry[0] == key:
+            # 다른 스레드가 먼저 생성한 클라이언트 사용
+            _pool_stats["hits"] += 1
+            stale, client = client, entry[1]
+        else:
+            _pool_stats["misses"] += 1
+            if entry is not None:
+                # base_url/tls가 바뀐 경우 기존 클라이언트를 폐기하고 재생성
+                _pool_stats["rebuilds"] += 1
+                stale = entry[1]
+            _clients[node_id] = (key, client)
+
+    if stale is not None:
+        _close_quietly(stale)
+    return client
+
+
+def close_docker_client(node_id: str):
+    """노드의 풀링된 클라이언트 종료 및 레지스트리에서 제거"""
+    circuit_breaker.reset(node_id)
+    with _clients_lock:
+        entry = _clients.pop(node_id, None)
+        if entry is not None:
+            _pool_stats["closed"] += 1
+    if entry is not None:
+        _close_quietly(entry[1])
+
+
+def _prune_clients():
+    """설정에서 사라진 노드의 클라이언트 정리"""
+    for node_id in [n for n in list(_clients) if n not in _docker_hosts]:
+        close_docker_client(node_id)
+
+
+def get_client_pool_stats():
+    """클라이언트 풀 재사용 통계 반환"""
+    with _clients_lock:
+        stats = dict(_pool_stats)
+        stats["clients"] = len(_clients)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+    return stats
+
+
+class _Flight:
+    """진행 중인 업스트림 호출 하나 (뒤따라온 호출자는 done을 기다린다)"""
+
+    __slots__ = ("done", "result", "error", "generation")
+
+    def __init__(self, generation: int):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.generation = generation
+
+
+def _stable_result(key, result):
+    """직전 결과와 내용이 같으면 직전 객체를 반환하고, 바뀌었으면 내용 지문을 새로 기록"""
+    with _flights_lock:
+        previous = _fingerprints.get(key)
+    if previous is not None and previous[1] == result:
+        result = previous[1]
+        fingerprint = previous[0]
+    else:
+        payload = json.dumps(result, sort_keys=True, default=str).encode()
+        fingerprint = hashlib.sha256(payload).hexdigest()[:32]
+    with _flights_lock:
+        _fingerprints[key] = (fingerprint, result)
+        _fingerprints.move_to_end(key)
+        while len(_fingerprints) > DOCKER_FINGERPRINT_MAX_KEYS:
+            _fingerprints.popitem(last=False)
+    return result
+
+
+def coalesced_call(node_id: str, operation: str, params, fn, ttl: float = None, fingerprint: bool = False):
+    """
+    같은 (노드, 작업, 인자)의 동시 조회를 업스트림 호출 하나로 합쳐 실행
+
+    먼저 온 호출자만 fn()을 실행하고, 그 사이 들어온 호출자는 같은 결과(또는 예외)를
+    받는다. ttl(기본값: DOCKER_MICRO_CACHE_TTL)초 동안은 끝난 결과도 재사용하므로
+    보는 사람이 늘어도 노드별 업스트림 요청 수는 일정하다. 결과는 여러 호출자가
+    공유하므로 수정하지 않아야 한다. params는 해시 가능한 값이어야 한다.
+
+    fingerprint=True이면 업스트림 결과마다 내용 지문을 기록한다 (get_result_fingerprint).
+    """
+    if not DOCKER_COALESCE_ENABLED:
+        return fn()
+    ttl = DOCKER_MICRO_CACHE_TTL if ttl is None else ttl
+    key = (node_id, get_connection_key(node_id), operation, params)
+    with _flights_lock:
+        _coalesce_stats["calls"] += 1
+        cached = _recent.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                _coalesce_stats["cache_hits"] += 1
+                return cached[1]
+            del _recent[key]
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight(_generations.get(node_id, 0))
+            _coalesce_stats["upstream"] += 1
+        else:
+            _coalesce_stats["coalesced"] += 1
+
+    if not leader:
+        with profiler.span("coalesce.wait", operation):
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _stable_result(key, fn()) if fingerprint else fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            if _flights.get(key) is flight:
+                del _flights[key]
+            if flight.error is not None:
+                _coalesce_stats["errors"] += 1
+            elif ttl > 0 and flight.generation == _generations.get(node_id, 0):
+                _recent[key] = (time.monotonic() + ttl, flight.result)
+        flight.done.set()
+
+
+def get_result_fingerprint(node_id: str, operation: str, params, result):
+    """
+    coalesced_call(fingerprint=True)이 반환한 결과의 내용 지문 (없으면 None)
+
+    내용이 같으면 프로세스와 무관하게 같은 값이므로 ETag 계산에 쓴다. result가 기록된
+    최신 결과 객체가 아니면(그 사이 내용이 바뀐 경우 등) None을 반환한다.
+    """
+    key = (node_id, get_connection_key(node_id), operation, params)
+    with _flights_lock:
+        entry = _fingerprints.get(key)
+    if entry is None or entry[1] is not result:
+        return None
+    return entry[0]
+
+
+def invalidate_coalesced(node_id: str = None):
+    """
+    노드의 재사용 결과 폐기 (이벤트 수신, 컨테이너 작업 후 호출)
+
+    진행 중인 호출은 그대로 두되 결과를 캐시하지 않고, 이후 호출자는 새로 조회한다.
+    """
+    with _flights_lock:
+        _coalesce_stats["invalidations"] += 1
+        for store in (_recent, _flights):
+            for key in [k for k in store if node_id is None or k[0] == node_id]:
+                del store[key]
+        for n in ([node_id] if node_id is not None else list(_generations) + list(_docker_hosts)):
+            _generations[n] = _generations.get(n, 0) + 1
+
+
+def get_coalesce_stats() -> dict:
+    """동일 조회 합치기 통계 (upstream: 실제 호출, coalesced: 진행 중 호출 공유, cache_hits: 재사용)"""
+    with _flights_lock:
+        stats = dict(_coalesce_stats)
+        stats["in_flight"] = len(_flights)
+        stats["cached"] = len(_recent)
+    saved = stats["coalesced"] + stats["cache_hits"]
+    stats["saved_ratio"] = round(saved / stats["calls"], 4) if stats["calls"] else 0.0
+    stats["enabled"] = DOCKER_COALESCE_ENABLED
+    stats["ttl"] = DOCKER_MICRO_CACHE_TTL
+    return stats
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    """노드 fan-out용 스레드 풀 반환"""
+    global _fanout_executor
+    with _fanout_executor_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=NODE_FANOUT_WORKERS, thread_name_prefix="node-fanout"
+            )
+        return _fanout_executor
+
+
+def get_fanout_stats() -> dict:
+    """fan-out 스레드 풀 사용 현황 (대기 작업 수 포함)"""
+    executor = _fanout_executor
+    if executor is None:
+        return {"max_workers": NODE_FANOUT_WORKERS, "threads": 0, "queued": 0}
+    return {
+        "max_workers": NODE_FANOUT_WORKERS,
+        "threads": len(executor._threads),
+        "queued": executor._work_queue.qsize(),
+    }
+
+
+def iter_nodes_concurrently(fn, node_ids, total_timeout: float):
+    """
+    fn(node_id)를 모든 노드에 동시에 실행하고 끝나는 순서대로 결과 반환
+
+    (node_id, 결과, 오류 메시지 또는 None, 소요 시간 ms)를 yield한다.
+    전체 제한 시간 안에 끝나지 않은 노드는 마지막에 timeout 오류로 yield한다.
+    """
+    node_ids = list(node_ids)
+    if not node_ids:
+        return
+
+    def timed(node_id):
+        started = time.perf_counter()
+        try:
+            return fn(node_id), None, (time.perf_counter() - started) * 1000
+        except Exception as e:
+            return None, str(e), (time.perf_counter() - started) * 1000
+
+    executor = _get_fanout_executor()
+    # 요청 트레이스 중이면 fan-out 스레드에서도 같은 트레이스에 span을 남긴다
+    futures = {executor.submit(profiler.bind(timed), n): n for n in node_ids}
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=total_timeout):
+            pending.discard(future)
+            result, error, elapsed = future.result()
+            yield futures[future], result, error, round(elapsed, 2)
+    except FutureTimeoutError:
+        pass
+
+    for future in pending:
+        future.cancel()
+        yield futures[future], None, f"제한 시간 초과 ({total_timeout}s)", None
+
+
+def ping_node(node_id: str, timeout: float = NODE_PING_TIMEOUT) -> dict:
+    """노드 하나에 ping을 보내고 상태와 왕복 시간(ms) 반환 (동시 점검 요청은 하나로 합친다)"""
+    return coalesced_call(node_id, "ping", timeout, lambda: _ping_node(node_id, timeout))
+
+
+def _ping_node(node_id: str, timeout: float) -> dict:
+    started = time.perf_counter()
+    try:
+        client = get_docker_client(node_id)
+        # 노드별 제한 시간을 요청 단위로 적용
+        client.api._get(client.api._url("/_ping"), timeout=timeout).raise_for_status()
+        rtt_ms = (time.perf_counter() - started) * 1000
+        return {"status": "online", "rtt_ms": round(rtt_ms, 2)}
+    except Exception as e:
+        rtt_ms = (time.perf_counter() - started) * 1000
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        return {"status": "offline", "rtt_ms": round(rtt_ms, 2), "error": error}
+
+
+def _probe_node(node_id: str):
+    """서킷 브레이커 half-open probe: 실패하면 예외 발생"""
+    client = get_docker_client(node_id)
+    client.api._get(client.api._url("/_ping"), timeout=NODE_PING_TIMEOUT).raise_for_status()
+
+
+circuit_breaker.set_probe(_probe_node)
+
+
+def probe_nodes(
+    node_ids,
+    node_timeout: float = NODE_PING_TIMEOUT,
+    total_timeout: float = STATUS_TOTAL_TIMEOUT,
+) -> dict:
+    """
+    여러 노드를 동시에 ping하여 node_id -> 결과 dict 반환
 
+    전체 제한 시간 안에 끝나지 않은 노드는 timeout 오류로 표시한다.
+    """
+    results = {}
+    for node_id, result, error, _ in iter_nodes_concurrently(
+        lambda n: ping_node(n, node_timeout), node_ids, total_timeout
+    ):
+        if error is None:
+            results[node_id] = result
+        else:
+            results[node_id] = {"status": "offline", "rtt_ms": None, "error": error}
+    return results
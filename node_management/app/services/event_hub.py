@@ -0,0 +1,252 @@
+"""Docker 이벤트 구독 및 브라우저 fan-out
+
+노드마다 Docker ``/events`` 스트림을 한 번만 구독하고, 정규화한 이벤트를
+연결된 모든 SSE 구독자에게 전달한다. 구독자 수와 무관하게 노드당 업스트림
+연결은 하나다.
+"""
+import asyncio
+import threading
+from services.docker_service import get_docker_client, get_docker_hosts, invalidate_coalesced
+from services.container_service import invalidate_image_cache
+from config.settings import EVENT_QUEUE_SIZE, EVENT_RECONCILE_INTERVAL, EVENT_RETRY_MAX
+
+# 브라우저로 전달할 컨테이너 액션
+CONTAINER_ACTIONS = {
+    "create", "start", "stop", "die", "kill", "restart",
+    "pause", "unpause", "destroy", "rename", "health_status",
+}
+# 이미지 태그 캐시를 무효화하는 이미지 액션
+IMAGE_ACTIONS = {"pull", "tag", "untag", "delete", "load", "import"}
+# 브라우저/토폴로지 캐시로 전달할 네트워크 액션
+NETWORK_ACTIONS = {"connect", "disconnect", "create", "destroy"}
+
+_loop = None
+_subscribers = set()
+_listeners = []  # 서버 내부 캐시 갱신용 콜백 (publish 호출 스레드에서 실행)
+_watchers = {}  # node_id -> _NodeWatcher
+_watchers_lock = threading.Lock()
+_reconcile_task = None
+_stats = {"published": 0, "dropped": 0, "upstream_reconnects": 0}
+
+
+def normalize_event(node_id: str, raw: dict):
+    """Docker 이벤트를 대시보드용 형식으로 변환 (관심 없는 이벤트는 None)"""
+    event_type = raw.get("Type")
+    action = raw.get("Action", "")
+    actor = raw.get("Actor") or {}
+    attrs = actor.get("Attributes") or {}
+
+    if event_type == "container":
+        # "health_status: healthy" 형태의 액션 분리
+        base_action, _, detail = action.partition(":")
+        if base_action not in CONTAINER_ACTIONS:
+            return None
+        event = {
+            "type": "container",
+            "node_id": node_id,
+            "action": "health" if base_action == "health_status" else base_action,
+            "id": actor.get("ID", "")[:12],
+            "name": attrs.get("name", ""),
+            "image": attrs.get("image", ""),
+            "time": raw.get("time"),
+            "time_nano": raw.get("timeNano"),
+        }
+        if base_action == "health_status":
+            event["health"] = detail.strip()
+        if "exitCode" in attrs:
+            event["exit_code"] = attrs["exitCode"]
+        return event
+
+    if event_type == "network" and action in NETWORK_ACTIONS:
+        return {
+            "type": "network",
+            "node_id": node_id,
+            "action": action,
+            "network_id": actor.get("ID", "")[:12],
+            "network": attrs.get("name", ""),
+            "driver": attrs.get("type", ""),
+            "container_id": attrs.get("container", "")[:12],
+            "time": raw.get("time"),
+            "time_nano": raw.get("timeNano"),
+        }
+
+    return None
+
+
+def add_listener(fn):
+    """
+    이벤트 콜백 등록 (토폴로지 캐시 등 서버 내부 캐시 갱신용)
+
+    콜백은 publish를 호출한 스레드(노드 이벤트 스레드 등)에서 바로 실행되므로
+    I/O 없이 빨리 끝나야 한다.
+    """
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def publish(event: dict):
+    """이벤트를 모든 구독자에게 전달 (어느 스레드에서든 호출 가능)"""
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"이벤트 콜백 오류: {e}")
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
+    try:
+        loop.call_soon_threadsafe(_dispatch, event)
+    except RuntimeError:
+        # 이벤트 루프 종료 중
+        pass
+
+
+def _dispatch(event: dict):
+    _stats["published"] += 1
+    for queue in list(_subscribers):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 느린 구독자: 큐를 비우고 전체 재조회를 요청
+            _stats["dropped"] += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync"})
+
+
+def subscribe() -> asyncio.Queue:
+    """SSE 구독자 큐 등록"""
+    queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+    _subscribers.add(queue)
+    return queue
+
+
+def unsubscribe(queue: asyncio.Queue):
+    _subscribers.discard(queue)
+
+
+class _NodeWatcher:
+    """노드 하나의 Docker 이벤트 스트림을 읽는 스레드"""
+
+    def __init__(self, node_id: str, base_url: str):
+        self.node_id = node_id
+        self.base_url = base_url
+        self._stop = threading.Event()
+        self._stream = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"events-{node_id}", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        delay = 1.0
+        connected_once = False
+        while not self._stop.is_set():
+            try:
+                client = get_docker_client(self.node_id)
+                self._stream = client.api.events(
+                    decode=True,
+                    filters={"type": ["container", "image", "network"]},
+                )
+                delay = 1.0
+                if connected_once:
+                    # 재연결 사이에 놓친 이벤트가 있을 수 있으므로 재조회 요청
+                    invalidate_image_cache(self.node_id)
+                    invalidate_coalesced(self.node_id)
+                    publish({"type": "resync", "node_id": self.node_id})
+                connected_once = True
+                for raw in self._stream:
+                    if self._stop.is_set():
+                        break
+                    self._handle(raw)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"이벤트 스트림 오류 ({self.node_id}): {e}")
+            finally:
+                self._stream = None
+            if self._stop.wait(delay):
+                break
+            _stats["upstream_reconnects"] += 1
+            delay = min(delay * 2, EVENT_RETRY_MAX)
+
+    def _handle(self, raw: dict):
+        if raw.get("Type") == "image" and raw.get("Action") in IMAGE_ACTIONS:
+            invalidate_image_cache(self.node_id)
+            invalidate_coalesced(self.node_id)
+            return
+        event = normalize_event(self.node_id, raw)
+        if event is not None:
+            # 합쳐진 조회의 재사용 결과가 바뀐 상태를 가리지 않도록 먼저 폐기
+            invalidate_coalesced(self.node_id)
+            publish(event)
+
+
+def sync_watchers():
+    """설정된 노드 목록에 맞춰 이벤트 구독 스레드를 추가/정리"""
+    hosts = dict(get_docker_hosts())
+    stale = []
+    with _watchers_lock:
+        for node_id, watcher in list(_watchers.items()):
+            info = hosts.get(node_id)
+            if info is None or info.get("base_url") != watcher.base_url:
+                stale.append(_watchers.pop(node_id))
+        for node_id, info in hosts.items():
+            if node_id not in _watchers:
+                watcher = _NodeWatcher(node_id, info.get("base_url"))
+                _watchers[node_id] = watcher
+                watcher.start()
+    for watcher in stale:
+        watcher.stop()
+
+
+def get_stats() -> dict:
+    with _watchers_lock:
+        watchers = len(_watchers)
+    return {**_stats, "subscribers": len(_subscribers), "upstream_streams": watchers}
+
+
+async def _reconcile_loop():
+    while True:
+        try:
+            await asyncio.to_thread(sync_watchers)
+        except Exception as e:
+            print(f"이벤트 구독 동기화 오류: {e}")
+        await asyncio.sleep(EVENT_RECONCILE_INTERVAL)
+
+
+def start():
+    """이벤트 허브 시작 (lifespan에서 호출)"""
+    global _loop, _reconcile_task
+    _loop = asyncio.get_running_loop()
+    if _reconcile_task is None or _reconcile_task.done():
+        _reconcile_task = asyncio.create_task(_reconcile_loop())
+
+
+async def stop():
+    """이벤트 허브 종료"""
+    global _loop, _reconcile_task
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        try:
+            await _reconcile_task
+        except asyncio.CancelledError:
+            pass
+        _reconcile_task = None
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
+    _loop = None
@@ -0,0 +1,443 @@
+"""컨테이너 이벤트 저널 (SQLite)
+
+이벤트 허브가 받은 모든 노드의 Docker 이벤트(컨테이너/네트워크)와 노드 online/offline
+전환을 로컬 SQLite 파일에 기록한다. 컨테이너가 재시작·재생성된 뒤에도 FL 라운드 동안
+실로에서 무슨 일이 있었는지 시간순으로 다시 볼 수 있다.
+
+이벤트 허브 콜백은 노드 이벤트 스레드에서 실행되므로 큐에 넣기만 하고, 전용 쓰기
+스레드가 큐를 모아 트랜잭션 하나로 batch insert 한다. 보관 기간이 지난 행은 주기적으로
+나눠 지우고 빈 페이지를 파일 시스템에 돌려준다.
+"""
+import asyncio
+import queue
+import re
+import sqlite3
+import threading
+import time
+from fastapi import HTTPException
+from services import event_hub
+from config.settings import (
+    JOURNAL_DB_FILE,
+    JOURNAL_QUEUE_SIZE,
+    JOURNAL_BATCH_SIZE,
+    JOURNAL_FLUSH_INTERVAL,
+    JOURNAL_RETENTION,
+    JOURNAL_COMPACT_INTERVAL,
+    JOURNAL_DELETE_CHUNK,
+    JOURNAL_QUERY_LIMIT,
+    JOURNAL_MAX_QUERY_LIMIT,
+)
+
+# 저널에 기록하는 이벤트 type (정리할 때 (type, time) 인덱스를 타도록 IN 조건에 사용)
+EVENT_TYPES = ("container", "network", "node", "resync")
+# 컨테이너 생명주기 타임라인에 포함하는 액션 (health 등은 events 조회로 확인)
+LIFECYCLE_ACTIONS = {"create", "start", "kill", "die", "stop", "restart", "pause", "unpause", "destroy", "rename"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    node_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    action TEXT NOT NULL,
+    container_id TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL DEFAULT '',
+    image TEXT NOT NULL DEFAULT '',
+    exit_code INTEGER,
+    detail TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS events_node_container_time ON events(node_id, container_id, time);
+CREATE INDEX IF NOT EXISTS events_type_time ON events(type, time);
+"""
+_COLUMNS = ("time", "node_id", "type", "action", "container_id", "name", "image", "exit_code", "detail")
+_INSERT = f"INSERT INTO events ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+_queue = queue.Queue(maxsize=JOURNAL_QUEUE_SIZE)
+_STOP = object()
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+_stats = {
+    "recorded": 0, "dropped": 0, "batches": 0, "max_batch": 0, "write_errors": 0,
+    "last_batch_ms": None, "compactions": 0, "deleted": 0, "last_compact_at": None,
+}
+
+
+def _connect() -> sqlite3.Connection:
+    """스레드별 연결 (autocommit, 쓰기 트랜잭션은 명시적으로 시작)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(str(JOURNAL_DB_FILE), timeout=10.0, isolation_level=None)
+        # auto_vacuum은 테이블을 만들기 전에만 바꿀 수 있으므로 스키마보다 먼저 설정
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _to_row(event: dict):
+    """이벤트 허브 이벤트 -> events 행 (기록하지 않는 이벤트는 None)"""
+    event_type = event.get("type")
+    if event_type not in EVENT_TYPES:
+        return None
+    nano = event.get("time_nano")
+    t = nano / 1e9 if nano else (event.get("time") or time.time())
+    node_id = event.get("node_id", "")
+    if event_type == "container":
+        exit_code = event.get("exit_code")
+        return (
+            t, node_id, "container", event["action"], event.get("id", ""), event.get("name", ""),
+            event.get("image", ""), int(exit_code) if exit_code not in (None, "") else None,
+            event.get("health", ""),
+        )
+    if event_type == "network":
+        return (
+            t, node_id, "network", event["action"], event.get("container_id", ""), "", "", None,
+            event.get("network", ""),
+        )
+    if event_type == "node":
+        return (t, node_id, "node", event.get("status", ""), "", "", "", None, event.get("error") or "")
+    return (t, node_id, "resync", "resync", "", "", "", None, "")
+
+
+def record(event: dict):
+    """이벤트 허브 콜백: 쓰기 큐에 넣기만 한다 (큐가 가득 차면 버리고 dropped 집계)"""
+    row = _to_row(event)
+    if row is None:
+        return
+    try:
+        _queue.put_nowait(row)
+    except queue.Full:
+        _stats["dropped"] += 1
+
+
+def _write_batch(conn, rows: list):
+    started = time.perf_counter()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT, rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    except sqlite3.Error as e:
+        _stats["write_errors"] += 1
+        _stats["dropped"] += len(rows)
+        print(f"이벤트 저널 기록 오류: {e}")
+        return
+    _stats["recorded"] += len(rows)
+    _stats["batches"] += 1
+    _stats["max_batch"] = max(_stats["max_batch"], len(rows))
+    _stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def _take_batch(timeout: float):
+    """첫 이벤트를 기다린 뒤 JOURNAL_FLUSH_INTERVAL 동안 JOURNAL_BATCH_SIZE개까지 모은다"""
+    try:
+        first = _queue.get(timeout=timeout)
+    except queue.Empty:
+        return [], False
+    if first is _STOP:
+        return [], True
+    rows = [first]
+    deadline = time.monotonic() + JOURNAL_FLUSH_INTERVAL
+    while len(rows) < JOURNAL_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        try:
+            row = _queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait()
+        except queue.Empty:
+            break
+        if row is _STOP:
+            return rows, True
+        rows.append(row)
+    return rows, False
+
+
+def _run_writer():
+    conn = _connect()
+    next_compact = time.monotonic() + JOURNAL_COMPACT_INTERVAL
+    stopping = False
+    while not stopping:
+        rows, stopping = _take_batch(timeout=max(0.1, next_compact - time.monotonic()))
+        if rows:
+            _write_batch(conn, rows)
+        if time.monotonic() >= next_compact:
+            try:
+                compact()
+            except sqlite3.Error as e:
+                print(f"이벤트 저널 정리 오류: {e}")
+            next_compact = time.monotonic() + JOURNAL_COMPACT_INTERVAL
+    # 종료 직전까지 들어온 이벤트 기록
+    rows = []
+    while True:
+        try:
+            row = _queue.get_nowait()
+        except queue.Empty:
+            break
+        if row is not _STOP:
+            rows.append(row)
+    for k in range(0, len(rows), JOURNAL_BATCH_SIZE):
+        _write_batch(conn, rows[k:k + JOURNAL_BATCH_SIZE])
+
+
+def compact(retention: float = JOURNAL_RETENTION) -> dict:
+    """
+    보관 기간이 지난 이벤트 삭제 후 빈 페이지 반환
+
+    쓰기 잠금을 오래 잡지 않도록 JOURNAL_DELETE_CHUNK 행씩 나눠 지운다.
+    """
+    conn = _connect()
+    cutoff = time.time() - retention
+    placeholders = ", ".join("?" * len(EVENT_TYPES))
+    deleted = 0
+    while True:
+        cursor = conn.execute(
+            f"DELETE FROM events WHERE id IN (SELECT id FROM events "
+            f"WHERE type IN ({placeholders}) AND time < ? LIMIT ?)",
+            (*EVENT_TYPES, cutoff, JOURNAL_DELETE_CHUNK),
+        )
+        deleted += cursor.rowcount
+        if cursor.rowcount < JOURNAL_DELETE_CHUNK:
+            break
+    if deleted:
+        # incremental_vacuum은 한 단계에 한 페이지씩 반환하므로 executescript로 끝까지 실행
+        conn.executescript("PRAGMA incremental_vacuum;")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA optimize")
+    _stats["compactions"] += 1
+    _stats["deleted"] += deleted
+    _stats["last_compact_at"] = time.time()
+    return {"deleted": deleted, "cutoff": cutoff}
+
+
+def _limit(limit) -> int:
+    return max(1, min(limit or JOURNAL_QUERY_LIMIT, JOURNAL_MAX_QUERY_LIMIT))
+
+
+def _row_dict(row) -> dict:
+    event = dict(zip(("id",) + _COLUMNS, row))
+    event["time"] = round(event["time"], 6)
+    return event
+
+
+def query_events(node_id: str = None, container_id: str = None, type: str = None, action: str = None,
+                 since: float = None, until: float = None, before_id: int = None, limit: int = None) -> dict:
+    """
+    이벤트 조회 (최신순)
+
+    다음 페이지는 응답의 next_before_id를 before_id로 넘겨 조회한다.
+    """
+    if container_id and not node_id:
+        raise HTTPException(status_code=400, detail="container_id를 지정하려면 node_id도 필요합니다")
+    clauses, params = [], []
+    for column, value in (("node_id", node_id), ("container_id", container_id), ("type", type), ("action", action)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        clauses.append("time >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("time < ?")
+        params.append(until)
+    if before_id is not None:
+        clauses.append("id < ?")
+        params.append(before_id)
+    limit = _limit(limit)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = _connect().execute(
+        f"SELECT id, {', '.join(_COLUMNS)} FROM events {where} ORDER BY time DESC, id DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    events = [_row_dict(row) for row in rows]
+    return {
+        "events": events,
+        "next_before_id": events[-1]["id"] if len(events) == limit else None,
+    }
+
+
+def _resolve_container_ids(conn, node_id: str, container: str) -> list:
+    """
+    컨테이너 이름 또는 ID(12자리 이상) -> 저널에 남은 ID 목록 (재생성되면 이름 하나에 ID 여러 개)
+
+    deadbeefcafe처럼 ID 형식인 이름도 있으므로 이름으로 먼저 찾고, 없을 때만 ID로 본다.
+    """
+    rows = conn.execute(
+        "SELECT DISTINCT container_id FROM events WHERE node_id = ? AND type = 'container' AND name = ?",
+        (node_id, container.lstrip("/")),
+    ).fetchall()
+    if rows:
+        return [row[0] for row in rows]
+    if re.fullmatch(r"[0-9a-f]{12,64}", container):
+        return [container[:12]]
+    return []
+
+
+def _is_crash(event: dict, previous: dict) -> bool:
+    """0이 아닌 종료 코드로 die 했고 직전 이벤트가 kill(stop/kill 요청)이 아니면 비정상 종료"""
+    return (
+        event["action"] == "die" and event["exit_code"] not in (None, 0)
+        and (previous is None or previous["action"] != "kill")
+    )
+
+
+def get_timeline(node_id: str, container: str, since: float = None, until: float = None,
+                 limit: int = None) -> dict:
+    """
+    컨테이너 생명주기 타임라인 (오래된 것부터)
+
+    container는 ID 또는 이름이며, 이름이면 같은 이름으로 재생성된 컨테이너들을 함께
+    보여준다. runs는 start부터 다음 die/destroy까지의 실행 구간이다. 이벤트가 limit보다
+    많으면 최근 limit개를 반환하고 truncated=true로 표시한다 (이전 구간은 until로 조회).
+    """
+    conn = _connect()
+    container_ids = _resolve_container_ids(conn, node_id, container)
+    if not container_ids:
+        raise HTTPException(status_code=404, detail=f"저널에 '{container}' 컨테이너 이벤트가 없습니다")
+    clauses = [f"container_id IN ({', '.join('?' * len(container_ids))})"]
+    params = list(container_ids)
+    if since is not None:
+        clauses.append("time >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("time < ?")
+        params.append(until)
+    limit = _limit(limit)
+    # 최근 실행/비정상 종료를 보여주는 것이 목적이므로 최신 limit개를 골라 시간순으로 뒤집는다
+    rows = conn.execute(
+        f"SELECT id, {', '.join(_COLUMNS)} FROM events WHERE node_id = ? AND {' AND '.join(clauses)} "
+        f"ORDER BY time DESC, id DESC LIMIT ?",
+        (node_id, *params, limit),
+    ).fetchall()
+    rows.reverse()
+
+    events, runs = [], []
+    current = {}  # container_id -> 진행 중인 실행 구간
+    previous = {}  # container_id -> 직전 생명주기 이벤트
+    crashes = 0
+    for row in rows:
+        event = _row_dict(row)
+        events.append(event)
+        if event["type"] != "container" or event["action"] not in LIFECYCLE_ACTIONS:
+            continue
+        cid = event["container_id"]
+        crashed = _is_crash(event, previous.get(cid))
+        crashes += crashed
+        if event["action"] == "start":
+            current[cid] = {"container_id": cid, "name": event["name"], "started_at": event["time"],
+                            "ended_at": None, "exit_code": None, "crashed": False}
+            runs.append(current[cid])
+        elif event["action"] in ("die", "destroy") and cid in current:
+            run = current.pop(cid)
+            run["ended_at"] = event["time"]
+            run["exit_code"] = event["exit_code"]
+            run["crashed"] = crashed
+        previous[cid] = event
+    for run in runs:
+        end = run["ended_at"]
+        run["duration_s"] = round(end - run["started_at"], 3) if end is not None else None
+    return {
+        "node_id": node_id,
+        "container": container,
+        "container_ids": container_ids,
+        "events": events,
+        "runs": runs,
+        "crashes": crashes,
+        "truncated": len(rows) == limit,
+    }
+
+
+def get_crash_counts(since: float = None, until: float = None, node_id: str = None,
+                     group_by: str = "container") -> dict:
+    """
+    비정상 종료 횟수 집계 (group_by: container(노드+이름) 또는 node)
+
+    직전 이벤트가 kill인 die는 stop/kill 요청에 의한 종료이므로 제외한다.
+    """
+    if group_by not in ("container", "node"):
+        raise HTTPException(status_code=400, detail="group_by는 container 또는 node여야 합니다")
+    until = until if until is not None else time.time()
+    since = since if since is not None else until - 86400
+    node_clause = "AND node_id = ?" if node_id else ""
+    keys = "node_id, name" if group_by == "container" else "node_id"
+    # 집계 함수 MAX(time)와 함께 고른 exit_code는 SQLite에서 최신 행의 값이다
+    rows = _connect().execute(
+        f"""
+        WITH lifecycle AS (
+            SELECT node_id, container_id, name, action, exit_code, time,
+                   LAG(action) OVER (PARTITION BY node_id, container_id ORDER BY time, id) AS previous
+            FROM events
+            WHERE type = 'container' AND time >= ? AND time < ? {node_clause}
+              AND action IN ({', '.join('?' * len(LIFECYCLE_ACTIONS))})
+        )
+        SELECT {keys}, COUNT(*), COUNT(DISTINCT container_id), MAX(time), exit_code
+        FROM lifecycle
+        WHERE action = 'die' AND exit_code != 0 AND (previous IS NULL OR previous != 'kill')
+        GROUP BY {keys}
+        ORDER BY COUNT(*) DESC
+        """,
+        (since, until, *([node_id] if node_id else []), *sorted(LIFECYCLE_ACTIONS)),
+    ).fetchall()
+    groups = []
+    for row in rows:
+        if group_by == "container":
+            group = {"node_id": row[0], "name": row[1]}
+            row = row[2:]
+        else:
+            group = {"node_id": row[0]}
+            row = row[1:]
+        group.update(crashes=row[0], containers=row[1], last_crash_at=round(row[2], 6), last_exit_code=row[3])
+        groups.append(group)
+    return {
+        "since": since,
+        "until": until,
+        "group_by": group_by,
+        "total": sum(g["crashes"] for g in groups),
+        "groups": groups,
+    }
+
+
+def get_journal_counters() -> dict:
+    """DB를 읽지 않는 카운터만 (메트릭 수집용)"""
+    return {**_stats, "queued": _queue.qsize(), "writer_running": _writer is not None and _writer.is_alive()}
+
+
+def get_journal_stats() -> dict:
+    """카운터와 행 수, 보관 범위, 파일 크기"""
+    conn = _connect()
+    count, oldest, newest = conn.execute("SELECT COUNT(*), MIN(time), MAX(time) FROM events").fetchone()
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        **get_journal_counters(),
+        "rows": count,
+        "oldest": oldest,
+        "newest": newest,
+        "db_bytes": page_size * pages,
+        "free_bytes": page_size * free,
+    }
+
+
+def start():
+    """쓰기 스레드 시작 및 이벤트 허브 콜백 등록 (lifespan에서 호출)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name="event-journal", daemon=True)
+            _writer.start()
+    event_hub.add_listener(record)
+
+
+async def stop():
+    """남은 이벤트를 기록하고 쓰기 스레드 종료"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None:
+        return
+    await asyncio.to_thread(_queue.put, _STOP)
+    await asyncio.to_thread(writer.join, 10.0)
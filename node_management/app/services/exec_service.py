@@ -0,0 +1,211 @@
+"""여러 컨테이너 동시 명령 실행 (Docker exec API)
+
+선택한 컨테이너마다 exec 인스턴스를 만들고 동시 실행 수 제한 안에서 한꺼번에
+실행한다. 출력은 로그 스트림과 같은 방식으로 stdout/stderr 프레임을 분리해 줄
+단위로 전달하며, 각 줄에 node_id/container를 붙여 응답 하나로 섞어 보낸다.
+
+제한 시간을 넘긴 컨테이너는 출력 스트림을 닫고 timed_out으로 표시한다. Docker exec
+API에는 실행 중인 명령을 멈추는 방법이 없으므로 명령 자체는 컨테이너 안에서 끝까지
+실행될 수 있다.
+"""
+import asyncio
+import time
+from fastapi import HTTPException
+from services import async_docker
+from services.docker_service import get_docker_hosts
+from services.log_stream import LogDemuxer
+from config.settings import (
+    CLUSTER_LIST_TIMEOUT,
+    EXEC_CONCURRENCY,
+    EXEC_MAX_CONCURRENCY,
+    EXEC_TIMEOUT,
+    EXEC_MAX_TIMEOUT,
+    EXEC_MAX_TARGETS,
+    EXEC_MAX_OUTPUT_BYTES,
+    EXEC_QUEUE_SIZE,
+)
+
+_stats = {"runs": 0, "execs": 0, "failed": 0, "timed_out": 0, "output_bytes": 0, "truncated": 0}
+
+
+def _command(cmd) -> list:
+    if isinstance(cmd, str):
+        if not cmd.strip():
+            raise HTTPException(status_code=400, detail="cmd를 지정해야 합니다")
+        return ["sh", "-c", cmd]
+    if not cmd:
+        raise HTTPException(status_code=400, detail="cmd를 지정해야 합니다")
+    return list(cmd)
+
+
+async def _containers_on_node(node_id: str, filters: dict) -> list:
+    client = async_docker.get_async_docker_client(node_id)
+    raw = await client.containers(all=False, filters=filters or None)
+    return [
+        {"node_id": node_id, "container": c["Id"][:12], "name": (c.get("Names") or ["/"])[0].lstrip("/")}
+        for c in raw
+    ]
+
+
+async def prepare_exec(request) -> dict:
+    """
+    명령과 실행 대상 확인 (스트림 시작 전에 400/404 오류를 내기 위해 먼저 호출)
+
+    targets는 [{"node_id", "container", "name"}], errors는 {node_id: 컨테이너 조회 오류}다.
+    """
+    cmd = _command(request.cmd)
+    hosts = get_docker_hosts()
+    if request.targets:
+        targets = []
+        for target in request.targets:
+            node_id, sep, container_id = target.partition(":")
+            if not sep or not node_id or not container_id:
+                raise HTTPException(status_code=400, detail=f"잘못된 대상 형식입니다: {target}")
+            if node_id not in hosts:
+                raise HTTPException(status_code=404, detail=f"노드 '{node_id}'를 찾을 수 없습니다")
+            targets.append({"node_id": node_id, "container": container_id, "name": container_id})
+        errors = {}
+    else:
+        node_ids = request.node_ids or list(hosts)
+        unknown = [n for n in node_ids if n not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+        if request.role:
+            node_ids = [n for n in node_ids if hosts[n].get("role", "client") == request.role]
+        filters = {}
+        if request.name:
+            filters["name"] = [request.name]
+        if request.label:
+            filters["label"] = [v.strip() for v in request.label.split(",") if v.strip()]
+
+        tasks = {n: asyncio.create_task(_containers_on_node(n, filters)) for n in dict.fromkeys(node_ids)}
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=CLUSTER_LIST_TIMEOUT)
+        targets, errors = [], {}
+        for node_id, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                errors[node_id] = f"제한 시간 초과 ({CLUSTER_LIST_TIMEOUT}s)"
+            elif task.exception() is not None:
+                e = task.exception()
+                errors[node_id] = e.detail if isinstance(e, HTTPException) else (str(e) or type(e).__name__)
+            else:
+                targets.extend(task.result())
+
+    if not targets:
+        detail = "선택한 조건과 일치하는 실행 중인 컨테이너가 없습니다"
+        if errors:
+            detail += " (" + ", ".join(f"{n}: {e}" for n, e in errors.items()) + ")"
+        raise HTTPException(status_code=400, detail=detail)
+    if len(targets) > EXEC_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"최대 {EXEC_MAX_TARGETS}개 컨테이너까지 실행할 수 있습니다")
+    return {
+        "cmd": cmd,
+        "env": [f"{k}={v}" for k, v in (request.env or {}).items()],
+        "workdir": request.workdir,
+        "user": request.user,
+        "targets": targets,
+        "errors": errors,
+        "concurrency": max(1, min(request.concurrency or EXEC_CONCURRENCY, EXEC_MAX_CONCURRENCY)),
+        "timeout": min(max(request.timeout or EXEC_TIMEOUT, 0.1), EXEC_MAX_TIMEOUT),
+    }
+
+
+async def _exec_one(target: dict, plan: dict, emit) -> dict:
+    """컨테이너 하나에서 명령을 실행하며 출력 줄을 emit으로 전달하고 종료 결과 반환"""
+    client = async_docker.get_async_docker_client(target["node_id"])
+    exec_id = await client.exec_create(
+        target["container"], plan["cmd"], env=plan["env"], workdir=plan["workdir"], user=plan["user"]
+    )
+    await emit({"type": "start", **target})
+
+    sent = 0
+    truncated = False
+    demuxer = LogDemuxer(multiplexed=True)
+
+    async def forward(lines):
+        nonlocal sent, truncated
+        for stream, line in lines:
+            size = len(line.encode("utf-8", errors="replace")) + 1
+            if sent + size > EXEC_MAX_OUTPUT_BYTES:
+                truncated = True
+                continue
+            sent += size
+            await emit({"type": "output", **target, "stream": stream, "line": line})
+
+    # TTY 없이 실행하므로 Content-Type(API 1.42 미만은 raw-stream)과 무관하게 항상 다중화 프레임이다
+    async with client.exec_start(exec_id) as response:
+        async for chunk in response.aiter_bytes():
+            await forward(demuxer.feed(chunk))
+        await forward(demuxer.flush())
+
+    info = await client.exec_inspect(exec_id)
+    return {"exit_code": info.get("ExitCode"), "output_bytes": sent, "truncated": truncated}
+
+
+async def iter_exec(plan: dict):
+    """
+    모든 대상에서 명령을 동시에 실행하며 이벤트 dict를 생성
+
+    이벤트 type: targets(대상 목록과 노드 조회 오류), start, output(stream, line),
+    exit(exit_code, timed_out, error), done(전체 요약). output은 대상별로는 순서가
+    유지되지만 대상끼리는 도착 순서대로 섞인다.
+    """
+    targets, errors, timeout = plan["targets"], plan["errors"], plan["timeout"]
+    started = time.perf_counter()
+    _stats["runs"] += 1
+    yield {
+        "type": "targets", "cmd": plan["cmd"], "concurrency": plan["concurrency"], "timeout": timeout,
+        "targets": targets, "errors": errors,
+    }
+
+    # 응답으로 내보내는 속도보다 출력이 빠르면 큐가 차서 업스트림 읽기가 멈춘다
+    queue = asyncio.Queue(maxsize=EXEC_QUEUE_SIZE)
+    slots = asyncio.Semaphore(plan["concurrency"])
+
+    async def run(target):
+        async with slots:
+            target_started = time.perf_counter()
+            result = {"exit_code": None, "output_bytes": 0, "truncated": False, "timed_out": False, "error": None}
+            try:
+                result.update(await asyncio.wait_for(_exec_one(target, plan, queue.put), timeout))
+            except asyncio.TimeoutError:
+                result.update(timed_out=True, error=f"제한 시간 초과 ({timeout}s)")
+            except Exception as e:
+                message = e.message if isinstance(e, async_docker.DockerAPIError) else None
+                result["error"] = message or getattr(e, "detail", None) or str(e) or type(e).__name__
+            result["ok"] = result["error"] is None and result["exit_code"] == 0
+            result["elapsed_ms"] = round((time.perf_counter() - target_started) * 1000, 2)
+            await queue.put({"type": "exit", **target, **result})
+
+    tasks = [asyncio.create_task(run(t)) for t in targets]
+    results = []
+    try:
+        while len(results) < len(tasks):
+            event = await queue.get()
+            if event["type"] == "exit":
+                results.append(event)
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    _stats["execs"] += len(results)
+    _stats["failed"] += sum(1 for r in results if not r["ok"])
+    _stats["timed_out"] += sum(1 for r in results if r["timed_out"])
+    _stats["output_bytes"] += sum(r["output_bytes"] for r in results)
+    _stats["truncated"] += sum(1 for r in results if r["truncated"])
+    yield {
+        "type": "done",
+        "ok": all(r["ok"] for r in results) and not errors,
+        "total": len(results),
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "timed_out": sum(1 for r in results if r["timed_out"]),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def get_exec_stats() -> dict:
+    return dict(_stats)
@@ -0,0 +1,546 @@
+"""FL 배포 오케스트레이터 (SuperLink 1개 + 클라이언트 노드별 SuperNode)
+
+배포 명세를 단계(이미지 준비, 네트워크 준비, 컨테이너 생성/시작/준비 확인)의
+의존성 그래프로 바꾸고, 선행 단계가 끝난 단계부터 동시에 실행한다. SuperNode는
+SuperLink가 준비된 뒤에 시작하지만 사일로끼리는 서로 기다리지 않으므로, 사일로 수가
+늘어도 전체 소요 시간은 사일로 하나를 올리는 시간에 가깝다.
+
+한 단계라도 실패하면 남은 단계를 취소하고 이번 실행에서 만든 컨테이너와 네트워크를
+역순(SuperNode -> SuperLink -> 네트워크)으로 제거한다. 배포 컨테이너에는
+fl.deployment 라벨을 붙이므로 나중에 라벨로 찾아서 내릴 수 있다.
+"""
+import itertools
+import queue
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import docker
+from fastapi import HTTPException
+from services.docker_service import get_docker_client, get_docker_hosts, iter_nodes_concurrently
+from config.settings import (
+    CLUSTER_LIST_TIMEOUT,
+    DEPLOY_CONCURRENCY,
+    DEPLOY_MAX_CONCURRENCY,
+    DEPLOY_NETWORK,
+    DEPLOY_READY_TIMEOUT,
+    DEPLOY_READY_INTERVAL,
+    DEPLOY_READY_MIN_UPTIME,
+    FL_SUPERLINK_IMAGE,
+    FL_SUPERNODE_IMAGE,
+    FL_FLEET_PORT,
+    FL_SUPERLINK_PORTS,
+)
+
+DEPLOYMENT_LABEL = "fl.deployment"
+_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_.-]*$")
+_TEMPLATE = re.compile(r"\{(\w+)\}")
+
+# 배포 이름 -> 최근 실행 상태
+_deployments = {}
+# 배포 이름 -> (예약 번호, 예약 전 상태): 계획 생성부터 실행 시작 전까지 이름을 선점
+_reservations = {}
+_reservation_ids = itertools.count(1)
+_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "succeeded": 0,
+    "failed": 0,
+    "containers_created": 0,
+    "containers_rolled_back": 0,
+}
+
+
+def _count(**values):
+    with _lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def _node_host(cfg: dict):
+    """Docker 주소에서 호스트 이름 (unix 소켓이면 None)"""
+    base_url = cfg.get("base_url") or ""
+    if not base_url.startswith(("tcp://", "http://", "https://")):
+        return None
+    return urlsplit(base_url).hostname
+
+
+def _render(value: str, variables: dict) -> str:
+    return _TEMPLATE.sub(lambda m: str(variables.get(m.group(1), m.group(0))), value)
+
+
+def _container_config(spec, default_image: str, default_command: list, default_ports: dict) -> dict:
+    readiness = spec.readiness
+    return {
+        "image": spec.image or default_image,
+        "command": list(spec.command if spec.command is not None else default_command),
+        "environment": dict(spec.environment),
+        "ports": dict(spec.ports if spec.ports is not None else default_ports),
+        "readiness": {
+            "log_pattern": readiness.log_pattern,
+            "tcp_port": readiness.tcp_port,
+            "min_uptime": DEPLOY_READY_MIN_UPTIME if readiness.min_uptime is None else readiness.min_uptime,
+            "timeout": readiness.timeout or DEPLOY_READY_TIMEOUT,
+        },
+    }
+
+
+def prepare_deployment(request) -> dict:
+    """
+    배포 명세를 검증하고 실행 계획(단계 목록) 생성
+
+    스트림을 시작하기 전에 호출해 400/404/409 오류를 먼저 낸다. 같은 이름의 요청이
+    동시에 검사를 통과하지 않도록 검사와 같은 잠금 안에서 이름을 deploying으로 예약하며,
+    계획 생성에 실패하면 예약을 되돌린다. 실행하지 않을 계획은 release_deployment로 해제한다.
+    """
+    name = request.name.strip()
+    if not _NAME_PATTERN.match(name):
+        raise HTTPException(status_code=400, detail="배포 이름은 영문/숫자/_.- 만 사용할 수 있습니다")
+    with _lock:
+        if _deployments.get(name, {}).get("state") == "deploying":
+            raise HTTPException(status_code=409, detail=f"배포 '{name}'가 이미 진행 중입니다")
+        reservation = next(_reservation_ids)
+        _reservations[name] = (reservation, _deployments.get(name))
+        _deployments[name] = {
+            "name": name, "state": "deploying", "started_at": time.time(), "finished_at": None, "error": None,
+        }
+    try:
+        return {**_plan_deployment(request, name), "reservation": reservation}
+    except BaseException:
+        release_deployment({"name": name, "reservation": reservation})
+        raise
+
+
+def release_deployment(plan: dict):
+    """실행을 시작하지 않은 계획의 이름 예약 해제 (이미 실행을 시작했으면 아무것도 하지 않음)"""
+    name = plan["name"]
+    with _lock:
+        reservation = _reservations.get(name)
+        if reservation is None or reservation[0] != plan["reservation"]:
+            return
+        del _reservations[name]
+        if reservation[1] is None:
+            _deployments.pop(name, None)
+        else:
+            _deployments[name] = reservation[1]
+
+
+def _plan_deployment(request, name: str) -> dict:
+    hosts = get_docker_hosts()
+    server_node = request.superlink.node_id
+    if server_node is None:
+        server_node = next((n for n, info in hosts.items() if info.get("role") == "central"), None)
+        if server_node is None:
+            raise HTTPException(status_code=400, detail="중앙 노드(role: central)가 없습니다")
+    elif server_node not in hosts:
+        raise HTTPException(status_code=404, detail=f"노드 '{server_node}'를 찾을 수 없습니다")
+
+    client_nodes = request.supernodes.node_ids
+    if client_nodes:
+        unknown = [n for n in client_nodes if n not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+        client_nodes = list(dict.fromkeys(client_nodes))
+    else:
+        client_nodes = [n for n, info in hosts.items() if info.get("role", "client") == "client"]
+    per_node = request.supernodes.per_node
+    if not client_nodes or per_node < 1:
+        raise HTTPException(status_code=400, detail="SuperNode를 배포할 노드가 없습니다")
+
+    superlink = _container_config(request.superlink, FL_SUPERLINK_IMAGE, ["--insecure"], FL_SUPERLINK_PORTS)
+    superlink["name"] = f"{name}-superlink"
+    supernode = _container_config(
+        request.supernodes,
+        FL_SUPERNODE_IMAGE,
+        ["--insecure", "--superlink", "{superlink}",
+         "--node-config", "partition-id={partition_id} num-partitions={num_partitions}"],
+        {},
+    )
+
+    # 같은 노드의 SuperNode는 네트워크 안에서 컨테이너 이름으로, 다른 노드는 중앙 노드 호스트의 공개 포트로 접속
+    remote_address = request.superlink_address
+    if remote_address is None and any(n != server_node for n in client_nodes):
+        host = _node_host(hosts[server_node])
+        published = superlink["ports"].get(f"{FL_FLEET_PORT}/tcp", superlink["ports"].get(str(FL_FLEET_PORT)))
+        if host is None or published is None:
+            raise HTTPException(
+                status_code=400,
+                detail="다른 노드의 SuperNode가 접속할 SuperLink 주소를 정할 수 없습니다 (superlink_address 지정 필요)",
+            )
+        remote_address = f"{host}:{published}"
+    local_address = request.superlink_address or f"{superlink['name']}:{FL_FLEET_PORT}"
+
+    network = request.network or DEPLOY_NETWORK
+    nodes = list(dict.fromkeys([server_node, *client_nodes]))
+    images = {n: set() for n in nodes}
+    images[server_node].add(superlink["image"])
+
+    steps = []
+    for node_id in nodes:
+        steps.append({"id": f"network:{node_id}", "kind": "network", "node_id": node_id, "after": []})
+    steps.append({
+        "id": "superlink", "kind": "superlink", "node_id": server_node,
+        "after": [f"image:{server_node}", f"network:{server_node}"],
+        "container": {**superlink, "labels": {DEPLOYMENT_LABEL: name, "fl.role": "superlink"}},
+        "variables": {"deployment": name, "node_id": server_node},
+    })
+    num_partitions = len(client_nodes) * per_node
+    partition_id = 0
+    for node_id in client_nodes:
+        images[node_id].add(supernode["image"])
+        for _ in range(per_node):
+            steps.append({
+                "id": f"supernode:{partition_id}", "kind": "supernode", "node_id": node_id,
+                "after": ["superlink", f"image:{node_id}", f"network:{node_id}"],
+                "container": {
+                    **supernode,
+                    "name": f"{name}-supernode-{partition_id}",
+                    "labels": {DEPLOYMENT_LABEL: name, "fl.role": "supernode", "fl.partition-id": str(partition_id)},
+                },
+                "variables": {
+                    "deployment": name,
+                    "node_id": node_id,
+                    "partition_id": partition_id,
+                    "num_partitions": num_partitions,
+                    "superlink": local_address if node_id == server_node else remote_address,
+                },
+            })
+            partition_id += 1
+    for node_id in nodes:
+        steps.append({
+            "id": f"image:{node_id}", "kind": "image", "node_id": node_id, "after": [],
+            "images": sorted(images[node_id]),
+        })
+
+    return {
+        "name": name,
+        "network": network,
+        "pull": request.pull,
+        "superlink_node": server_node,
+        "supernode_nodes": client_nodes,
+        "num_partitions": num_partitions,
+        "concurrency": max(1, min(request.concurrency or DEPLOY_CONCURRENCY, DEPLOY_MAX_CONCURRENCY)),
+        "steps": steps,
+    }
+
+
+class _Run:
+    """실행 중인 배포 하나 (롤백을 위해 이번 실행에서 만든 리소스를 기록)"""
+
+    def __init__(self, plan: dict):
+        self.plan = plan
+        self.name = plan["name"]
+        self.cancel = threading.Event()
+        self.containers = []  # (단계 종류, node_id, container_id, 이름)
+        self.networks = []  # (node_id, network_id)
+        self._lock = threading.Lock()
+
+    def created_container(self, kind: str, node_id: str, container_id: str, name: str):
+        with self._lock:
+            self.containers.append((kind, node_id, container_id, name))
+        _count(containers_created=1)
+
+    def created_network(self, node_id: str, network_id: str):
+        with self._lock:
+            self.networks.append((node_id, network_id))
+
+
+def _ensure_images(api, images: list, pull: str):
+    for image in images:
+        if pull != "always":
+            try:
+                api.inspect_image(image)
+                continue
+            except docker.errors.NotFound:
+                if pull == "never":
+                    raise RuntimeError(f"노드에 이미지 '{image}'가 없습니다")
+        for message in api.pull(image, stream=True, decode=True):
+            if "error" in message:
+                raise RuntimeError(message["error"])
+
+
+def _ensure_network(run: _Run, api, node_id: str) -> str:
+    network = run.plan["network"]
+    for existing in api.networks(names=[network]):
+        if existing.get("Name") == network:
+            return "exists"
+    created = api.create_network(network, driver="bridge", labels={DEPLOYMENT_LABEL: run.name})
+    run.created_network(node_id, created["Id"])
+    return "created"
+
+
+def _port_key(port: str):
+    number, _, protocol = str(port).partition("/")
+    return int(number), protocol or "tcp"
+
+
+def _start_container(run: _Run, api, step: dict) -> str:
+    config = step["container"]
+    variables = step["variables"]
+    ports = {_port_key(p): host_port for p, host_port in config["ports"].items()}
+    host_config = api.create_host_config(
+        port_bindings={f"{port}/{protocol}": host_port for (port, protocol), host_port in ports.items()},
+        extra_hosts={"host.docker.internal": "host-gateway"},
+    )
+    networking_config = api.create_networking_config({
+        run.plan["network"]: api.create_endpoint_config(aliases=[config["name"]]),
+    })
+    created = api.create_container(
+        config["image"],
+        command=[_render(arg, variables) for arg in config["command"]],
+        name=config["name"],
+        environment={k: _render(v, variables) for k, v in config["environment"].items()},
+        labels=config["labels"],
+        ports=list(ports),
+        host_config=host_config,
+        networking_config=networking_config,
+    )
+    container_id = created["Id"]
+    run.created_container(step["kind"], step["node_id"], container_id, config["name"])
+    api.start(container_id)
+    return container_id
+
+
+def _wait_ready(run: _Run, api, container_id: str, readiness: dict, host: str) -> float:
+    """준비 조건을 모두 만족할 때까지 대기하고 걸린 시간(초) 반환"""
+    started = time.monotonic()
+    deadline = started + readiness["timeout"]
+    log_seen = readiness["log_pattern"] is None
+    tcp_ok = readiness["tcp_port"] is None
+    while True:
+        state = api.inspect_container(container_id).get("State") or {}
+        if not state.get("Running"):
+            if state.get("Status") in ("exited", "dead"):
+                raise RuntimeError(f"컨테이너가 종료되었습니다 (exit code {state.get('ExitCode')})")
+        else:
+            if not log_seen:
+                log_seen = readiness["log_pattern"] in api.logs(container_id, tail=200).decode("utf-8", errors="replace")
+            if not tcp_ok:
+                try:
+                    socket.create_connection((host, readiness["tcp_port"]), timeout=1.0).close()
+                    tcp_ok = True
+                except OSError:
+                    pass
+            if log_seen and tcp_ok and time.monotonic() - started >= readiness["min_uptime"]:
+                return time.monotonic() - started
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"준비 확인 시간 초과 ({readiness['timeout']}s)")
+        if run.cancel.wait(DEPLOY_READY_INTERVAL):
+            raise RuntimeError("배포가 취소되었습니다")
+
+
+def _run_step(run: _Run, step: dict) -> dict:
+    if run.cancel.is_set():
+        raise RuntimeError("배포가 취소되었습니다")
+    node_id = step["node_id"]
+    api = get_docker_client(node_id).api
+    if step["kind"] == "image":
+        _ensure_images(api, step["images"], run.plan["pull"])
+        return {"images": step["images"]}
+    if step["kind"] == "network":
+        return {"network": run.plan["network"], "state": _ensure_network(run, api, node_id)}
+
+    container_id = _start_container(run, api, step)
+    host = _node_host(get_docker_hosts().get(node_id) or {}) or "127.0.0.1"
+    ready_after = _wait_ready(run, api, container_id, step["container"]["readiness"], host)
+    return {
+        "container_id": container_id[:12],
+        "name": step["container"]["name"],
+        "ready_after_ms": round(ready_after * 1000, 2),
+    }
+
+
+def _remove(node_id: str, kind: str, ref: str):
+    api = get_docker_client(node_id).api
+    if kind == "network":
+        api.remove_network(ref)
+    else:
+        api.remove_container(ref, force=True)
+
+
+def _rollback(run: _Run):
+    """이번 실행에서 만든 리소스를 SuperNode -> SuperLink -> 네트워크 순으로 제거하며 결과 이벤트 생성"""
+    stages = [
+        [(n, "container", cid, name) for kind, n, cid, name in run.containers if kind == "supernode"],
+        [(n, "container", cid, name) for kind, n, cid, name in run.containers if kind == "superlink"],
+        [(n, "network", nid, run.plan["network"]) for n, nid in run.networks],
+    ]
+
+    def remove(target):
+        node_id, kind, ref, name = target
+        try:
+            _remove(node_id, kind, ref)
+            return {"type": "rollback", "node_id": node_id, "kind": kind, "name": name, "ok": True, "error": None}
+        except Exception as e:
+            return {"type": "rollback", "node_id": node_id, "kind": kind, "name": name, "ok": False, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=run.plan["concurrency"], thread_name_prefix="fl-rollback") as executor:
+        for targets in stages:
+            for event in executor.map(remove, targets):
+                if event["ok"] and event["kind"] == "container":
+                    _count(containers_rolled_back=1)
+                yield event
+
+
+def _set_state(name: str, **values):
+    with _lock:
+        _deployments.setdefault(name, {"name": name}).update(values)
+
+
+def iter_deployment(plan: dict):
+    """
+    배포 실행: 진행 이벤트 dict를 순서대로 생성
+
+    이벤트 type: plan(단계 목록), step(단계별 running/done/failed),
+    rollback(실패 시 제거한 리소스), done(전체 결과).
+    응답이 중간에 끊기면 진행 중인 단계를 멈추고 만든 리소스를 제거한다.
+    """
+    started = time.perf_counter()
+    run = _Run(plan)
+    name = plan["name"]
+    steps = {s["id"]: s for s in plan["steps"]}
+    waiting = {sid: set(s["after"]) for sid, s in steps.items()}
+    states = {sid: "pending" for sid in steps}
+    _count(runs=1)
+    with _lock:
+        # 예약을 실행으로 넘긴다 (이후 상태는 실행 결과로 정해진다)
+        if _reservations.get(name, (None,))[0] == plan.get("reservation"):
+            del _reservations[name]
+    _set_state(
+        name, state="deploying", started_at=time.time(), finished_at=None, error=None,
+        superlink_node=plan["superlink_node"], num_partitions=plan["num_partitions"], steps=states,
+    )
+    yield {
+        "type": "plan", "name": name, "concurrency": plan["concurrency"],
+        "steps": [{"id": s["id"], "node_id": s["node_id"], "after": s["after"]} for s in plan["steps"]],
+    }
+
+    events = queue.Queue()
+
+    def worker(step):
+        step_started = time.perf_counter()
+        try:
+            detail, error = _run_step(run, step), None
+        except Exception as e:
+            detail, error = {}, getattr(e, "detail", None) or str(e) or type(e).__name__
+        events.put((step["id"], detail, error, round((time.perf_counter() - step_started) * 1000, 2)))
+
+    executor = ThreadPoolExecutor(max_workers=plan["concurrency"], thread_name_prefix="fl-deploy")
+    running = 0
+    failed = None
+    finished = False
+    try:
+        while True:
+            if failed is None:
+                for sid in [sid for sid, deps in waiting.items() if not deps]:
+                    del waiting[sid]
+                    states[sid] = "running"
+                    running += 1
+                    executor.submit(worker, steps[sid])
+                    yield {"type": "step", "id": sid, "node_id": steps[sid]["node_id"], "state": "running"}
+            if not running:
+                break
+            sid, detail, error, elapsed_ms = events.get()
+            running -= 1
+            event = {"type": "step", "id": sid, "node_id": steps[sid]["node_id"], **detail, "elapsed_ms": elapsed_ms}
+            if error is None:
+                states[sid] = "done"
+                for deps in waiting.values():
+                    deps.discard(sid)
+            else:
+                states[sid] = "failed"
+                event["error"] = error
+                if failed is None:
+                    failed = (sid, error)
+                    run.cancel.set()
+            event["state"] = states[sid]
+            yield event
+
+        for sid in waiting:
+            states[sid] = "cancelled"
+        if failed is not None:
+            yield from _rollback(run)
+        finished = True
+    finally:
+        run.cancel.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if not finished:
+            # 클라이언트 연결이 끊겨 중단된 경우
+            for _ in _rollback(run):
+                pass
+            failed = failed or (None, "배포가 중단되었습니다")
+        if failed is None:
+            _count(succeeded=1)
+            _set_state(name, state="running", finished_at=time.time())
+        else:
+            _count(failed=1)
+            _set_state(name, state="rolled_back", finished_at=time.time(), error=failed[1])
+
+    yield {
+        "type": "done",
+        "name": name,
+        "ok": failed is None,
+        "failed_step": failed[0] if failed else None,
+        "error": failed[1] if failed else None,
+        "containers": [
+            {"node_id": n, "name": cname, "container_id": cid[:12]}
+            for _, n, cid, cname in run.containers
+        ] if failed is None else [],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def teardown_deployment(name: str, timeout: float = CLUSTER_LIST_TIMEOUT) -> dict:
+    """fl.deployment 라벨로 모든 노드에서 배포 컨테이너와 배포가 만든 네트워크 제거"""
+    selector = {"label": [f"{DEPLOYMENT_LABEL}={name}"]}
+
+    def remove_on_node(node_id):
+        api = get_docker_client(node_id).api
+        removed = []
+        # SuperNode를 먼저 내려 SuperLink 종료로 인한 재접속 오류 로그를 줄인다
+        containers = sorted(
+            api.containers(all=True, filters=selector),
+            key=lambda c: (c.get("Labels") or {}).get("fl.role") == "superlink",
+        )
+        for c in containers:
+            api.remove_container(c["Id"], force=True)
+            removed.append({"node_id": node_id, "name": (c.get("Names") or ["/"])[0].lstrip("/")})
+        for network in api.networks(filters=selector):
+            try:
+                api.remove_network(network["Id"])
+            except docker.errors.APIError:
+                pass  # 다른 컨테이너가 아직 연결되어 있음
+        return removed
+
+    removed, errors = [], {}
+    for node_id, result, error, _ in iter_nodes_concurrently(remove_on_node, list(get_docker_hosts()), timeout):
+        if error is not None:
+            errors[node_id] = error
+        else:
+            removed.extend(result)
+    with _lock:
+        known = name in _deployments
+    if known or removed:
+        _set_state(name, state="removed" if not errors else "partial", finished_at=time.time())
+    return {"name": name, "removed": removed, "errors": errors, "ok": not errors}
+
+
+def list_deployments() -> list:
+    """이 프로세스에서 실행한 배포의 최근 상태"""
+    with _lock:
+        return [{k: v for k, v in d.items() if k != "steps"} for d in _deployments.values()]
+
+
+def get_deployment(name: str) -> dict:
+    with _lock:
+        deployment = _deployments.get(name)
+        if deployment is None:
+            raise HTTPException(status_code=404, detail=f"배포 '{name}'를 찾을 수 없습니다")
+        return {**deployment, "steps": dict(deployment.get("steps") or {})}
+
+
+def get_deployment_stats() -> dict:
+    with _lock:
+        return {**_stats, "active": sum(1 for d in _deployments.values() if d.get("state") == "deploying")}
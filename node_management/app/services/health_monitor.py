@@ -0,0 +1,103 @@
+"""백그라운드 노드 상태 모니터
+
+주기적으로 모든 노드를 점검하고 최신 결과를 메모리 스냅샷으로 보관한다.
+/api/nodes/status는 스냅샷을 그대로 반환하므로 대시보드 사용자 수와
+Docker 데몬에 가해지는 부하가 분리된다.
+"""
+import asyncio
+import random
+import threading
+import time
+from services.docker_service import get_docker_hosts, refresh_docker_hosts, probe_nodes
+from services import event_hub
+from config.settings import HEALTH_CHECK_INTERVAL, HEALTH_CHECK_JITTER
+
+# node_id -> {"status", "rtt_ms", "error"(선택), "checked_at"(epoch 초)}
+_snapshot = {}
+_snapshot_lock = threading.Lock()
+_snapshot_version = 0  # 스냅샷이 갱신될 때마다 증가 (ETag용)
+_task = None
+
+
+def run_check(node_ids=None) -> dict:
+    """노드를 점검하여 스냅샷을 갱신하고 전체 스냅샷 사본 반환"""
+    hosts = dict(get_docker_hosts())
+    targets = list(hosts) if node_ids is None else [n for n in node_ids if n in hosts]
+    results = probe_nodes(targets)
+    checked_at = time.time()
+
+    global _snapshot_version
+    changed = []
+    with _snapshot_lock:
+        _snapshot_version += 1
+        for node_id, result in results.items():
+            previous = _snapshot.get(node_id)
+            if previous is None or previous["status"] != result["status"]:
+                changed.append((node_id, result))
+            _snapshot[node_id] = {**result, "checked_at": checked_at}
+        # 설정에서 삭제된 노드 제거
+        for node_id in [n for n in _snapshot if n not in hosts]:
+            del _snapshot[node_id]
+        snapshot = dict(_snapshot)
+
+    # online/offline 전환만 실시간 스트림으로 전달
+    for node_id, result in changed:
+        event_hub.publish({
+            "type": "node",
+            "node_id": node_id,
+            "status": result["status"],
+            "error": result.get("error"),
+            "time": checked_at,
+        })
+    return snapshot
+
+
+def get_snapshot() -> dict:
+    """최신 상태 스냅샷 사본 반환"""
+    with _snapshot_lock:
+        return dict(_snapshot)
+
+
+def get_snapshot_version() -> int:
+    """스냅샷 갱신 횟수 (이 프로세스 안에서만 의미가 있다)"""
+    with _snapshot_lock:
+        return _snapshot_version
+
+
+def _next_delay(interval: float, jitter: float) -> float:
+    """지터를 적용한 다음 점검까지의 대기 시간"""
+    return max(0.1, interval * (1 + random.uniform(-jitter, jitter)))
+
+
+def _refresh_and_check():
+    refresh_docker_hosts()
+    run_check()
+
+
+async def _monitor_loop(interval: float, jitter: float):
+    while True:
+        try:
+            await asyncio.to_thread(_refresh_and_check)
+        except Exception as e:
+            print(f"노드 상태 모니터 오류: {e}")
+        await asyncio.sleep(_next_delay(interval, jitter))
+
+
+def start(interval: float = HEALTH_CHECK_INTERVAL, jitter: float = HEALTH_CHECK_JITTER):
+    """모니터 태스크 시작 (lifespan에서 호출)"""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_monitor_loop(interval, jitter))
+    return _task
+
+
+async def stop():
+    """모니터 태스크 종료"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
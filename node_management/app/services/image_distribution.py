@@ -0,0 +1,416 @@
+"""이미지 배포 (중앙 노드에서 한 번 pull한 이미지를 클라이언트 노드로 복사)
+
+클라이언트 노드마다 레지스트리에서 같은 이미지를 받는 대신, 중앙 노드(role: central)에서
+한 번만 pull하고 ``GET /images/{name}/get``(docker save) 스트림을 그대로 각 노드의
+``POST /images/load``(docker load) 요청 본문으로 흘려보낸다. 이미지 전체를 디스크나
+메모리에 모으지 않는다.
+
+대상 노드에 이미 있는 레이어(같은 chain ID)는 save tar에서 빼고 보낸다. docker load는
+이미 있는 레이어 chain의 layer 파일을 열지 않기 때문이다. 레이어 blob 이름이 diff ID인
+OCI 형식(Docker 25+) 출력에서만 뺄 수 있으며, 빼고 보낸 tar를 대상 노드가 거부하면
+전체를 다시 보낸다.
+"""
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import docker
+from fastapi import HTTPException
+from services.docker_service import get_docker_client, get_docker_hosts
+from services.container_service import invalidate_image_cache
+from config.settings import (
+    IMAGE_DIST_CONCURRENCY,
+    IMAGE_DIST_MAX_CONCURRENCY,
+    IMAGE_DIST_CHUNK_SIZE,
+    IMAGE_DIST_PROGRESS_INTERVAL,
+)
+
+_stats = {
+    "runs": 0,
+    "transfers": 0,
+    "skipped_nodes": 0,
+    "skipped_layers": 0,
+    "bytes_sent": 0,
+    "bytes_skipped": 0,
+    "fallbacks": 0,
+    "failures": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(**values):
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def chain_ids(diff_ids: list) -> list:
+    """레이어 diff ID 목록을 chain ID 목록으로 변환 (아래 레이어까지 같아야 같은 chain)"""
+    chains = []
+    chain = None
+    for diff_id in diff_ids:
+        chain = diff_id if chain is None else "sha256:" + hashlib.sha256(f"{chain} {diff_id}".encode()).hexdigest()
+        chains.append(chain)
+    return chains
+
+
+def node_layer_chains(api) -> set:
+    """노드에 있는 모든 이미지의 레이어 chain ID"""
+    chains = set()
+    for image in api.images():
+        try:
+            info = api.inspect_image(image["Id"])
+        except docker.errors.NotFound:
+            continue  # 조회 사이에 삭제된 이미지
+        chains.update(chain_ids((info.get("RootFS") or {}).get("Layers") or []))
+    return chains
+
+
+def skippable_blobs(diff_ids: list, present_chains: set) -> set:
+    """대상 노드에 이미 있어 save tar에서 뺄 수 있는 레이어 blob 경로"""
+    needed = {d for d, c in zip(diff_ids, chain_ids(diff_ids)) if c not in present_chains}
+    return {f"blobs/sha256/{d.partition(':')[2]}" for d in diff_ids if d not in needed}
+
+
+def _tar_size(field: bytes) -> int:
+    if field[0] & 0x80:
+        # GNU base-256 표기 (8GB 이상)
+        return int.from_bytes(field[1:], "big")
+    return int(field.strip(b"\0 ") or b"0", 8)
+
+
+def _tar_name(header: bytes) -> str:
+    name = header[0:100].split(b"\0", 1)[0]
+    if header[257:262] == b"ustar":
+        prefix = header[345:500].split(b"\0", 1)[0]
+        if prefix:
+            name = prefix + b"/" + name
+    return name.decode("utf-8", errors="replace")
+
+
+def _extended_name(kind: bytes, data: bytes):
+    """pax 확장 헤더(x)나 GNU 긴 이름(L)에서 경로 추출"""
+    if kind == b"L":
+        return data.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+    for record in data.split(b"\n"):
+        _, _, field = record.partition(b" ")
+        key, _, value = field.partition(b"=")
+        if key == b"path":
+            return value.decode("utf-8", errors="replace")
+    return None
+
+
+class TarEntryFilter:
+    """
+    tar 스트림에서 지정한 경로의 항목만 빼고 나머지 바이트는 그대로 전달
+
+    청크 단위로 feed하며, 항목 데이터를 모으지 않으므로 메모리 사용량은 헤더 크기 수준이다.
+    항목 앞의 pax/GNU 확장 헤더도 함께 뺀다.
+    """
+
+    BLOCK = 512
+
+    def __init__(self, skip_names: set):
+        self.skip_names = set(skip_names)
+        self.skipped_bytes = 0
+        self._header = bytearray()
+        self._ext = bytearray()  # 다음 항목에 적용될 확장 헤더 (헤더 + 데이터)
+        self._ext_kind = None
+        self._ext_start = 0
+        self._ext_size = 0
+        self._ext_left = 0
+        self._ext_name = None
+        self._left = 0  # 현재 항목의 남은 데이터(패딩 포함) 바이트
+        self._passing = True
+        self._tail = False  # 아카이브 끝 표시 이후
+
+    def feed(self, data: bytes) -> bytes:
+        out = bytearray()
+        view = memoryview(data)
+        while view:
+            if self._tail:
+                out += view
+                break
+            if self._left:
+                n = min(self._left, len(view))
+                if self._passing:
+                    out += view[:n]
+                else:
+                    self.skipped_bytes += n
+                self._left -= n
+                view = view[n:]
+                continue
+            if self._ext_left:
+                n = min(self._ext_left, len(view))
+                self._ext += view[:n]
+                self._ext_left -= n
+                view = view[n:]
+                if not self._ext_left:
+                    data = bytes(self._ext[self._ext_start:self._ext_start + self._ext_size])
+                    self._ext_name = _extended_name(self._ext_kind, data) or self._ext_name
+                continue
+            n = min(self.BLOCK - len(self._header), len(view))
+            self._header += view[:n]
+            view = view[n:]
+            if len(self._header) == self.BLOCK:
+                out += self._on_header(bytes(self._header))
+                self._header.clear()
+        return bytes(out)
+
+    def _on_header(self, header: bytes) -> bytes:
+        if not any(header):
+            self._tail = True
+            return bytes(self._ext) + header
+        kind = header[156:157]
+        size = _tar_size(header[124:136])
+        padded = -(-size // self.BLOCK) * self.BLOCK
+        if kind in (b"x", b"L"):
+            self._ext += header
+            self._ext_kind = kind
+            self._ext_start = len(self._ext)
+            self._ext_size = size
+            self._ext_left = padded
+            return b""
+
+        name = (self._ext_name or _tar_name(header)).removeprefix("./")
+        pending = bytes(self._ext)
+        self._ext.clear()
+        self._ext_name = None
+        self._left = padded
+        self._passing = name not in self.skip_names
+        if self._passing:
+            return pending + header
+        self.skipped_bytes += len(pending) + len(header)
+        return b""
+
+    def flush(self) -> bytes:
+        """스트림 끝에 남은 조각 (정상적인 tar라면 비어 있다)"""
+        rest = bytes(self._ext) + bytes(self._header)
+        self._ext.clear()
+        self._header.clear()
+        return rest
+
+
+def _source_node(source_node_id: str = None) -> str:
+    hosts = get_docker_hosts()
+    if source_node_id:
+        if source_node_id not in hosts:
+            raise HTTPException(status_code=404, detail=f"노드 '{source_node_id}'를 찾을 수 없습니다")
+        return source_node_id
+    for node_id, info in hosts.items():
+        if info.get("role") == "central":
+            return node_id
+    if "main" in hosts:
+        return "main"
+    raise HTTPException(status_code=400, detail="중앙 노드(role: central)가 없습니다")
+
+
+def prepare_distribution(image: str, node_ids: list = None, source_node_id: str = None,
+                         pull: bool = True, force: bool = False, concurrency: int = None) -> dict:
+    """
+    배포 계획 확인 (스트림 시작 전에 400/404 오류를 내기 위해 먼저 호출)
+
+    node_ids를 생략하면 role이 client인 모든 노드가 대상이다.
+    """
+    if not image.strip():
+        raise HTTPException(status_code=400, detail="image를 지정해야 합니다")
+    hosts = get_docker_hosts()
+    source = _source_node(source_node_id)
+    if node_ids:
+        unknown = [n for n in node_ids if n not in hosts]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"알 수 없는 노드: {', '.join(unknown)}")
+        targets = [n for n in dict.fromkeys(node_ids) if n != source]
+    else:
+        targets = [n for n, info in hosts.items() if info.get("role", "client") != "central" and n != source]
+    if not targets:
+        raise HTTPException(status_code=400, detail="배포할 대상 노드가 없습니다")
+    return {
+        "image": image.strip(),
+        "source": source,
+        "targets": targets,
+        "pull": pull,
+        "force": force,
+        "concurrency": max(1, min(concurrency or IMAGE_DIST_CONCURRENCY, IMAGE_DIST_MAX_CONCURRENCY)),
+    }
+
+
+def _pull(api, node_id: str, image: str):
+    """중앙 노드에서 pull하며 진행 이벤트 생성 (레이어별로 상태가 바뀌거나 간격이 지났을 때만)"""
+    last = {}  # 레이어 id -> (상태, 마지막 전달 시각)
+    for message in api.pull(image, stream=True, decode=True):
+        if "error" in message:
+            raise RuntimeError(message["error"])
+        layer, status = message.get("id"), message.get("status", "")
+        now = time.monotonic()
+        previous = last.get(layer)
+        if previous and previous[0] == status and now - previous[1] < IMAGE_DIST_PROGRESS_INTERVAL:
+            continue
+        last[layer] = (status, now)
+        event = {"type": "pull", "node_id": node_id, "status": status}
+        if layer:
+            event["layer"] = layer
+        detail = message.get("progressDetail") or {}
+        if detail.get("total"):
+            event["current"], event["total"] = detail.get("current", 0), detail["total"]
+        yield event
+
+
+def _ensure_tag(api, image: str, info: dict):
+    """이미 이미지가 있는 노드에 요청한 태그가 없으면 태그만 추가"""
+    if image in (info.get("RepoTags") or []) or "@" in image or image.startswith("sha256:"):
+        return
+    repository, _, tag = image.rpartition(":")
+    if not repository or "/" in tag:
+        repository, tag = image, "latest"
+    api.tag(info["Id"], repository, tag)
+
+
+def _transfer(source_api, api, node_id: str, image: str, skip: set, emit, cancel):
+    """docker save 스트림을 레이어 필터를 거쳐 대상 노드의 docker load로 전달 (보낸/뺀 바이트 수 반환)"""
+    tar_filter = TarEntryFilter(skip)
+    sent = [0]
+
+    def body():
+        last = time.monotonic()
+        for chunk in source_api.get_image(image, chunk_size=IMAGE_DIST_CHUNK_SIZE):
+            if cancel.is_set():
+                raise RuntimeError("배포가 취소되었습니다")
+            data = tar_filter.feed(chunk)
+            if data:
+                sent[0] += len(data)
+                yield data
+            now = time.monotonic()
+            if now - last >= IMAGE_DIST_PROGRESS_INTERVAL:
+                last = now
+                emit({
+                    "type": "progress", "node_id": node_id,
+                    "bytes_sent": sent[0], "bytes_skipped": tar_filter.skipped_bytes,
+                })
+        rest = tar_filter.flush()
+        if rest:
+            sent[0] += len(rest)
+            yield rest
+
+    for message in api.load_image(body()):
+        if "error" in message:
+            raise RuntimeError(message["error"])
+    return sent[0], tar_filter.skipped_bytes
+
+
+def _distribute_to(node_id: str, source_api, plan: dict, info: dict, emit, cancel) -> dict:
+    """노드 하나에 이미지 전송 (항상 마지막에 결과 이벤트와 종료 표시(None)를 보낸다)"""
+    started = time.perf_counter()
+    image = plan["image"]
+    diff_ids = (info.get("RootFS") or {}).get("Layers") or []
+    result = {
+        "type": "target", "node_id": node_id, "ok": False, "state": None,
+        "layers": len(diff_ids), "layers_skipped": 0, "bytes_sent": 0, "bytes_skipped": 0, "error": None,
+    }
+    try:
+        if cancel.is_set():
+            raise RuntimeError("배포가 취소되었습니다")
+        api = get_docker_client(node_id).api
+        emit({"type": "target", "node_id": node_id, "state": "checking"})
+        existing = None
+        if not plan["force"]:
+            try:
+                existing = api.inspect_image(info["Id"])
+            except docker.errors.NotFound:
+                pass
+        if existing is not None:
+            _ensure_tag(api, image, existing)
+            result.update(ok=True, state="skipped", layers_skipped=len(diff_ids))
+            _count(skipped_nodes=1)
+            return result
+
+        skip = set() if plan["force"] else skippable_blobs(diff_ids, node_layer_chains(api))
+        emit({"type": "target", "node_id": node_id, "state": "transferring", "layers_skipped": len(skip)})
+        try:
+            sent, skipped = _transfer(source_api, api, node_id, image, skip, emit, cancel)
+        except Exception as e:
+            if not skip or cancel.is_set():
+                raise
+            # 레이어를 뺀 tar를 거부하면(이전 save 형식, containerd 이미지 저장소 등) 전체를 다시 보낸다
+            _count(fallbacks=1)
+            emit({"type": "target", "node_id": node_id, "state": "retrying", "error": str(e)})
+            skip = set()
+            sent, skipped = _transfer(source_api, api, node_id, image, skip, emit, cancel)
+
+        invalidate_image_cache(node_id)
+        result.update(ok=True, state="loaded", layers_skipped=len(skip), bytes_sent=sent, bytes_skipped=skipped)
+        _count(transfers=1, skipped_layers=len(skip), bytes_sent=sent, bytes_skipped=skipped)
+        return result
+    except Exception as e:
+        result.update(state="failed", error=getattr(e, "detail", None) or str(e) or type(e).__name__)
+        _count(failures=1)
+        return result
+    finally:
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        emit(dict(result))
+        emit(None)
+
+
+def iter_distribution(plan: dict):
+    """
+    배포 실행: 진행 이벤트 dict를 순서대로 생성
+
+    이벤트 type: pull(중앙 노드 pull 진행), source(배포할 이미지 정보),
+    target(노드별 상태: checking/transferring/retrying/skipped/loaded/failed),
+    progress(노드별 전송 바이트), done(전체 결과).
+    """
+    started = time.perf_counter()
+    _count(runs=1)
+    image, source = plan["image"], plan["source"]
+    try:
+        source_api = get_docker_client(source).api
+        if plan["pull"]:
+            yield from _pull(source_api, source, image)
+        info = source_api.inspect_image(image)
+    except Exception as e:
+        error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        yield {"type": "done", "ok": False, "image": image, "source": source, "error": error, "results": []}
+        return
+
+    yield {
+        "type": "source", "node_id": source, "image": image, "image_id": info["Id"],
+        "layers": len((info.get("RootFS") or {}).get("Layers") or []), "size": info.get("Size"),
+        "targets": plan["targets"], "concurrency": plan["concurrency"],
+    }
+
+    events = queue.Queue()
+    cancel = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=plan["concurrency"], thread_name_prefix="image-dist")
+    futures = [
+        executor.submit(_distribute_to, node_id, source_api, plan, info, events.put, cancel)
+        for node_id in plan["targets"]
+    ]
+    try:
+        remaining = len(futures)
+        while remaining:
+            event = events.get()
+            if event is None:
+                remaining -= 1
+                continue
+            yield event
+    finally:
+        # 응답이 중간에 끊기면 진행 중인 전송도 멈춘다
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = [f.result() for f in futures]
+    yield {
+        "type": "done",
+        "ok": all(r["ok"] for r in results),
+        "image": image,
+        "image_id": info["Id"],
+        "source": source,
+        "results": [{k: v for k, v in r.items() if k != "type"} for r in results],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def get_distribution_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
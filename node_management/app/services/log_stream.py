@@ -0,0 +1,187 @@
+"""컨테이너 로그 스트리밍
+
+Docker 로그 스트림을 메모리에 모으지 않고 받은 청크 단위로 줄을 잘라 전달한다.
+TTY가 없는 컨테이너의 stdout/stderr 다중화 프레임(8바이트 헤더)을 분리하고,
+여러 컨테이너의 로그는 타임스탬프 순으로 병합한다.
+"""
+import asyncio
+from contextlib import suppress
+from services import async_docker
+from config.settings import LOGS_MAX_LINE_BYTES, LOGS_MERGE_WINDOW, LOGS_QUEUE_SIZE
+
+# 다중화 프레임 헤더의 스트림 번호
+STREAMS = {0: "stdin", 1: "stdout", 2: "stderr"}
+
+
+class LogDemuxer:
+    """
+    로그 바이트 청크를 (stream, line) 목록으로 변환
+
+    multiplexed=True이면 [stream, 0, 0, 0, size(4바이트 big-endian)] 헤더 프레임을
+    분리한다. 줄바꿈 없이 LOGS_MAX_LINE_BYTES를 넘는 조각은 그대로 한 줄로 내보낸다.
+    """
+
+    def __init__(self, multiplexed: bool):
+        self.multiplexed = multiplexed
+        self._buffer = bytearray()
+        self._partial = {}  # stream -> 줄바꿈 전까지 받은 바이트
+
+    def feed(self, chunk: bytes) -> list:
+        if not self.multiplexed:
+            return self._split("stdout", chunk)
+        self._buffer += chunk
+        lines = []
+        while len(self._buffer) >= 8:
+            size = int.from_bytes(self._buffer[4:8], "big")
+            if len(self._buffer) < 8 + size:
+                break
+            stream = STREAMS.get(self._buffer[0], "stdout")
+            payload = bytes(self._buffer[8:8 + size])
+            del self._buffer[:8 + size]
+            lines += self._split(stream, payload)
+        return lines
+
+    def flush(self) -> list:
+        """스트림 종료 시 남은 조각 반환"""
+        lines = [(stream, _decode(data)) for stream, data in self._partial.items() if data]
+        self._partial.clear()
+        return lines
+
+    def _split(self, stream: str, data: bytes) -> list:
+        parts = (self._partial.get(stream, b"") + data).split(b"\n")
+        rest = parts.pop()
+        if len(rest) > LOGS_MAX_LINE_BYTES:
+            parts.append(rest)
+            rest = b""
+        self._partial[stream] = rest
+        return [(stream, _decode(part)) for part in parts]
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def split_timestamp(line: str):
+    """timestamps=1 로그 줄에서 (RFC3339 시각, 본문) 분리"""
+    ts, sep, text = line.partition(" ")
+    if sep and len(ts) >= 20 and ts[4] == "-" and ts[10] == "T":
+        return ts, text
+    return None, line
+
+
+def sort_key(ts) -> str:
+    """RFC3339Nano 시각을 문자열 비교가 가능하도록 소수부 9자리로 맞춤"""
+    if not ts:
+        return ""
+    base, _, frac = ts.rstrip("Z").partition(".")
+    return f"{base}.{frac.ljust(9, '0')}"
+
+
+async def open_log_source(node_id: str, container_id: str) -> dict:
+    """
+    로그를 읽을 컨테이너 확인 (스트림 시작 전에 404/503 오류를 내기 위해 먼저 호출)
+
+    {"client", "node_id", "id", "name", "tty"}를 반환한다.
+    """
+    client = async_docker.get_async_docker_client(node_id)
+    info = await client.inspect_container(container_id)
+    return {
+        "client": client,
+        "node_id": node_id,
+        "id": info["Id"],
+        "name": (info.get("Name") or "").lstrip("/"),
+        "tty": bool((info.get("Config") or {}).get("Tty")),
+    }
+
+
+async def iter_log_lines(source: dict, tail: int = None, since: float = None, follow: bool = False,
+                         stdout: bool = True, stderr: bool = True):
+    """컨테이너 로그를 {"stream", "time", "line"} 단위로 비동기 생성"""
+    params = {
+        "stdout": int(stdout),
+        "stderr": int(stderr),
+        "timestamps": 1,
+        "follow": int(follow),
+        "tail": "all" if tail is None else str(tail),
+    }
+    if since is not None:
+        params["since"] = str(since)
+
+    async with source["client"].stream("GET", f"/containers/{source['id']}/logs", params=params) as response:
+        content_type = response.headers.get("content-type", "")
+        # API 1.42+는 Content-Type으로 형식을 알려준다. 그 이전은 TTY 여부로 판단
+        if "multiplexed" in content_type:
+            multiplexed = True
+        elif "raw-stream" in content_type:
+            multiplexed = False
+        else:
+            multiplexed = not source["tty"]
+        demuxer = LogDemuxer(multiplexed)
+        async for chunk in response.aiter_bytes():
+            for stream, line in demuxer.feed(chunk):
+                ts, text = split_timestamp(line)
+                yield {"stream": stream, "time": ts, "line": text}
+        for stream, line in demuxer.flush():
+            ts, text = split_timestamp(line)
+            yield {"stream": stream, "time": ts, "line": text}
+
+
+async def merge_log_streams(sources: list, follow: bool = False, window: float = LOGS_MERGE_WINDOW):
+    """
+    여러 로그 스트림을 타임스탬프 순으로 병합
+
+    sources는 (메타데이터 dict, 비동기 줄 iterator) 목록이다. 각 스트림은 시간순이므로
+    스트림마다 맨 앞 줄 하나만 들고 가장 이른 것부터 내보낸다 (k-way 병합).
+    follow=True이면 출력이 없는 스트림을 window(초)까지만 기다리고, 그 뒤로는
+    새 줄이 올 때까지 기다리지 않는다.
+    """
+    queues = [asyncio.Queue(maxsize=LOGS_QUEUE_SIZE) for _ in sources]
+
+    async def pump(queue, meta, lines):
+        try:
+            async for entry in lines:
+                await queue.put({**meta, **entry})
+        except Exception as e:
+            await queue.put({**meta, "stream": "error", "time": None, "line": str(e) or type(e).__name__})
+        await queue.put(None)
+
+    pumps = [asyncio.create_task(pump(q, meta, lines)) for q, (meta, lines) in zip(queues, sources)]
+    getters = {i: asyncio.create_task(q.get()) for i, q in enumerate(queues)}
+    heads = {}
+    stalled = set()  # window 동안 출력이 없던 스트림 (새 줄이 올 때까지 기다리지 않음)
+    try:
+        while getters or heads:
+            missing = [i for i in getters if i not in heads]
+            required = []
+            if missing and not heads:
+                await asyncio.wait([getters[i] for i in missing], return_when=asyncio.FIRST_COMPLETED)
+            elif missing:
+                required = [i for i in missing if i not in stalled]
+                if required:
+                    await asyncio.wait([getters[i] for i in required], timeout=window if follow else None)
+
+            for i in list(getters):
+                task = getters[i]
+                if i in heads:
+                    continue
+                if not task.done():
+                    if i in required:
+                        stalled.add(i)
+                    continue
+                stalled.discard(i)
+                item = task.result()
+                if item is None:
+                    del getters[i]
+                else:
+                    heads[i] = item
+                    getters[i] = asyncio.create_task(queues[i].get())
+
+            if heads:
+                first = min(heads, key=lambda k: sort_key(heads[k]["time"]))
+                yield heads.pop(first)
+    finally:
+        tasks = pumps + list(getters.values())
+        for task in tasks:
+            task.cancel()
+        with suppress(asyncio.CancelledError):
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,216 @@
+"""프로세스 내 경량 메트릭 레지스트리 (Prometheus 텍스트 형식)
+
+외부 의존성 없이 카운터/히스토그램을 보관하고, 요청 경로와 Docker API 호출을
+계측하는 도구를 제공한다.
+"""
+import re
+import threading
+import time
+from services import profiler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = []
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels):
+        with _lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-2] + [series[-1]]):
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {count}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{label_str} {series[-1]}")
+        return lines
+
+
+def counter(name: str, help: str, labelnames=()) -> Counter:
+    metric = Counter(name, help, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def render_gauge(name: str, help: str, samples, type: str = "gauge") -> list:
+    """수집 시점에 계산하는 값 출력: samples = [(labels dict, value), ...]"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+    return lines
+
+
+def render_registered() -> list:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# 기본 메트릭
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = histogram(
+    "fl_http_request_duration_seconds",
+    "HTTP request latency until response start",
+    ("method", "route", "status"),
+)
+DOCKER_API_DURATION = histogram(
+    "fl_docker_api_duration_seconds",
+    "Docker Engine API call latency",
+    ("node", "operation"),
+)
+DOCKER_API_ERRORS = counter(
+    "fl_docker_api_errors_total",
+    "Docker Engine API call errors (connection failures and HTTP >= 400)",
+    ("node", "operation"),
+)
+
+# (메서드, 경로 패턴) -> 작업 이름
+_OPERATIONS = [
+    (None, re.compile(r"/_ping$"), "ping"),
+    (None, re.compile(r"/version$"), "version"),
+    (None, re.compile(r"/info$"), "info"),
+    (None, re.compile(r"/events$"), "events"),
+    ("GET", re.compile(r"/containers/json$"), "list"),
+    ("GET", re.compile(r"/images/json$"), "list_images"),
+    ("GET", re.compile(r"/networks$"), "list_networks"),
+    ("GET", re.compile(r"/containers/[^/]+/json$"), "inspect"),
+    ("GET", re.compile(r"/containers/[^/]+/stats$"), "stats"),
+    ("GET", re.compile(r"/containers/[^/]+/logs$"), "logs"),
+    ("POST", re.compile(r"/containers/[^/]+/start$"), "start"),
+    ("POST", re.compile(r"/containers/[^/]+/stop$"), "stop"),
+    ("POST", re.compile(r"/containers/[^/]+/restart$"), "restart"),
+]
+
+
+def classify_operation(method: str, path: str) -> str:
+    """Docker API 요청 경로를 작업 이름으로 분류"""
+    path = path.split("?", 1)[0]
+    for op_method, pattern, name in _OPERATIONS:
+        if (op_method is None or op_method == method) and pattern.search(path):
+            return name
+    return "other"
+
+
+def observe_docker_call(node_id: str, operation: str, seconds: float, error: bool):
+    DOCKER_API_DURATION.observe(seconds, node_id, operation)
+    if error:
+        DOCKER_API_ERRORS.inc(node_id, operation)
+    profiler.record_span("docker." + operation, node_id, seconds, error)
+
+
+def instrument_api_client(api, node_id: str):
+    """docker APIClient(requests.Session)의 send를 감싸 호출별 지연/오류 기록"""
+    original_send = api.send
+
+    def send(request, **kwargs):
+        operation = classify_operation(request.method, request.path_url)
+        started = time.perf_counter()
+        try:
+            response = original_send(request, **kwargs)
+        except Exception:
+            observe_docker_call(node_id, operation, time.perf_counter() - started, True)
+            raise
+        observe_docker_call(
+            node_id, operation, time.perf_counter() - started, response.status_code >= 400
+        )
+        return response
+
+    api.send = send
+    return api
+
+
+class RequestMetricsMiddleware:
+    """라우트 패턴별 요청 지연 시간 기록 (응답 시작 시점까지, 스트리밍 응답 포함)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                route = scope.get("route")
+                HTTP_REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    scope.get("method", ""),
+                    getattr(route, "path", "unmatched"),
+                    str(message["status"]),
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,435 @@
+"""실행 중인 프로세스 프로파일링 (관리자 전용)
+
+- 샘플링 프로파일: 지정한 시간 동안 모든 스레드의 파이썬 스택을 주기적으로 읽어
+  folded stack 형식(flamegraph.pl, speedscope, inferno에서 바로 읽는 형식)으로 집계한다.
+- 요청 span 트레이스: 지정한 경로의 요청마다 설정 로드, 클라이언트 획득, Docker API
+  호출별 소요 시간을 기록한다.
+
+꺼져 있을 때는 샘플링 스레드가 없고, span 계측 지점은 ContextVar 조회 한 번으로
+바로 돌아오므로 요청 경로에 주는 부담이 거의 없다.
+"""
+import contextvars
+import fnmatch
+import functools
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from fastapi import HTTPException
+from config.settings import (
+    PROFILE_MAX_SECONDS,
+    PROFILE_MIN_INTERVAL,
+    PROFILE_MAX_INTERVAL,
+    PROFILE_TRACE_HISTORY,
+    PROFILE_TRACE_MAX_SECONDS,
+    PROFILE_TRACE_MAX_SPANS,
+)
+
+# 대기 중인 스레드로 보는 가장 안쪽 파이썬 프레임 (파일 이름, 함수 이름)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),  # ThreadPoolExecutor 작업 대기 (C로 구현된 큐에서 대기)
+}
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_sampling = threading.Lock()  # 샘플링 프로파일은 한 번에 하나만
+_current = contextvars.ContextVar("profile_span", default=None)  # (트레이스, span 경로)
+_trace_rules = None  # 트레이스 대상 설정 (None이면 꺼짐)
+_trace_rules_lock = threading.Lock()
+_traces = deque(maxlen=PROFILE_TRACE_HISTORY)
+_trace_ids = itertools.count(1)
+_stats = {"samples_taken": 0, "profiles": 0, "traced_requests": 0, "spans": 0, "dropped_spans": 0}
+
+
+# ---------------------------------------------------------------------------
+# 샘플링 프로파일
+# ---------------------------------------------------------------------------
+
+def _short_path(filename: str) -> str:
+    """앱 파일은 app 기준 상대 경로, 라이브러리는 site-packages 이후 경로"""
+    if filename.startswith(_APP_DIR):
+        return os.path.relpath(filename, _APP_DIR)
+    marker = filename.rfind("-packages" + os.sep)
+    if marker != -1:
+        return filename[marker + len("-packages") + 1:]
+    return os.path.basename(filename)
+
+
+def _frame_label(code, cache: dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        # folded 형식은 ;와 공백 뒤 숫자로 구분하므로 이름에서 ;를 뺀다
+        label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+        cache[code] = label
+    return label
+
+
+def _thread_label(name: str) -> str:
+    """스레드 이름 끝의 번호를 지워 같은 풀의 스레드를 하나로 합친다"""
+    return re.sub(r"[-_ ]?\d+$", "", name).replace(";", ":") or "thread"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def sample(seconds: float, interval: float, include_idle: bool = False) -> dict:
+    """
+    seconds 동안 interval 간격으로 모든 스레드 스택을 샘플링 (호출한 스레드를 막는다)
+
+    stacks는 {(스레드, 바깥->안쪽 프레임 튜플): 샘플 수}다. include_idle=False이면
+    잠금/셀렉터에서 대기 중인 스레드 샘플은 idle 수에만 센다.
+    """
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = min(max(interval, PROFILE_MIN_INTERVAL), PROFILE_MAX_INTERVAL)
+    if not _sampling.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="이미 샘플링 프로파일이 실행 중입니다")
+    try:
+        own = threading.get_ident()
+        labels = {}
+        names = {}
+        stacks = Counter()
+        idle = 0
+        ticks = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_names = 0.0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now >= next_names:
+                # 스레드 이름은 1초마다만 다시 읽는다
+                names = {t.ident: _thread_label(t.name) for t in threading.enumerate()}
+                next_names = now + 1.0
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if not include_idle and _is_idle(frame):
+                    idle += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                stack.reverse()
+                stacks[(names.get(ident, "thread"), tuple(stack))] += 1
+            ticks += 1
+            # 마지막 샘플 뒤에는 남은 시간만큼만 기다린다
+            time.sleep(min(interval, max(0.0, deadline - time.perf_counter())))
+        elapsed = time.perf_counter() - started
+    finally:
+        _sampling.release()
+    _stats["samples_taken"] += ticks
+    _stats["profiles"] += 1
+    return {
+        "seconds": round(elapsed, 3),
+        "interval": interval,
+        "ticks": ticks,
+        "samples": sum(stacks.values()),
+        "idle_samples": idle,
+        "stacks": stacks,
+    }
+
+
+def folded_samples(profile: dict) -> str:
+    """샘플링 결과 -> folded stack 텍스트 ("스레드;바깥;...;안쪽 샘플수" 한 줄씩)"""
+    lines = [
+        ";".join((thread,) + stack) + f" {count}"
+        for (thread, stack), count in profile["stacks"].most_common()
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def top_functions(profile: dict, limit: int = 30) -> list:
+    """self(가장 안쪽 프레임) 샘플 수 상위 함수 목록 (total은 스택에 포함된 샘플 수)"""
+    own, total = Counter(), Counter()
+    for (_, stack), count in profile["stacks"].items():
+        if stack:
+            own[stack[-1]] += count
+        for label in set(stack):
+            total[label] += count
+    return [
+        {"function": label, "self": count, "total": total[label]}
+        for label, count in own.most_common(limit)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 요청 span 트레이스
+# ---------------------------------------------------------------------------
+
+class _Trace:
+    __slots__ = ("id", "method", "path", "route", "status", "started_at", "t0", "duration_ms", "spans")
+
+    def __init__(self, method: str, path: str):
+        self.id = next(_trace_ids)
+        self.method, self.path = method, path
+        self.route = None
+        self.status = None
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []  # (경로 튜플, 시작 오프셋 ms, 소요 ms, 스레드 이름, 오류 여부)
+
+    def add(self, path: tuple, started: float, seconds: float, error: bool):
+        if len(self.spans) >= PROFILE_TRACE_MAX_SPANS:
+            _stats["dropped_spans"] += 1
+            return
+        self.spans.append((
+            path, round((started - self.t0) * 1000, 3), round(seconds * 1000, 3),
+            threading.current_thread().name, error,
+        ))
+        _stats["spans"] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": [
+                {"name": path[-1], "parent": path[-2] if len(path) > 1 else None, "depth": len(path),
+                 "start_ms": start, "duration_ms": duration, "thread": thread, "error": error}
+                for path, start, duration, thread, error in self.spans
+            ],
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "path", "token", "started")
+
+    def __init__(self, trace: _Trace, path: tuple):
+        self.trace, self.path = trace, path
+
+    def __enter__(self):
+        self.token = _current.set((self.trace, self.path))
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        _current.reset(self.token)
+        self.trace.add(self.path, self.started, seconds, exc_type is not None)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(kind: str, detail: str = None):
+    """
+    현재 요청이 트레이스 중이면 kind(와 detail) 이름의 span을 기록하는 컨텍스트 매니저
+
+    트레이스 중이 아니면 아무것도 하지 않는 공유 객체를 돌려준다.
+    """
+    current = _current.get()
+    if current is None:
+        return _NULL_SPAN
+    trace, path = current
+    return _Span(trace, path + (f"{kind} {detail}" if detail else kind,))
+
+
+def record_span(kind: str, detail: str, seconds: float, error: bool = False):
+    """이미 끝난 호출을 span으로 기록 (Docker API 호출 메트릭 지점에서 사용)"""
+    current = _current.get()
+    if current is None:
+        return
+    trace, path = current
+    trace.add(path + (f"{kind} {detail}" if detail else kind,), time.perf_counter() - seconds, seconds, error)
+
+
+def bind(fn):
+    """
+    현재 트레이스 컨텍스트를 다른 스레드로 넘기도록 fn을 감싼다 (트레이스 중이 아니면 fn 그대로)
+
+    제출할 때마다 호출해야 한다 (Context 하나는 동시에 여러 스레드에서 실행할 수 없다).
+    """
+    if _current.get() is None:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def set_trace_rules(routes: list, seconds: float, max_requests: int) -> dict:
+    """경로 패턴(fnmatch, 예: /api/nodes/status, /api/containers*)과 일치하는 요청 트레이스 시작"""
+    global _trace_rules
+    patterns = [r.strip() for r in routes if r and r.strip()]
+    if not patterns:
+        raise HTTPException(status_code=400, detail="트레이스할 경로를 하나 이상 지정해야 합니다")
+    seconds = min(max(seconds, 1.0), PROFILE_TRACE_MAX_SECONDS)
+    rules = {
+        "routes": patterns,
+        "until": time.monotonic() + seconds,
+        "expires_at": time.time() + seconds,
+        "remaining": max_requests,
+    }
+    with _trace_rules_lock:
+        _trace_rules = rules
+    return get_trace_rules()
+
+
+def clear_trace_rules():
+    global _trace_rules
+    with _trace_rules_lock:
+        _trace_rules = None
+
+
+def get_trace_rules():
+    rules = _trace_rules
+    if rules is None or rules["until"] <= time.monotonic() or rules["remaining"] <= 0:
+        return None
+    return {"routes": rules["routes"], "expires_at": rules["expires_at"], "remaining": rules["remaining"]}
+
+
+def _start_trace(method: str, path: str):
+    """요청이 트레이스 대상이면 _Trace 생성 (남은 횟수 차감, 만료되면 설정 해제)"""
+    global _trace_rules
+    with _trace_rules_lock:
+        rules = _trace_rules
+        if rules is None:
+            return None
+        if rules["until"] <= time.monotonic() or rules["remaining"] <= 0:
+            _trace_rules = None
+            return None
+        if not any(fnmatch.fnmatchcase(path, pattern) for pattern in rules["routes"]):
+            return None
+        rules["remaining"] -= 1
+    return _Trace(method, path)
+
+
+def list_traces(limit: int = None) -> list:
+    traces = list(_traces)
+    if limit:
+        traces = traces[-limit:]
+    return [t.to_dict() for t in reversed(traces)]
+
+
+def clear_traces():
+    _traces.clear()
+
+
+def _root_name(trace: _Trace) -> str:
+    return f"{trace.method} {trace.route or trace.path}".replace(";", ":")
+
+
+def _path_totals(trace: _Trace) -> dict:
+    """span 경로별 소요 시간 합(ms), 루트는 요청 전체"""
+    totals = {(): trace.duration_ms or 0.0}
+    for path, _, duration, _, _ in trace.spans:
+        totals[path] = totals.get(path, 0.0) + duration
+    return totals
+
+
+def folded_traces() -> str:
+    """
+    트레이스 -> folded stack 텍스트 (값은 경로별 self 시간 µs)
+
+    노드 fan-out처럼 자식 span이 동시에 실행되면 자식 합이 부모보다 클 수 있으며,
+    이때 부모의 self 시간은 0으로 본다.
+    """
+    folded = Counter()
+    for trace in list(_traces):
+        totals = _path_totals(trace)
+        children = Counter()
+        for path, duration in totals.items():
+            if path:
+                children[path[:-1]] += duration
+        root = _root_name(trace)
+        for path, duration in totals.items():
+            own = max(duration - children[path], 0.0)
+            if own > 0:
+                folded[";".join((root,) + tuple(p.replace(";", ":") for p in path))] += own
+    lines = [f"{stack} {round(us * 1000)}" for stack, us in folded.most_common() if round(us * 1000) > 0]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def summarize_traces() -> list:
+    """span 종류(이름 첫 단어)별 요청당 합계: 횟수, 합계/평균/최대 ms"""
+    groups = {}
+    for trace in list(_traces):
+        root = _root_name(trace)
+        per_request = Counter()
+        counts = Counter()
+        for path, _, duration, _, _ in trace.spans:
+            kind = path[-1].split(" ", 1)[0]
+            per_request[kind] += duration
+            counts[kind] += 1
+        group = groups.setdefault(root, {"route": root, "requests": 0, "total_ms": [], "spans": {}})
+        group["requests"] += 1
+        group["total_ms"].append(trace.duration_ms or 0.0)
+        for kind, ms in per_request.items():
+            entry = group["spans"].setdefault(kind, {"count": 0, "sum_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += counts[kind]
+            entry["sum_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+    result = []
+    for group in groups.values():
+        durations = group.pop("total_ms")
+        group["avg_ms"] = round(sum(durations) / len(durations), 3)
+        group["max_ms"] = round(max(durations), 3)
+        for entry in group["spans"].values():
+            entry["avg_ms_per_request"] = round(entry["sum_ms"] / group["requests"], 3)
+            entry["sum_ms"] = round(entry["sum_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        result.append(group)
+    return result
+
+
+def get_profiler_stats() -> dict:
+    return {
+        **_stats,
+        "sampling": _sampling.locked(),
+        "tracing": get_trace_rules(),
+        "traces": len(_traces),
+    }
+
+
+class ProfilingMiddleware:
+    """트레이스 대상 경로의 요청을 루트 span으로 감싼다 (트레이스 설정이 없으면 바로 통과)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _trace_rules is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = _start_trace(scope.get("method", ""), scope.get("path", ""))
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+            await send(message)
+
+        token = _current.set((trace, ()))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            trace.duration_ms = round((time.perf_counter() - trace.t0) * 1000, 3)
+            trace.route = getattr(scope.get("route"), "path", None)
+            _traces.append(trace)
+            _stats["traced_requests"] += 1
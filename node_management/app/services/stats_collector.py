@@ -0,0 +1,350 @@
+"""컨테이너 리소스 통계 수집기
+
+실행 중인 컨테이너의 CPU/메모리/네트워크/블록 I/O를 주기적으로 동시에 수집하여
+컨테이너별 링 버퍼(array 기반)에 저장한다. 원본 샘플과 함께 1분/10분 평균 롤업을
+유지하며, 버퍼는 샘플이 쌓이는 만큼만 커지다가 용량에 닿으면 순환하므로 실행 시간이
+길어져도 메모리 사용량은 STATS_MAX_SERIES(메모리 예산으로 계산)를 넘지 않는다.
+"""
+import asyncio
+import math
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait
+from docker import errors as docker_errors
+from services.docker_service import get_docker_client, get_docker_hosts, iter_nodes_concurrently
+from config.settings import (
+    STATS_INTERVAL,
+    STATS_WORKERS,
+    STATS_RAW_POINTS,
+    STATS_ROLLUP_POINTS,
+    STATS_EVICT_AFTER,
+    STATS_MAX_SERIES,
+)
+
+FIELDS = (
+    "cpu_percent",
+    "mem_bytes",
+    "mem_limit",
+    "net_rx_bps",
+    "net_tx_bps",
+    "blk_read_bps",
+    "blk_write_bps",
+)
+# 롤업 창 이름 -> 버킷 길이(초)
+ROLLUPS = {"1m": 60, "10m": 600}
+
+# (node_id, 짧은 container_id) -> _ContainerSeries
+_series = {}
+_series_lock = threading.Lock()
+_executor = None
+_task = None
+_stats = {"rounds": 0, "samples": 0, "errors": 0, "evicted": 0, "last_round_ms": None}
+
+
+class RingSeries:
+    """시간 + 필드별 값을 array에 순환 저장 (용량까지는 추가하며 커지고 이후 덮어씀)"""
+
+    __slots__ = ("capacity", "_times", "_values", "_next", "_size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = array("d")
+        self._values = [array("d") for _ in FIELDS]
+        self._next = 0
+        self._size = 0
+
+    def append(self, t: float, values):
+        if self._size < self.capacity:
+            # 한 번 수집되고 사라지는 컨테이너가 용량만큼 메모리를 잡지 않도록 필요한 만큼만 늘린다
+            self._times.append(t)
+            for column, value in zip(self._values, values):
+                column.append(value)
+            self._size += 1
+            self._next = self._size % self.capacity
+            return
+        i = self._next
+        self._times[i] = t
+        for column, value in zip(self._values, values):
+            column[i] = value
+        self._next = (i + 1) % self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.buffer_info()[1] * self._times.itemsize * (1 + len(FIELDS))
+
+    def points(self, since: float = None, limit: int = None) -> list:
+        """오래된 것부터 정렬된 샘플 목록"""
+        start = (self._next - self._size) % self.capacity
+        result = []
+        for k in range(self._size):
+            i = (start + k) % self.capacity
+            t = self._times[i]
+            if since is not None and t < since:
+                continue
+            point = {"t": t}
+            for name, column in zip(FIELDS, self._values):
+                value = column[i]
+                point[name] = None if math.isnan(value) else round(value, 3)
+            result.append(point)
+        if limit:
+            result = result[-limit:]
+        return result
+
+
+class _Rollup:
+    """버킷 단위 평균을 계산해 링 버퍼에 추가"""
+
+    __slots__ = ("bucket", "ring", "_start", "_sums", "_counts")
+
+    def __init__(self, bucket: int, capacity: int):
+        self.bucket = bucket
+        self.ring = RingSeries(capacity)
+        self._start = None
+        self._sums = [0.0] * len(FIELDS)
+        self._counts = [0] * len(FIELDS)
+
+    def add(self, t: float, values):
+        start = t - (t % self.bucket)
+        if self._start is not None and start != self._start:
+            self._flush()
+        self._start = start
+        for k, value in enumerate(values):
+            if not math.isnan(value):
+                self._sums[k] += value
+                self._counts[k] += 1
+
+    def _averages(self):
+        return [s / c if c else math.nan for s, c in zip(self._sums, self._counts)]
+
+    def _flush(self):
+        self.ring.append(self._start, self._averages())
+        self._sums = [0.0] * len(FIELDS)
+        self._counts = [0] * len(FIELDS)
+
+    def points(self, since: float = None, limit: int = None) -> list:
+        """완료된 버킷 + 진행 중인 버킷(partial=True) 평균"""
+        result = self.ring.points(since=since)
+        if self._start is not None and any(self._counts):
+            current = {"t": self._start, "partial": True}
+            for name, value in zip(FIELDS, self._averages()):
+                current[name] = None if math.isnan(value) else round(value, 3)
+            result.append(current)
+        if limit:
+            result = result[-limit:]
+        return result
+
+
+class _ContainerSeries:
+    """컨테이너 하나의 원본/롤업 시계열과 직전 누적 카운터"""
+
+    __slots__ = ("raw", "rollups", "name", "last_seen", "_prev")
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes + sum(r.ring.nbytes for r in self.rollups.values())
+
+    def __init__(self, name: str):
+        self.raw = RingSeries(STATS_RAW_POINTS)
+        self.rollups = {k: _Rollup(b, STATS_ROLLUP_POINTS) for k, b in ROLLUPS.items()}
+        self.name = name
+        self.last_seen = time.time()
+        self._prev = None
+
+    def add_sample(self, t: float, counters: dict):
+        """누적 카운터를 직전 샘플과 비교해 비율로 변환 후 저장"""
+        prev, self._prev = self._prev, counters
+        self.last_seen = t
+        if prev is None:
+            return
+        elapsed = t - prev["t"]
+        if elapsed <= 0:
+            return
+
+        def rate(key):
+            delta = counters[key] - prev[key]
+            return delta / elapsed if delta >= 0 else math.nan
+
+        cpu = math.nan
+        cpu_delta = counters["cpu_total"] - prev["cpu_total"]
+        system_delta = counters["system_total"] - prev["system_total"]
+        if system_delta > 0 and cpu_delta >= 0:
+            cpu = cpu_delta / system_delta * counters["online_cpus"] * 100.0
+
+        values = (
+            cpu,
+            counters["mem_bytes"],
+            counters["mem_limit"],
+            rate("net_rx"),
+            rate("net_tx"),
+            rate("blk_read"),
+            rate("blk_write"),
+        )
+        self.raw.append(t, values)
+        for rollup in self.rollups.values():
+            rollup.add(t, values)
+
+
+def parse_stats(raw: dict) -> dict:
+    """Docker stats 응답에서 누적 카운터 추출 (cgroup v1/v2 모두 지원)"""
+    cpu_stats = raw.get("cpu_stats") or {}
+    cpu_usage = cpu_stats.get("cpu_usage") or {}
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_usage.get("percpu_usage") or []) or 1
+
+    memory = raw.get("memory_stats") or {}
+    mem_stats = memory.get("stats") or {}
+    # 페이지 캐시 제외 (v2: inactive_file, v1: total_inactive_file/cache)
+    cache = mem_stats.get("inactive_file", mem_stats.get("total_inactive_file", mem_stats.get("cache", 0)))
+    mem_bytes = max(0, (memory.get("usage") or 0) - (cache or 0))
+
+    net_rx = net_tx = 0
+    for iface in (raw.get("networks") or {}).values():
+        net_rx += iface.get("rx_bytes", 0)
+        net_tx += iface.get("tx_bytes", 0)
+
+    blk_read = blk_write = 0
+    for entry in (raw.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = (entry.get("op") or "").lower()
+        if op == "read":
+            blk_read += entry.get("value", 0)
+        elif op == "write":
+            blk_write += entry.get("value", 0)
+
+    return {
+        "cpu_total": cpu_usage.get("total_usage", 0),
+        "system_total": cpu_stats.get("system_cpu_usage", 0),
+        "online_cpus": online_cpus,
+        "mem_bytes": mem_bytes,
+        "mem_limit": memory.get("limit") or math.nan,
+        "net_rx": net_rx,
+        "net_tx": net_tx,
+        "blk_read": blk_read,
+        "blk_write": blk_write,
+    }
+
+
+def _fetch_stats(node_id: str, container_id: str) -> dict:
+    """stats 한 번 조회 (가능하면 one-shot으로 데몬 측 1초 대기 생략)"""
+    api = get_docker_client(node_id).api
+    try:
+        return api.stats(container_id, stream=False, one_shot=True)
+    except docker_errors.InvalidVersion:
+        return api.stats(container_id, stream=False)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=STATS_WORKERS, thread_name_prefix="stats")
+    return _executor
+
+
+def collect_once(timeout: float = STATS_INTERVAL):
+    """모든 노드의 실행 중인 컨테이너 통계를 한 번 수집"""
+    started = time.perf_counter()
+    targets = []
+    for node_id, containers, error, _ in iter_nodes_concurrently(
+        lambda n: get_docker_client(n).api.containers(all=False),
+        list(get_docker_hosts()),
+        timeout,
+    ):
+        if error is not None:
+            continue
+        for c in containers:
+            names = c.get("Names") or ["/"]
+            targets.append((node_id, c["Id"][:12], names[0].lstrip("/")))
+
+    executor = _get_executor()
+    futures = {executor.submit(_fetch_stats, n, cid): (n, cid, name) for n, cid, name in targets}
+    done, pending = wait(futures, timeout=timeout)
+    for future in pending:
+        future.cancel()
+
+    for future in done:
+        node_id, cid, name = futures[future]
+        try:
+            counters = parse_stats(future.result())
+        except Exception:
+            _stats["errors"] += 1
+            continue
+        counters["t"] = time.time()
+        key = (node_id, cid)
+        with _series_lock:
+            series = _series.get(key)
+            if series is None:
+                if len(_series) >= STATS_MAX_SERIES:
+                    continue
+                series = _series[key] = _ContainerSeries(name)
+            series.add_sample(counters["t"], counters)
+        _stats["samples"] += 1
+
+    _evict_stale()
+    _stats["rounds"] += 1
+    _stats["last_round_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def _evict_stale():
+    """오래 수집되지 않은 컨테이너(중지/삭제) 시계열 제거"""
+    cutoff = time.time() - STATS_EVICT_AFTER
+    with _series_lock:
+        for key in [k for k, s in _series.items() if s.last_seen < cutoff]:
+            del _series[key]
+            _stats["evicted"] += 1
+
+
+def get_container_stats(node_id: str, container_id: str, window: str = "raw",
+                        since: float = None, limit: int = None):
+    """컨테이너 시계열 조회 (없으면 None)"""
+    with _series_lock:
+        series = _series.get((node_id, container_id[:12]))
+        if series is None:
+            return None
+        source = series.raw if window == "raw" else series.rollups[window]
+        points = source.points(since=since, limit=limit)
+        name = series.name
+    return {
+        "node_id": node_id,
+        "container_id": container_id[:12],
+        "name": name,
+        "window": window,
+        "interval": STATS_INTERVAL if window == "raw" else ROLLUPS[window],
+        "points": points,
+    }
+
+
+def get_collector_stats() -> dict:
+    """수집 통계 (buffer_bytes: 시계열 버퍼가 현재 쓰는 메모리)"""
+    with _series_lock:
+        series = len(_series)
+        buffer_bytes = sum(s.nbytes for s in _series.values())
+    return {**_stats, "series": series, "max_series": STATS_MAX_SERIES, "buffer_bytes": buffer_bytes}
+
+
+async def _collect_loop(interval: float):
+    while True:
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(collect_once, interval)
+        except Exception as e:
+            print(f"통계 수집 오류: {e}")
+        await asyncio.sleep(max(0.5, interval - (time.monotonic() - started)))
+
+
+def start(interval: float = STATS_INTERVAL):
+    """수집 태스크 시작 (lifespan에서 호출)"""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_collect_loop(interval))
+    return _task
+
+
+async def stop():
+    """수집 태스크 종료"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
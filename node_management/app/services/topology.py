@@ -0,0 +1,367 @@
+"""Docker 네트워크 토폴로지 (노드 ↔ 네트워크 ↔ 컨테이너 그래프)
+
+노드마다 ``/networks``와 ``/containers/json``을 한 번씩만 조회해 그래프를 만든다.
+컨테이너 목록의 NetworkSettings.Networks에 연결된 네트워크 ID와 IP가 들어 있으므로
+네트워크별 inspect가 필요 없다 (API 1.28+의 네트워크 목록은 연결 컨테이너를 주지 않는다).
+
+만든 그래프는 노드별로 캐시하고, 이벤트 허브가 전달하는 네트워크 connect/disconnect와
+컨테이너 이벤트로 변경분만 갱신한다. 캐시로 반영할 수 없는 이벤트(모르는 컨테이너,
+이벤트 스트림 재연결 등)가 오면 다음 조회 때 다시 만든다.
+"""
+import math
+import threading
+import time
+from services import event_hub
+from services.docker_service import (
+    get_docker_client,
+    get_docker_hosts,
+    get_connection_key,
+    iter_nodes_concurrently,
+)
+from config.settings import TOPOLOGY_CACHE_TTL, CLUSTER_LIST_TIMEOUT
+
+# 컨테이너 이벤트 -> 상태
+CONTAINER_ACTION_STATUS = {
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "stop": "exited",
+    "die": "exited",
+    "kill": "exited",
+}
+
+# 서버 측 레이아웃 간격(px)
+LAYOUT_SPACING_X = 150
+LAYOUT_SPACING_Y = 110
+LAYOUT_RANK_GAP = 180
+LAYOUT_GROUP_GAP = 60
+LAYOUT_HOST_GAP = 200
+
+_graphs = {}  # node_id -> _NodeGraph
+_event_seq = {}  # node_id -> 수신한 이벤트 수 (조회 중 도착한 이벤트 감지용)
+_build_locks = {}  # node_id -> 같은 노드를 동시에 여러 번 조회하지 않기 위한 Lock
+_lock = threading.Lock()
+_revision = 0  # 그래프가 바뀔 때마다 증가 (전체 노드 공통)
+_stats = {"builds": 0, "hits": 0, "events_applied": 0, "invalidations": 0}
+
+
+class _NodeGraph:
+    __slots__ = ("owner", "containers", "networks", "links", "built_at", "version", "dirty")
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.containers = {}  # container_id -> {"name", "image", "status"}
+        self.networks = {}  # network_id -> {"name", "driver", "scope"}
+        self.links = {}  # (container_id, network_id) -> IP 주소
+        self.built_at = time.monotonic()
+        self.version = 0
+        self.dirty = False
+
+
+def _touch(graph: _NodeGraph):
+    global _revision
+    _revision += 1
+    graph.version = _revision
+
+
+def _parse_graph(owner, raw_networks, raw_containers) -> _NodeGraph:
+    """/networks, /containers/json 결과로 그래프 생성"""
+    graph = _NodeGraph(owner)
+    for net in raw_networks:
+        graph.networks[net["Id"][:12]] = {
+            "name": net.get("Name", ""),
+            "driver": net.get("Driver", ""),
+            "scope": net.get("Scope", ""),
+        }
+    for raw in raw_containers:
+        cid = raw["Id"][:12]
+        names = raw.get("Names") or []
+        graph.containers[cid] = {
+            "name": names[0].lstrip("/") if names else cid,
+            "image": raw.get("Image", ""),
+            "status": raw.get("State", ""),
+        }
+        attached = ((raw.get("NetworkSettings") or {}).get("Networks")) or {}
+        for endpoint in attached.values():
+            nid = (endpoint.get("NetworkID") or "")[:12]
+            if nid in graph.networks:
+                graph.links[(cid, nid)] = endpoint.get("IPAddress") or None
+    return graph
+
+
+def _build(node_id: str) -> _NodeGraph:
+    """노드 그래프를 Docker에서 새로 조회해 캐시에 저장"""
+    with _lock:
+        seq = _event_seq.get(node_id, 0)
+    owner = get_connection_key(node_id)
+    api = get_docker_client(node_id).api
+    graph = _parse_graph(owner, api.networks(), api.containers(all=True))
+    with _lock:
+        _touch(graph)
+        # 조회하는 동안 이벤트가 왔다면 반영 여부를 알 수 없으므로 다음 조회 때 다시 만든다
+        graph.dirty = _event_seq.get(node_id, 0) != seq
+        _graphs[node_id] = graph
+        _stats["builds"] += 1
+    return graph
+
+
+def _is_fresh(graph, owner) -> bool:
+    return (
+        graph is not None
+        and not graph.dirty
+        and graph.owner == owner
+        and time.monotonic() - graph.built_at < TOPOLOGY_CACHE_TTL
+    )
+
+
+def _get_graph(node_id: str) -> _NodeGraph:
+    """캐시된 노드 그래프 (없거나 무효화됐으면 다시 조회)"""
+    owner = get_connection_key(node_id)
+    with _lock:
+        graph = _graphs.get(node_id)
+        if _is_fresh(graph, owner):
+            _stats["hits"] += 1
+            return graph
+        build_lock = _build_locks.setdefault(node_id, threading.Lock())
+    with build_lock:
+        # 기다리는 동안 다른 요청이 이미 다시 만들었을 수 있다
+        with _lock:
+            graph = _graphs.get(node_id)
+            if _is_fresh(graph, owner):
+                _stats["hits"] += 1
+                return graph
+        return _build(node_id)
+
+
+def invalidate(node_id: str = None):
+    """캐시 무효화 (다음 조회 때 다시 만든다)"""
+    with _lock:
+        targets = list(_graphs.values()) if node_id is None else [_graphs.get(node_id)]
+        for graph in targets:
+            if graph is not None:
+                graph.dirty = True
+        _stats["invalidations"] += 1
+
+
+def _apply_container_event(graph: _NodeGraph, event: dict):
+    """반영했으면 True, 캐시로 반영할 수 없으면 False, 그래프와 무관하면 None"""
+    cid = event.get("id")
+    action = event.get("action")
+    container = graph.containers.get(cid)
+    if action == "create":
+        graph.containers[cid] = {
+            "name": event.get("name") or cid,
+            "image": event.get("image", ""),
+            "status": "created",
+        }
+        return True
+    if container is None:
+        return False
+    if action == "destroy":
+        del graph.containers[cid]
+        for key in [k for k in graph.links if k[0] == cid]:
+            del graph.links[key]
+    elif action == "rename":
+        container["name"] = event.get("name") or container["name"]
+    elif action in CONTAINER_ACTION_STATUS:
+        container["status"] = CONTAINER_ACTION_STATUS[action]
+    else:
+        return None  # 그래프와 무관한 이벤트 (health 등)
+    return True
+
+
+def _apply_network_event(graph: _NodeGraph, event: dict):
+    nid = event.get("network_id")
+    action = event.get("action")
+    if action == "create":
+        graph.networks[nid] = {"name": event.get("network", ""), "driver": event.get("driver", ""), "scope": "local"}
+        return True
+    if nid not in graph.networks:
+        return False
+    if action == "destroy":
+        del graph.networks[nid]
+        for key in [k for k in graph.links if k[1] == nid]:
+            del graph.links[key]
+        return True
+    cid = event.get("container_id")
+    if cid not in graph.containers:
+        return False
+    if action == "connect":
+        # 이벤트에는 IP가 없으므로 다음 전체 조회 때 채워진다
+        graph.links.setdefault((cid, nid), None)
+    else:
+        graph.links.pop((cid, nid), None)
+    return True
+
+
+def handle_event(event: dict):
+    """이벤트 허브 콜백: 캐시된 그래프에 변경분 반영 (반영할 수 없으면 무효화)"""
+    node_id = event.get("node_id")
+    if not node_id or event.get("type") not in ("container", "network", "resync"):
+        return
+    with _lock:
+        _event_seq[node_id] = _event_seq.get(node_id, 0) + 1
+        graph = _graphs.get(node_id)
+        if graph is None or graph.dirty:
+            return
+        if event["type"] == "container":
+            applied = _apply_container_event(graph, event)
+        elif event["type"] == "network":
+            applied = _apply_network_event(graph, event)
+        else:
+            applied = False
+        if applied is None:
+            return
+        if applied:
+            _touch(graph)
+            _stats["events_applied"] += 1
+        else:
+            graph.dirty = True
+            _stats["invalidations"] += 1
+
+
+event_hub.add_listener(handle_event)
+
+
+def host_element_id(node_id: str) -> str:
+    return f"host:{node_id}"
+
+
+def _node_elements(node_id: str, graph: _NodeGraph, label: str, empty_networks: bool):
+    """노드 그래프를 Cytoscape 요소 형식의 (nodes, edges)로 변환"""
+    host_id = host_element_id(node_id)
+    with _lock:
+        containers = dict(graph.containers)
+        networks = dict(graph.networks)
+        links = dict(graph.links)
+
+    used = {nid for _, nid in links}
+    nodes = [{"id": host_id, "type": "host", "node_id": node_id, "label": label}]
+    edges = []
+    for nid, net in sorted(networks.items(), key=lambda item: item[1]["name"]):
+        if not empty_networks and nid not in used:
+            continue
+        net_id = f"net:{node_id}:{nid}"
+        nodes.append({
+            "id": net_id, "type": "network", "node_id": node_id, "network_id": nid,
+            "label": net["name"], "driver": net["driver"], "scope": net["scope"],
+        })
+        edges.append({"id": f"{host_id}>{net_id}", "source": host_id, "target": net_id, "type": "host"})
+
+    attached = set()
+    for (cid, nid), ip in sorted(links.items(), key=lambda item: (networks[item[0][1]]["name"], item[0][0])):
+        net_id = f"net:{node_id}:{nid}"
+        ctr_id = f"ctr:{node_id}:{cid}"
+        attached.add(cid)
+        edges.append({"id": f"{net_id}>{ctr_id}", "source": net_id, "target": ctr_id, "type": "attach", "ip": ip})
+
+    for cid, c in sorted(containers.items(), key=lambda item: item[1]["name"]):
+        ctr_id = f"ctr:{node_id}:{cid}"
+        nodes.append({
+            "id": ctr_id, "type": "container", "node_id": node_id, "container_id": cid,
+            "label": c["name"], "image": c["image"], "status": c["status"],
+        })
+        if cid not in attached:
+            # 네트워크에 연결되지 않은 컨테이너는 노드에 바로 연결
+            edges.append({"id": f"{host_id}>{ctr_id}", "source": host_id, "target": ctr_id, "type": "host"})
+    return nodes, edges
+
+
+def compute_layout(nodes: list, edges: list) -> dict:
+    """
+    계층형 레이아웃 좌표 계산 (element id -> {"x", "y"})
+
+    노드(host) / 네트워크 / 컨테이너를 세 층으로 놓고, 컨테이너는 첫 번째로 연결된
+    네트워크 아래에 격자로 모은다. 요소 수에 비례하는 시간만 들어 브라우저가
+    수천 개 요소에 dagre를 돌리지 않아도 된다.
+    """
+    kinds = {n["id"]: n["type"] for n in nodes}
+    children = {}  # 부모 id -> 하위 요소 id 목록
+    placed = set()
+    for edge in edges:
+        target = edge["target"]
+        if kinds.get(target) == "network" or (kinds.get(target) == "container" and target not in placed):
+            children.setdefault(edge["source"], []).append(target)
+            placed.add(target)
+
+    positions = {}
+    x = 0.0
+    for host in (n["id"] for n in nodes if n["type"] == "host"):
+        start = x
+        groups = [(net, children.get(net, [])) for net in children.get(host, []) if kinds[net] == "network"]
+        direct = [c for c in children.get(host, []) if kinds[c] == "container"]
+        if direct:
+            groups.append((None, direct))
+        for parent, members in groups:
+            cols = max(1, math.ceil(math.sqrt(len(members))))
+            for i, member in enumerate(members):
+                positions[member] = {
+                    "x": x + (i % cols + 0.5) * LAYOUT_SPACING_X,
+                    "y": 2 * LAYOUT_RANK_GAP + (i // cols) * LAYOUT_SPACING_Y,
+                }
+            width = cols * LAYOUT_SPACING_X
+            if parent is not None:
+                positions[parent] = {"x": x + width / 2, "y": LAYOUT_RANK_GAP}
+            x += width + LAYOUT_GROUP_GAP
+        end = x - LAYOUT_GROUP_GAP if groups else x + LAYOUT_SPACING_X
+        positions[host] = {"x": (start + end) / 2, "y": 0.0}
+        x = end + LAYOUT_HOST_GAP
+    return positions
+
+
+def get_node_topology(node_id: str, empty_networks: bool = False, layout: bool = False) -> dict:
+    """노드 하나의 토폴로지 그래프"""
+    graph = _get_graph(node_id)
+    label = (get_docker_hosts().get(node_id) or {}).get("label", node_id)
+    nodes, edges = _node_elements(node_id, graph, label, empty_networks)
+    result = {"nodes": nodes, "edges": edges, "version": graph.version}
+    if layout:
+        result["positions"] = compute_layout(nodes, edges)
+    return result
+
+
+def get_cluster_topology(empty_networks: bool = False, layout: bool = False,
+                         timeout: float = CLUSTER_LIST_TIMEOUT) -> dict:
+    """
+    모든 노드의 토폴로지를 하나의 그래프로 병합
+
+    캐시가 없는 노드만 동시에 조회하며, 실패한 노드는 hosts 항목의 error로 알린다.
+    """
+    hosts = get_docker_hosts()
+    results = {}
+    for node_id, graph, error, _ in iter_nodes_concurrently(_get_graph, list(hosts), timeout):
+        results[node_id] = (graph, error)
+
+    nodes, edges, summary = [], [], []
+    for node_id, info in hosts.items():
+        graph, error = results.get(node_id, (None, "조회되지 않음"))
+        entry = {"node_id": node_id, "ok": graph is not None, "error": error, "version": None}
+        if graph is not None:
+            node_nodes, node_edges = _node_elements(node_id, graph, info.get("label", node_id), empty_networks)
+            nodes += node_nodes
+            edges += node_edges
+            entry["version"] = graph.version
+        else:
+            # 조회에 실패한 노드도 그래프에 표시
+            nodes.append({
+                "id": host_element_id(node_id), "type": "host", "node_id": node_id,
+                "label": info.get("label", node_id), "error": error,
+            })
+        summary.append(entry)
+
+    result = {
+        "nodes": nodes,
+        "edges": edges,
+        "version": max((e["version"] or 0 for e in summary), default=0),
+        "hosts": summary,
+        "partial": any(not e["ok"] for e in summary),
+    }
+    if layout:
+        result["positions"] = compute_layout(nodes, edges)
+    return result
+
+
+def get_topology_stats() -> dict:
+    with _lock:
+        return {**_stats, "nodes": len(_graphs), "revision": _revision}
@@ -0,0 +1,796 @@
+"""벤치마크용 가짜 Docker Engine API 서버
+
+로컬 TCP 포트 또는 unix 소켓에서 Docker Engine API의 일부를 흉내 내고, 경로별
+요청 수를 센다. 응답 지연(평균 + 지터)과 실패율을 설정해 느린 노드/불안정한 노드를
+재현할 수 있다.
+"""
+import hashlib
+import io
+import json
+import os
+import queue
+import random
+import re
+import socketserver
+import tarfile
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+API_VERSION = "1.43"
+
+
+def make_networks() -> dict:
+    """기본 네트워크 3개와 FL 전용 브리지 네트워크"""
+    networks = {}
+    for name, driver in (("bridge", "bridge"), ("host", "host"), ("none", "null"), ("fl-net", "bridge")):
+        nid = hashlib.sha256(f"network-{name}".encode()).hexdigest()
+        networks[nid] = {"Id": nid, "Name": name, "Driver": driver, "Scope": "local"}
+    return networks
+
+
+def _endpoint(network: dict, i: int) -> dict:
+    return {"NetworkID": network["Id"], "IPAddress": f"172.20.{i // 250}.{i % 250 + 2}"}
+
+
+def make_layer(name: str, size: int = 64 << 10):
+    """레이어 내용과 diff ID (내용의 sha256)"""
+    content = (name.encode() + b"\n") * (size // (len(name) + 1))
+    return "sha256:" + hashlib.sha256(content).hexdigest(), content
+
+
+def chain_ids(diff_ids: list) -> list:
+    chains, chain = [], None
+    for diff_id in diff_ids:
+        chain = diff_id if chain is None else "sha256:" + hashlib.sha256(f"{chain} {diff_id}".encode()).hexdigest()
+        chains.append(chain)
+    return chains
+
+
+def make_image(name: str, layer_names: list, layers: dict) -> dict:
+    """레이어를 layers 저장소에 넣고 이미지 정보 생성 (ID는 레이어 구성으로 결정)"""
+    diff_ids = []
+    for layer_name in layer_names:
+        diff_id, content = make_layer(layer_name)
+        layers[diff_id] = content
+        diff_ids.append(diff_id)
+    image_id = "sha256:" + hashlib.sha256(" ".join(diff_ids).encode()).hexdigest()
+    return {
+        "Id": image_id,
+        "RepoTags": [name],
+        "Size": sum(len(layers[d]) for d in diff_ids),
+        "RootFS": {"Type": "layers", "Layers": diff_ids},
+    }
+
+
+def make_containers(count: int, image_count: int, networks: dict = None, layers: dict = None):
+    """
+    가짜 컨테이너/이미지 데이터 생성 (모두 fl-net에, 홀수 번째는 bridge에도 연결)
+
+    이미지는 모두 같은 base 레이어 위에 자기 레이어 하나를 얹은 구성이며,
+    layers를 주면 레이어 내용을 채운다.
+    """
+    layers = {} if layers is None else layers
+    images = {}
+    for i in range(max(1, image_count)):
+        image = make_image(f"fl/image-{i}:latest", ["base", f"image-{i}"], layers)
+        images[image["Id"]] = image
+    image_ids = list(images)
+
+    by_name = {n["Name"]: n for n in (networks or {}).values()}
+    containers = {}
+    for i in range(count):
+        cid = hashlib.sha256(f"container-{i}".encode()).hexdigest()
+        attached = {}
+        if "fl-net" in by_name:
+            attached["fl-net"] = _endpoint(by_name["fl-net"], i)
+        if i % 2 and "bridge" in by_name:
+            attached["bridge"] = _endpoint(by_name["bridge"], i)
+        containers[cid] = {
+            "Id": cid,
+            "Names": [f"/container-{i}"],
+            "ImageID": image_ids[i % len(image_ids)],
+            "State": "running" if i % 3 else "exited",
+            "Ports": [{"IP": "0.0.0.0", "PrivatePort": 8080, "PublicPort": 9000 + i, "Type": "tcp"}],
+            "Labels": {"fl.role": "supernode" if i % 2 else "superlink"},
+            "NetworkSettings": {"Networks": attached},
+        }
+    return containers, images
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None):
+        payload = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _simulate(self, path: str) -> bool:
+        """지연을 적용하고, 실패로 뽑히면 500 응답 후 False 반환"""
+        daemon = self.server.daemon
+        daemon.record(path)
+        daemon.delay()
+        if daemon.should_fail():
+            self._send(500, {"message": "simulated failure"})
+            return False
+        return True
+
+    def _events(self):
+        """chunked 이벤트 스트림 (데몬 종료 시까지 유지)"""
+        daemon = self.server.daemon
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+        events = daemon.subscribe_events()
+        try:
+            while not daemon.closing.is_set():
+                try:
+                    event = events.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                payload = json.dumps(event).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+        finally:
+            daemon.unsubscribe_events(events)
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _logs(self, c: dict, query: dict):
+        """다중화 프레임 로그 (tail/since/follow/timestamps 지원)"""
+        daemon = self.server.daemon
+        tail = query.get("tail", ["all"])[0]
+        since = float(query.get("since", ["0"])[0])
+        follow = query.get("follow", ["0"])[0] in ("1", "true")
+        timestamps = query.get("timestamps", ["0"])[0] in ("1", "true")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.multiplexed-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def frame(k: int) -> bytes:
+            stream, t, text = daemon.log_line(c, k)
+            line = (daemon.format_time(t) + " " if timestamps else "") + text + "\n"
+            payload = line.encode()
+            return bytes([stream, 0, 0, 0]) + len(payload).to_bytes(4, "big") + payload
+
+        count = daemon.log_count(c)
+        first = 0 if tail == "all" else max(0, count - int(tail))
+        try:
+            for k in range(first, count):
+                if daemon.log_line(c, k)[1] >= since:
+                    self._write_chunk(frame(k))
+            while follow and not daemon.closing.wait(daemon.log_interval):
+                self._write_chunk(frame(daemon.next_log(c)))
+            self._write_chunk(b"")
+        except OSError:
+            pass
+        self.close_connection = True
+
+    def do_GET(self):
+        daemon = self.server.daemon
+        path = re.sub(r"^/v[\d.]+", "", self.path.split("?", 1)[0])
+        if path == "/events":
+            daemon.record(path)
+            return self._events()
+        if not self._simulate(path):
+            return
+
+        if m := re.match(r"^/containers/([^/]+)/logs$", path):
+            c = daemon.find_container(m.group(1))
+            if c is None:
+                return self._send(404, {"message": "No such container"})
+            return self._logs(c, parse_qs(urlsplit(self.path).query))
+        if path == "/_ping":
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+        elif path == "/version":
+            self._send(200, {"Version": "24.0.0", "ApiVersion": API_VERSION})
+        elif path == "/containers/json":
+            query = parse_qs(urlsplit(self.path).query)
+            filters = json.loads(query.get("filters", ["{}"])[0])
+            show_all = query.get("all", ["0"])[0] not in ("0", "false", "")
+            self._send(200, daemon.filter_containers(
+                filters.get("label", []), names=filters.get("name", []), running_only=not show_all
+            ))
+        elif path == "/images/json":
+            self._send(200, list(daemon.images.values()))
+        elif m := re.match(r"^/exec/([^/]+)/json$", path):
+            record = daemon.execs.get(m.group(1))
+            if record is None:
+                return self._send(404, {"message": "No such exec instance"})
+            self._send(200, {
+                "ID": m.group(1), "Running": record["running"], "ExitCode": record["exit_code"],
+                "ContainerID": record["container"]["Id"],
+            })
+        elif path == "/networks":
+            query = parse_qs(urlsplit(self.path).query)
+            filters = json.loads(query.get("filters", ["{}"])[0])
+            self._send(200, daemon.filter_networks(filters.get("name", []), filters.get("label", [])))
+        elif m := re.match(r"^/containers/([^/]+)/json$", path):
+            c = daemon.find_container(m.group(1))
+            if c is None:
+                return self._send(404, {"message": "No such container"})
+            ports = {}
+            for p in c["Ports"]:
+                ports[f"{p['PrivatePort']}/{p['Type']}"] = [
+                    {"HostIp": p["IP"], "HostPort": str(p["PublicPort"])}
+                ]
+            self._send(200, {
+                "Id": c["Id"],
+                "Name": c["Names"][0],
+                "Image": c["ImageID"],
+                "State": {
+                    "Status": c["State"],
+                    "Running": c["State"] == "running",
+                    "ExitCode": c.get("ExitCode", 0),
+                },
+                "Config": {"Labels": c["Labels"], "Tty": False, "Cmd": c.get("Cmd")},
+                "NetworkSettings": {"Ports": ports},
+            })
+        elif m := re.match(r"^/containers/([^/]+)/stats$", path):
+            c = daemon.find_container(m.group(1))
+            if c is None:
+                return self._send(404, {"message": "No such container"})
+            self._send(200, daemon.fake_stats(c))
+        elif m := re.match(r"^/images/(.+)/(json|get)$", path):
+            image = daemon.find_image(m.group(1))
+            if image is None:
+                return self._send(404, {"message": "No such image"})
+            if m.group(2) == "get":
+                return self._save(image)
+            self._send(200, image)
+        else:
+            self._send(404, {"message": f"not implemented: {path}"})
+
+    def _read_body(self) -> bytes:
+        """요청 본문 (chunked 전송 포함)"""
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        data = bytearray()
+        while True:
+            size = int(self.rfile.readline().split(b";", 1)[0], 16)
+            if not size:
+                self.rfile.readline()
+                return bytes(data)
+            data += self.rfile.read(size)
+            self.rfile.readline()
+
+    def _save(self, image: dict):
+        """OCI 형식 docker save tar (레이어 blob 이름이 diff ID)"""
+        daemon = self.server.daemon
+        buffer = io.BytesIO()
+
+        def add(tar, name: str, data: bytes):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0
+            tar.addfile(info, io.BytesIO(data))
+
+        with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            config = json.dumps({"rootfs": {"type": "layers", "diff_ids": image["RootFS"]["Layers"]}}).encode()
+            config_name = "blobs/sha256/" + hashlib.sha256(config).hexdigest()
+            add(tar, "oci-layout", b'{"imageLayoutVersion": "1.0.0"}')
+            for diff_id in image["RootFS"]["Layers"]:
+                add(tar, "blobs/sha256/" + diff_id.partition(":")[2], daemon.layers[diff_id])
+            add(tar, config_name, config)
+            add(tar, "manifest.json", json.dumps([{
+                "Config": config_name,
+                "RepoTags": image["RepoTags"],
+                "Layers": ["blobs/sha256/" + d.partition(":")[2] for d in image["RootFS"]["Layers"]],
+            }]).encode())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-tar")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        data = buffer.getvalue()
+        try:
+            for start in range(0, len(data), 32 << 10):
+                self._write_chunk(data[start:start + (32 << 10)])
+            self._write_chunk(b"")
+        except OSError:
+            self.close_connection = True
+
+    def _load(self, data: bytes):
+        """
+        docker load: manifest의 레이어 중 노드에 없는 chain의 blob이 빠져 있으면 실패
+
+        실제 Docker처럼 이미 있는 레이어는 blob을 읽지 않는다.
+        """
+        daemon = self.server.daemon
+        try:
+            with tarfile.open(fileobj=io.BytesIO(data), mode="r:") as tar:
+                blobs = {m.name: m for m in tar.getmembers()}
+                manifest = json.loads(tar.extractfile(blobs["manifest.json"]).read())
+                loaded = []
+                for entry in manifest:
+                    config = json.loads(tar.extractfile(blobs[entry["Config"]]).read())
+                    diff_ids = config["rootfs"]["diff_ids"]
+                    present = daemon.layer_chains()
+                    for diff_id, chain, name in zip(diff_ids, chain_ids(diff_ids), entry["Layers"]):
+                        if chain in present:
+                            continue
+                        if name not in blobs:
+                            raise ValueError(f"open {name}: no such file or directory")
+                        content = tar.extractfile(blobs[name]).read()
+                        if "sha256:" + hashlib.sha256(content).hexdigest() != diff_id:
+                            raise ValueError(f"layer {diff_id} digest mismatch")
+                        daemon.layers[diff_id] = content
+                    loaded.append(daemon.add_image(diff_ids, entry.get("RepoTags") or []))
+        except (KeyError, ValueError, tarfile.TarError) as e:
+            return self._send(200, {"errorDetail": {"message": str(e)}, "error": str(e)})
+        self._send(200, {"stream": "".join(f"Loaded image: {name}\n" for name in loaded)})
+
+    def do_POST(self):
+        daemon = self.server.daemon
+        path = re.sub(r"^/v[\d.]+", "", self.path.split("?", 1)[0])
+        query = parse_qs(urlsplit(self.path).query)
+        raw = self._read_body()
+        body = {}
+        if raw and path != "/images/load":
+            body = json.loads(raw)
+        if not self._simulate(path):
+            return
+
+        if path == "/images/load":
+            return self._load(raw)
+        if path == "/images/create":
+            name = query.get("fromImage", [""])[0] + ":" + query.get("tag", ["latest"])[0]
+            if daemon.find_image(name) is None:
+                return self._send(404, {"message": f"pull access denied for {name}"})
+            return self._send(200, {"status": f"Status: Image is up to date for {name}"})
+        if m := re.match(r"^/images/(.+)/tag$", path):
+            image = daemon.find_image(m.group(1))
+            if image is None:
+                return self._send(404, {"message": "No such image"})
+            name = query.get("repo", [""])[0] + ":" + query.get("tag", ["latest"])[0]
+            if name not in image["RepoTags"]:
+                image["RepoTags"].append(name)
+            return self._send(201)
+
+        if m := re.match(r"^/networks/([^/]+)/(connect|disconnect)$", path):
+            return self._network_action(m.group(1), m.group(2), body)
+
+        if m := re.match(r"^/containers/([^/]+)/exec$", path):
+            c = daemon.find_container(m.group(1))
+            if c is None:
+                return self._send(404, {"message": "No such container"})
+            if c["State"] != "running":
+                return self._send(409, {"message": f"container {c['Id'][:12]} is not running"})
+            return self._send(201, {"Id": daemon.add_exec(c, body.get("Cmd") or [])})
+        if m := re.match(r"^/exec/([^/]+)/start$", path):
+            record = daemon.execs.get(m.group(1))
+            if record is None:
+                return self._send(404, {"message": "No such exec instance"})
+            return self._exec_start(record)
+        if path == "/containers/create":
+            return self._create_container(query.get("name", [""])[0], body)
+        if path == "/networks/create":
+            network = daemon.add_network(body["Name"], body.get("Driver") or "bridge", body.get("Labels") or {})
+            return self._send(201, {"Id": network["Id"], "Warning": ""})
+
+        m = re.match(r"^/containers/([^/]+)/(start|stop|restart)$", path)
+        if not m:
+            return self._send(404, {"message": f"not implemented: {path}"})
+        c = daemon.find_container(m.group(1))
+        if c is None:
+            return self._send(404, {"message": "No such container"})
+        action = m.group(2)
+        if action in ("stop", "restart") and c["State"] == "running":
+            # 실제 데몬처럼 SIGTERM -> die(143) -> stop 순서로 전달
+            c["State"], c["ExitCode"] = "exited", 143
+            daemon.emit_container_event(c, "kill", signal="15")
+            daemon.emit_container_event(c, "die", exitCode="143")
+            daemon.emit_container_event(c, "stop")
+        if action != "stop":
+            c["State"], c["ExitCode"] = "running", 0
+            daemon.emit_container_event(c, "start")
+            if "crash" in c.get("Image", ""):
+                # 이름에 crash가 들어간 이미지는 시작 직후 종료 (배포 롤백 재현용)
+                c["State"], c["ExitCode"] = "exited", 1
+                daemon.emit_container_event(c, "die", exitCode="1")
+        self._send(204)
+
+    def _exec_start(self, record: dict):
+        """
+        가짜 명령 실행: 다중화 프레임 출력 후 연결 종료 (Upgrade 없이 시작한 exec와 같은 형식)
+
+        명령에 "sleep N"이 있으면 첫 줄 뒤 N초 대기, "lines N"이면 N줄 출력,
+        "fail"이 있으면 stderr에 한 줄 쓰고 exit code 1로 끝난다.
+        """
+        command = " ".join(record["cmd"])
+        name = record["container"]["Names"][0].lstrip("/")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.multiplexed-stream")
+        self.end_headers()
+
+        def frame(stream: int, text: str) -> bytes:
+            payload = (text + "\n").encode()
+            return bytes([stream, 0, 0, 0]) + len(payload).to_bytes(4, "big") + payload
+
+        record["running"] = True
+        try:
+            self.wfile.write(frame(1, f"{name}: {command}"))
+            self.wfile.flush()
+            if m := re.search(r"sleep (\d+(?:\.\d+)?)", command):
+                time.sleep(float(m.group(1)))
+            if m := re.search(r"lines (\d+)", command):
+                for k in range(int(m.group(1))):
+                    self.wfile.write(frame(1, f"{name} line {k}"))
+            if "fail" in command:
+                self.wfile.write(frame(2, f"{name}: command failed"))
+                record["exit_code"] = 1
+            self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            record["running"] = False
+            self.close_connection = True
+
+    def do_DELETE(self):
+        daemon = self.server.daemon
+        path = re.sub(r"^/v[\d.]+", "", self.path.split("?", 1)[0])
+        if not self._simulate(path):
+            return
+        if m := re.match(r"^/containers/([^/]+)$", path):
+            c = daemon.find_container(m.group(1))
+            if c is None:
+                return self._send(404, {"message": "No such container"})
+            force = parse_qs(urlsplit(self.path).query).get("force", ["0"])[0] in ("1", "true", "True")
+            if c["State"] == "running" and not force:
+                return self._send(409, {"message": "cannot remove a running container"})
+            daemon.containers.pop(c["Id"], None)
+            daemon.emit_container_event(c, "destroy")
+            return self._send(204)
+        if m := re.match(r"^/networks/([^/]+)$", path):
+            network = daemon.find_network(m.group(1))
+            if network is None:
+                return self._send(404, {"message": "No such network"})
+            if any(network["Name"] in c["NetworkSettings"]["Networks"] for c in daemon.containers.values()):
+                return self._send(403, {"message": "network has active endpoints"})
+            daemon.networks.pop(network["Id"], None)
+            return self._send(204)
+        self._send(404, {"message": f"not implemented: {path}"})
+
+    def _create_container(self, name: str, body: dict):
+        """docker create (이미지가 없으면 404, 이름이 겹치면 409)"""
+        daemon = self.server.daemon
+        image = daemon.find_image(body.get("Image", ""))
+        if image is None:
+            return self._send(404, {"message": f"No such image: {body.get('Image')}"})
+        if name and daemon.find_container(name) is not None:
+            return self._send(409, {"message": f'Conflict. The container name "/{name}" is already in use'})
+        cid = hashlib.sha256(f"created-{name}-{time.time_ns()}".encode()).hexdigest()
+        attached = {}
+        for i, network_name in enumerate(((body.get("NetworkingConfig") or {}).get("EndpointsConfig") or {})):
+            network = daemon.find_network(network_name)
+            if network is None:
+                return self._send(404, {"message": f"network {network_name} not found"})
+            attached[network["Name"]] = _endpoint(network, len(daemon.containers) + i)
+        ports = []
+        for private, bindings in ((body.get("HostConfig") or {}).get("PortBindings") or {}).items():
+            port, _, protocol = private.partition("/")
+            for binding in bindings or []:
+                ports.append({
+                    "IP": binding.get("HostIp") or "0.0.0.0", "PrivatePort": int(port),
+                    "PublicPort": int(binding.get("HostPort") or 0), "Type": protocol or "tcp",
+                })
+        c = {
+            "Id": cid,
+            "Names": [f"/{name or cid[:12]}"],
+            "Image": body["Image"],
+            "ImageID": image["Id"],
+            "State": "created",
+            "Ports": ports,
+            "Labels": body.get("Labels") or {},
+            "NetworkSettings": {"Networks": attached},
+            "Cmd": body.get("Cmd"),
+        }
+        with daemon._lock:
+            daemon.containers[cid] = c
+        daemon.emit_container_event(c, "create")
+        self._send(201, {"Id": cid, "Warnings": []})
+
+
+    def _network_action(self, ref: str, action: str, body: dict):
+        """컨테이너를 네트워크에 연결/해제하고 network 이벤트 발생"""
+        daemon = self.server.daemon
+        network = daemon.find_network(ref)
+        c = daemon.find_container(body.get("Container", ""))
+        if network is None or c is None:
+            return self._send(404, {"message": "No such network or container"})
+        attached = c["NetworkSettings"]["Networks"]
+        if action == "connect":
+            attached[network["Name"]] = _endpoint(network, len(attached))
+        elif attached.pop(network["Name"], None) is None:
+            return self._send(403, {"message": "container is not connected to the network"})
+        daemon.emit_event({
+            "Type": "network",
+            "Action": action,
+            "Actor": {"ID": network["Id"], "Attributes": {
+                "container": c["Id"], "name": network["Name"], "type": network["Driver"],
+            }},
+            "time": int(time.time()),
+        })
+        self._send(200)
+
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False  # TCP 옵션은 unix 소켓에 적용할 수 없다
+
+    def address_string(self):
+        return "unix"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FakeDockerDaemon:
+    """
+    하나의 가짜 노드 (백그라운드 스레드에서 HTTP 서버 실행)
+
+    latency_ms/jitter_ms: 요청마다 적용할 평균 지연과 균등 분포 지터
+    failure_rate: 500 응답을 돌려줄 확률 (0~1, /events 제외)
+    unix_socket: 지정하면 TCP 대신 해당 경로의 unix 소켓에서 대기
+    log_lines/log_interval: 컨테이너별 기존 로그 줄 수, follow 시 새 줄 생성 간격(초)
+    """
+
+    def __init__(self, containers: int = 10, images: int = 3, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, failure_rate: float = 0.0, unix_socket: str = None,
+                 seed: int = None, log_lines: int = 100, log_interval: float = 0.2):
+        self.networks = make_networks()
+        self.layers = {}
+        self.containers, self.images = make_containers(containers, images, self.networks, self.layers)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.requests = Counter()
+        self.closing = threading.Event()
+        self._ticks = {}
+        self._event_queues = set()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._unix_socket = unix_socket
+        self.log_lines = log_lines
+        self.log_interval = log_interval
+        self._log_counts = {}
+        self.execs = {}
+        if unix_socket:
+            self._server = _UnixHTTPServer(unix_socket, _UnixHandler)
+        else:
+            self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        if self._unix_socket:
+            return f"unix://{self._unix_socket}"
+        host, port = self._server.server_address[:2]
+        return f"tcp://{host}:{port}"
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            with self._lock:
+                jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def should_fail(self) -> bool:
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def subscribe_events(self) -> queue.Queue:
+        events = queue.Queue()
+        with self._lock:
+            self._event_queues.add(events)
+        return events
+
+    def unsubscribe_events(self, events: queue.Queue):
+        with self._lock:
+            self._event_queues.discard(events)
+
+    def emit_container_event(self, c: dict, action: str, **attrs):
+        """열린 /events 스트림 모두에 컨테이너 이벤트 전달 (attrs: exitCode, signal 등)"""
+        now = time.time_ns()
+        self.emit_event({
+            "Type": "container",
+            "Action": action,
+            "Actor": {"ID": c["Id"], "Attributes": {"name": c["Names"][0].lstrip("/"), "image": c.get("Image", ""), **attrs}},
+            "time": now // 1_000_000_000,
+            "timeNano": now,
+        })
+
+    def emit_event(self, event: dict):
+        """열린 /events 스트림 모두에 이벤트 전달"""
+        with self._lock:
+            targets = list(self._event_queues)
+        for events in targets:
+            events.put(event)
+
+    def record(self, path: str):
+        # 컨테이너/이미지 ID는 경로 패턴으로 묶어서 집계
+        key = re.sub(r"/(containers|images|networks|exec)/.+/(\w+)$", r"/\1/{id}/\2", path)
+        with self._lock:
+            self.requests[key] += 1
+
+    def filter_containers(self, labels, names=(), running_only=False):
+        """label 필터("key" 또는 "key=value"), name 필터(부분 일치), all=0(실행 중만) 적용"""
+        result = []
+        for c in self.containers.values():
+            if running_only and c["State"] != "running":
+                continue
+            if names and not any(n in name for n in names for name in c["Names"]):
+                continue
+            ok = True
+            for selector in labels:
+                key, _, value = selector.partition("=")
+                if key not in c["Labels"] or (value and c["Labels"][key] != value):
+                    ok = False
+                    break
+            if ok:
+                result.append(c)
+        return result
+
+    def fake_stats(self, c: dict) -> dict:
+        """호출될 때마다 누적 카운터가 증가하는 stats 응답"""
+        with self._lock:
+            tick = self._ticks[c["Id"]] = self._ticks.get(c["Id"], 0) + 1
+        return {
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": tick * 5_000_000},
+                "system_cpu_usage": tick * 100_000_000,
+                "online_cpus": 4,
+            },
+            "memory_stats": {"usage": 64 << 20, "limit": 1 << 30, "stats": {"inactive_file": 4 << 20}},
+            "networks": {"eth0": {"rx_bytes": tick * 1024, "tx_bytes": tick * 512}},
+            "blkio_stats": {"io_service_bytes_recursive": [
+                {"op": "read", "value": tick * 4096},
+                {"op": "write", "value": tick * 8192},
+            ]},
+        }
+
+    LOG_EPOCH = 1_700_000_000.0
+
+    def log_line(self, c: dict, k: int):
+        """k번째 로그 줄 (stream 번호, 시각, 본문): 컨테이너마다 시각이 조금씩 어긋난다"""
+        offset = (int(c["Id"][:4], 16) % 1000) / 1000
+        stream = 2 if k % 5 == 4 else 1
+        return stream, self.LOG_EPOCH + k + offset, f"{c['Names'][0].lstrip('/')} line {k}"
+
+    def log_count(self, c: dict) -> int:
+        with self._lock:
+            return self._log_counts.get(c["Id"], self.log_lines)
+
+    def next_log(self, c: dict) -> int:
+        with self._lock:
+            k = self._log_counts.get(c["Id"], self.log_lines)
+            self._log_counts[c["Id"]] = k + 1
+            return k
+
+    @staticmethod
+    def format_time(t: float) -> str:
+        seconds = int(t)
+        nanos = round((t - seconds) * 1e9)
+        base = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        # Docker처럼 소수부 끝의 0을 생략 (RFC3339Nano)
+        frac = f"{nanos:09d}".rstrip("0")
+        return f"{base}.{frac}Z" if frac else f"{base}Z"
+
+    def add_exec(self, c: dict, cmd: list) -> str:
+        exec_id = hashlib.sha256(f"exec-{c['Id']}-{time.time_ns()}".encode()).hexdigest()
+        with self._lock:
+            self.execs[exec_id] = {"container": c, "cmd": list(cmd), "running": False, "exit_code": 0}
+        return exec_id
+
+    def add_network(self, name: str, driver: str = "bridge", labels: dict = None) -> dict:
+        nid = hashlib.sha256(f"network-{name}-{time.time_ns()}".encode()).hexdigest()
+        network = {"Id": nid, "Name": name, "Driver": driver, "Scope": "local", "Labels": labels or {}}
+        with self._lock:
+            self.networks[nid] = network
+        return network
+
+    def filter_networks(self, names, labels) -> list:
+        """name(부분 일치)/label 필터 적용"""
+        result = []
+        for network in self.networks.values():
+            if names and not any(n in network["Name"] for n in names):
+                continue
+            network_labels = network.get("Labels") or {}
+            if all(
+                key in network_labels and (not value or network_labels[key] == value)
+                for key, _, value in (selector.partition("=") for selector in labels)
+            ):
+                result.append(network)
+        return result
+
+    def find_network(self, ref: str):
+        for nid, network in self.networks.items():
+            if nid.startswith(ref) or network["Name"] == ref:
+                return network
+        return None
+
+    def find_image(self, ref: str):
+        """ID(접두사 포함) 또는 태그로 이미지 찾기"""
+        tag = ref if ":" in ref.rpartition("/")[2] else ref + ":latest"
+        digest = ref.removeprefix("sha256:")
+        for image_id, image in self.images.items():
+            if tag in image["RepoTags"] or image_id.partition(":")[2].startswith(digest):
+                return image
+        return None
+
+    def add_named_image(self, name: str) -> dict:
+        """base 레이어 위에 이름별 레이어 하나를 얹은 이미지 추가"""
+        image = make_image(name, ["base", name], self.layers)
+        with self._lock:
+            self.images[image["Id"]] = image
+        return image
+
+    def layer_chains(self) -> set:
+        return {c for image in self.images.values() for c in chain_ids(image["RootFS"]["Layers"])}
+
+    def add_image(self, diff_ids: list, repo_tags: list) -> str:
+        """load된 이미지 등록 (같은 ID가 있으면 태그만 합친다)"""
+        image_id = "sha256:" + hashlib.sha256(" ".join(diff_ids).encode()).hexdigest()
+        with self._lock:
+            image = self.images.setdefault(image_id, {
+                "Id": image_id, "RepoTags": [], "Size": sum(len(self.layers[d]) for d in diff_ids),
+                "RootFS": {"Type": "layers", "Layers": list(diff_ids)},
+            })
+            for tag in repo_tags:
+                if tag not in image["RepoTags"]:
+                    image["RepoTags"].append(tag)
+        return repo_tags[0] if repo_tags else image_id
+
+    def find_container(self, ref: str):
+        for cid, c in self.containers.items():
+            if cid.startswith(ref) or c["Names"][0].lstrip("/") == ref:
+                return c
+        return None
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests.clear()
+
+    def total_requests(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.closing.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._unix_socket:
+            try:
+                os.unlink(self._unix_socket)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,68 @@
+"""컨테이너 목록 조회 1회당 Docker API 왕복 수 비교
+
+사용법: python bench/list_containers_roundtrips.py --containers 200 --images 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+import docker  # noqa: E402
+from fake_docker import FakeDockerDaemon  # noqa: E402
+from services.container_service import collect_container_summaries  # noqa: E402
+
+
+def legacy_list(client):
+    """기존 구현: 고수준 API + 컨테이너별 image 지연 로딩"""
+    result = []
+    for c in client.containers.list(all=True):
+        result.append({
+            "id": c.short_id,
+            "name": c.name,
+            "image": ", ".join(c.image.tags) if c.image.tags else c.image.id,
+            "status": c.status,
+        })
+    return result
+
+
+def measure(daemon, fn, repeat: int):
+    daemon.reset_counts()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - started) / repeat
+    return daemon.total_requests() / repeat, elapsed * 1000, dict(daemon.requests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--containers", type=int, default=200)
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    daemon = FakeDockerDaemon(args.containers, args.images).start()
+    try:
+        client = docker.DockerClient(base_url=daemon.base_url)
+        rows = [
+            ("legacy", lambda: legacy_list(client)),
+            ("bulk (cold cache)", lambda: collect_container_summaries(
+                f"bench-{time.perf_counter_ns()}", client.api)),
+            ("bulk (warm cache)", lambda: collect_container_summaries("bench", client.api)),
+        ]
+        collect_container_summaries("bench", client.api)  # warm cache 준비
+
+        print(f"containers={args.containers} images={args.images} repeat={args.repeat}")
+        print(f"{'path':<20}{'round trips/req':>18}{'ms/req':>10}")
+        for name, fn in rows:
+            trips, ms, breakdown = measure(daemon, fn, args.repeat)
+            print(f"{name:<20}{trips:>18.1f}{ms:>10.1f}   {breakdown}")
+        client.close()
+    finally:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
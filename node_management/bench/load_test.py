@@ -0,0 +1,253 @@
+"""대시보드 API 부하 테스트 (가짜 Docker 노드 N개 대상)
+
+실제 Docker 없이 FakeDockerDaemon으로 노드 N개를 띄우고, 임시 servers.yaml로
+대시보드 앱을 uvicorn에서 실행한 뒤 주요 엔드포인트를 지정한 동시성으로 호출한다.
+시나리오별 p50/p95/p99 지연 시간, 처리량, 오류 수, 요청당 Docker API 왕복 수를 출력한다.
+가짜 노드, 앱, 부하 생성기가 한 프로세스에서 돌기 때문에 절대값보다는 변경 전후 비교에 쓴다.
+
+사용법:
+    python bench/load_test.py --nodes 6 --containers 50 --latency-ms 5 --concurrency 32
+    python bench/load_test.py --scenarios status,containers_all --failure-rate 0.1 --json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+import yaml  # noqa: E402
+from fake_docker import FakeDockerDaemon  # noqa: E402
+
+SCENARIOS = ("status", "status_refresh", "containers", "containers_all", "action")
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def start_nodes(args, workdir: Path) -> dict:
+    """가짜 노드를 띄우고 node_id -> FakeDockerDaemon 반환"""
+    daemons = {}
+    for i in range(args.nodes):
+        node_id = "main" if i == 0 else f"silo{i}"
+        unix_socket = str(workdir / f"{node_id}.sock") if args.transport == "unix" else None
+        daemons[node_id] = FakeDockerDaemon(
+            containers=args.containers,
+            images=args.images,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            failure_rate=args.failure_rate,
+            unix_socket=unix_socket,
+            seed=args.seed + i,
+        ).start()
+    return daemons
+
+
+def write_servers_file(daemons: dict, path: Path):
+    servers = {}
+    for node_id, daemon in daemons.items():
+        servers[node_id] = {
+            "base_url": daemon.base_url,
+            "label": node_id,
+            "type": "local" if node_id == "main" else "remote",
+            "role": "central" if node_id == "main" else "client",
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump(servers, f, allow_unicode=True, default_flow_style=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(servers_file: Path, stats: bool):
+    """
+    임시 설정 파일을 사용하도록 바꾼 뒤 대시보드 앱을 백그라운드 스레드에서 실행
+
+    레지스트리 DB와 이벤트 저널도 설정 파일과 같은 임시 디렉터리에 만들어 실제
+    config/의 파일에 가짜 노드 데이터가 섞이지 않게 한다.
+    """
+    from config import server_manager
+    from services import event_journal
+
+    server_manager.SERVERS_FILE = servers_file
+    server_manager.REGISTRY_DB_FILE = servers_file.parent / "servers.db"
+    event_journal.JOURNAL_DB_FILE = servers_file.parent / "events.db"
+    import main
+
+    main.STATS_ENABLED = stats
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        main.app, host="127.0.0.1", port=port, log_level="critical", access_log=False,
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("대시보드 서버 시작 시간 초과")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def make_request(scenario: str, daemons: dict, rng: random.Random):
+    """시나리오별 (method, path, json body) 생성"""
+    node_ids = list(daemons)
+    if scenario == "status":
+        return "GET", "/api/nodes/status", None
+    if scenario == "status_refresh":
+        return "GET", "/api/nodes/status?refresh=true", None
+    if scenario == "containers":
+        return "GET", f"/api/containers?node_id={rng.choice(node_ids)}", None
+    if scenario == "containers_all":
+        return "GET", "/api/containers?node_id=*", None
+    if scenario == "action":
+        node_id = rng.choice(node_ids)
+        container_id = rng.choice(list(daemons[node_id].containers))[:12]
+        return "POST", "/api/containers/restart", {"node_id": node_id, "container_id": container_id}
+    raise ValueError(f"알 수 없는 시나리오: {scenario}")
+
+
+async def run_scenario(base_url: str, scenario: str, daemons: dict, args) -> dict:
+    """요청 args.requests개를 args.concurrency개 워커로 나눠 실행하고 지연 시간 집계"""
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+
+        async def send():
+            method, path, body = make_request(scenario, daemons, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            return time.perf_counter() - started, ok
+
+        for _ in range(args.warmup):
+            await send()
+
+        for daemon in daemons.values():
+            daemon.reset_counts()
+        latencies, errors = [], 0
+        remaining = args.requests
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                elapsed, ok = await send()
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    # 이벤트 스트림 연결은 요청과 무관하므로 제외 (헬스 체크 ping은 포함됨)
+    docker_calls = sum(
+        count
+        for daemon in daemons.values()
+        for path, count in daemon.requests.items()
+        if path != "/events"
+    )
+    return {
+        "scenario": scenario,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": args.concurrency,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        "docker_calls_per_request": round(docker_calls / len(latencies), 2) if latencies else None,
+    }
+
+
+def print_table(results: list):
+    header = f"{'scenario':<16}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'docker/req':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<16}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>9}"
+            f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}"
+            f"{r['docker_calls_per_request']:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 API 부하 테스트 (가짜 Docker 노드 사용)")
+    parser.add_argument("--nodes", type=int, default=6, help="가짜 노드 수 (첫 노드가 main)")
+    parser.add_argument("--containers", type=int, default=50, help="노드당 컨테이너 수")
+    parser.add_argument("--images", type=int, default=5, help="노드당 이미지 수")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Docker API 평균 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=1.0, help="응답 지연 지터 (±)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Docker API 실패 확률 (0~1)")
+    parser.add_argument("--transport", choices=("tcp", "unix"), default="tcp")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"쉼표 구분 ({', '.join(SCENARIOS)})")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="시나리오당 요청 수")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 요청 수")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--stats", action="store_true", help="통계 수집기도 함께 실행")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory(prefix="fl-bench-") as tmp:
+        workdir = Path(tmp)
+        daemons = start_nodes(args, workdir)
+        servers_file = workdir / "servers.yaml"
+        write_servers_file(daemons, servers_file)
+        server, thread, base_url = start_app(servers_file, args.stats)
+        try:
+            results = [
+                asyncio.run(run_scenario(base_url, scenario, daemons, args))
+                for scenario in scenarios
+            ]
+        finally:
+            server.should_exit = True
+            for daemon in daemons.values():
+                daemon.closing.set()
+            thread.join(timeout=10)
+            for daemon in daemons.values():
+                daemon.stop()
+
+    if args.json:
+        print(json.dumps({"config": vars(args), "results": results}, ensure_ascii=False, indent=2))
+        return
+    print(
+        f"nodes={args.nodes} containers/node={args.containers} latency={args.latency_ms}±{args.jitter_ms}ms "
+        f"failure_rate={args.failure_rate} transport={args.transport} concurrency={args.concurrency}"
+    )
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,3 +17,7 @@ export async function restartContainer(nodeId, containerId) {
   return apiPost('/api/containers/restart', { node_id: nodeId, container_id: containerId });
 }
 
+
+export async function getAllContainers(all = true) {
+  return apiGet(`/api/containers/all?all=${all}`);
+}
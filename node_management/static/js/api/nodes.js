@@ -5,8 +5,16 @@ export async function getNodes() {
   return apiGet('/api/nodes');
 }
 
+// age_seconds처럼 매번 바뀌는 필드를 제외해야 ETag 재검증(304)이 동작한다
+const NODE_STATUS_FIELDS = 'id,label,status,type,role,base_url,rtt_ms,error,last_check,stale,circuit';
+
 export async function getNodesStatus() {
-  return apiGet('/api/nodes/status');
+  return apiGet(`/api/nodes/status?fields=${NODE_STATUS_FIELDS}`);
+}
+
+// since 버전 이후 바뀐 서버만 조회 ({ version, reset, added, removed, changed }, since=0이면 전체)
+export async function getNodesStatusChanges(since) {
+  return apiGet(`/api/nodes/status?fields=${NODE_STATUS_FIELDS}&since=${since}`);
 }
 
 export async function getNode(nodeId) {
@@ -0,0 +1,34 @@
+/** 실시간 이벤트 스트림 (Server-Sent Events) 구독 */
+const STREAM_URL = '/api/stream';
+
+// 이벤트 종류별 핸들러: { container, network, node, resync }
+export function subscribeEvents(handlers) {
+  if (typeof EventSource === 'undefined') {
+    console.warn('EventSource를 지원하지 않는 브라우저입니다.');
+    return null;
+  }
+
+  const source = new EventSource(STREAM_URL);
+
+  ['container', 'network', 'node', 'resync'].forEach(type => {
+    source.addEventListener(type, (e) => {
+      const handler = handlers[type];
+      if (!handler) return;
+      try {
+        handler(JSON.parse(e.data));
+      } catch (err) {
+        console.error(`스트림 이벤트 처리 오류 (${type}):`, err);
+      }
+    });
+  });
+
+  // 연결이 끊기면 EventSource가 자동 재연결하며, 그 사이 놓친 변경은 resync로 보정
+  source.addEventListener('ready', () => {
+    if (source._connectedOnce && handlers.resync) {
+      handlers.resync({ type: 'resync' });
+    }
+    source._connectedOnce = true;
+  });
+
+  return source;
+}
@@ -0,0 +1,16 @@
+/** 네트워크 토폴로지 API 호출 */
+import { apiGet } from './client.js';
+
+// nodeId를 생략하면 전체 노드, layout=true이면 서버가 계산한 좌표(positions) 포함
+export async function getTopology(nodeId = null, layout = true) {
+  const params = new URLSearchParams({ layout });
+  if (nodeId) params.set('node_id', nodeId);
+  return apiGet(`/api/topology?${params}`);
+}
+
+// since 버전 이후 바뀐 요소만 조회 ({ nodes: {added, removed, changed}, edges: {...}, ... })
+export async function getTopologyChanges(nodeId, since) {
+  const params = new URLSearchParams({ layout: true, since });
+  if (nodeId) params.set('node_id', nodeId);
+  return apiGet(`/api/topology?${params}`);
+}
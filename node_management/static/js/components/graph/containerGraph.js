@@ -1,5 +1,8 @@
 /** 컨테이너 그래프 렌더링 컴포넌트 */
+import { placeNewNodes } from '../../utils/graph.js';
+
 let cy = null; // 그래프 인스턴스
+let graphVersion = null; // 현재 그래프의 토폴로지 응답 버전 (since 조회에 사용)
 
 // 상태 아이콘 매핑 함수
 function getStatusIcon(status) {
@@ -15,7 +18,48 @@ function getStatusIcon(status) {
   return iconMap[status?.toLowerCase()] || '?';
 }
 
-export function renderGraph(containers) {
+// 서버가 계산한 좌표가 있으면 그대로 쓰고, 없으면 브라우저에서 dagre 실행
+function getLayoutOptions(positions) {
+  if (positions) {
+    return {
+      name: 'preset',
+      positions: (node) => positions[node.id()],
+      fit: true,
+      padding: 30
+    };
+  }
+  return (typeof cytoscapeDagre !== 'undefined') ? {
+    name: 'dagre',
+    rankDir: 'TB',
+    spacingFactor: 1.1,
+    nodeSep: 60,
+    edgeSep: 30,
+    rankSep: 100
+  } : {
+    name: 'breadthfirst',
+    directed: true,
+    spacingFactor: 1.1,
+    padding: 20
+  };
+}
+
+let lastPositions = null; // 마지막으로 받은 서버 레이아웃 좌표 (레이아웃 초기화용)
+
+// 토폴로지 노드 -> Cytoscape 노드 데이터
+function toNodeData(n) {
+  // 노드(host)는 조회 실패 여부로 상태 표시
+  const status = n.type === 'host' ? (n.error ? 'dead' : 'running') : n.status;
+  return {
+    ...n,
+    status: status,
+    statusIcon: n.type === 'network' ? '⇄' : getStatusIcon(status),
+    isCenter: n.type === 'host',
+    fullId: n.container_id || n.network_id || n.node_id
+  };
+}
+
+// /api/topology 응답 { nodes, edges, positions }을 그래프로 렌더링
+export function renderGraph(topology) {
   const container = document.getElementById('cy');
   
   if (!container) {
@@ -28,9 +72,12 @@ export function renderGraph(containers) {
     cy.destroy();
     cy = null;
   }
+  graphVersion = null;
+
+  const containerCount = (topology?.nodes || []).filter(n => n.type === 'container').length;
 
   // 컨테이너가 없을 때 처리
-  if (!containers || containers.length === 0) {
+  if (containerCount === 0) {
     container.innerHTML = '<div style="padding: 20px; text-align: center; color: #666;">컨테이너가 없습니다.</div>';
     return;
   }
@@ -47,46 +94,12 @@ export function renderGraph(containers) {
     cytoscape.use(cytoscapeDagre);
   }
 
-  // 노드 데이터 생성
-  const nodes = containers.map(c => ({
-    data: {
-      id: c.id,
-      label: c.name || c.id.substring(0, 12),
-      status: c.status,
-      statusIcon: getStatusIcon(c.status),
-      image: c.image,
-      ports: c.ports,
-      fullId: c.id
-    }
-  }));
+  // 노드 데이터 생성 (노드 ↔ 네트워크 ↔ 컨테이너)
+  const nodes = topology.nodes.map(n => ({ data: toNodeData(n) }));
 
-  // 엣지 데이터 생성 (같은 네트워크에 있는 컨테이너 간 연결)
-  // 실제로는 Docker 네트워크 정보를 기반으로 해야 하지만, 
-  // 여기서는 예시로 모든 컨테이너를 중앙 노드에 연결
-  const edges = [];
-  const centerNodeId = 'center';
-  
-  // 중앙 노드 추가 (옵션)
-  nodes.push({
-    data: {
-      id: centerNodeId,
-      label: 'Docker Host',
-      status: 'running',
-      statusIcon: getStatusIcon('running'),
-      isCenter: true
-    }
-  });
-
-  // 각 컨테이너를 중앙에 연결
-  containers.forEach(c => {
-    edges.push({
-      data: {
-        id: `edge-${c.id}`,
-        source: centerNodeId,
-        target: c.id
-      }
-    });
-  });
+  // 엣지 데이터 생성 (실제 Docker 네트워크 연결 기준)
+  const edges = topology.edges.map(e => ({ data: { ...e } }));
+  lastPositions = topology.positions || null;
 
   try {
     // Cytoscape 초기화
@@ -185,6 +198,16 @@ export function renderGraph(containers) {
             'text-outline-color': 'transparent'
           }
         },
+        {
+          selector: 'node[type = "network"]',
+          style: {
+            'shape': 'ellipse',
+            'min-width': '110px',
+            'min-height': '50px',
+            'border-color': '#3B82F6',
+            'background-color': '#EFF6FF'
+          }
+        },
         {
           selector: 'edge',
           style: {
@@ -225,19 +248,7 @@ export function renderGraph(containers) {
           }
         }
       ],
-    layout: (typeof cytoscapeDagre !== 'undefined') ? {
-      name: 'dagre',
-      rankDir: 'TB',
-      spacingFactor: 1.1,
-      nodeSep: 60,
-      edgeSep: 30,
-      rankSep: 100
-    } : {
-      name: 'breadthfirst',
-      directed: true,
-      spacingFactor: 1.1,
-      padding: 20
-    }
+    layout: getLayoutOptions(lastPositions)
   });
 
   // 그래프 배경을 밝은 테마로 변경
@@ -304,35 +315,84 @@ export function renderGraph(containers) {
       node.connectedEdges().addClass('selected');
       
       // 정보 표시
+      if (data.type === 'network') {
+        alert(`네트워크 ID: ${data.fullId}\n이름: ${data.label}\n드라이버: ${data.driver || 'N/A'}`);
+        return;
+      }
       const info = `
 컨테이너 ID: ${data.fullId}
 이름: ${data.label}
 상태: ${data.status}
 이미지: ${data.image}
-포트: ${data.ports || 'N/A'}
+노드: ${data.node_id}
       `.trim();
       
       alert(info);
     });
 
+    graphVersion = topology.version ?? null;
     console.log('그래프 렌더링 완료:', nodes.length, '노드,', edges.length, '엣지');
   } catch (error) {
     console.error('그래프 렌더링 오류:', error);
+    if (cy) {
+      cy.destroy();
+      cy = null;
+    }
     container.innerHTML = '<div style="padding: 20px; text-align: center; color: #f00;">그래프를 렌더링하는 중 오류가 발생했습니다. 콘솔을 확인하세요.</div>';
   }
 }
 
+// since 조회 결과를 기존 그래프에 반영 (cy.destroy 없이 변경분만 패치, 뷰포트 유지)
+// diff: { version, since, reset, nodes: {added, removed, changed}, edges: {...}, positions }
+export function patchGraph(diff) {
+  if (!cy || diff.reset) {
+    renderGraph({
+      nodes: diff.nodes.added,
+      edges: diff.edges.added,
+      positions: diff.positions,
+      version: diff.version
+    });
+    return true;
+  }
+  // 다른 버전 기준의 diff는 적용하지 않는다 (호출 측에서 전체 재조회)
+  if (diff.since !== graphVersion) return false;
+
+  let added = cy.collection();
+  cy.batch(() => {
+    // 노드를 지우면 연결된 엣지도 함께 지워진다
+    diff.edges.removed.forEach(id => cy.getElementById(id).remove());
+    diff.nodes.removed.forEach(id => cy.getElementById(id).remove());
+
+    // 변경된 요소는 데이터만 교체 (위치 유지)
+    diff.nodes.changed.forEach(n => cy.getElementById(n.id).data(toNodeData(n)));
+    diff.edges.changed.forEach(e => cy.getElementById(e.id).data({ ...e }));
+
+    diff.nodes.added.forEach(n => {
+      if (cy.getElementById(n.id).empty()) {
+        added = added.union(cy.add({ group: 'nodes', data: toNodeData(n) }));
+      }
+    });
+    diff.edges.added.forEach(e => {
+      if (cy.getElementById(e.id).empty()) {
+        cy.add({ group: 'edges', data: { ...e } });
+      }
+    });
+
+    // 새 노드만 기존 형제 노드 옆에 배치
+    placeNewNodes(cy, added, { fallbackPositions: diff.positions || {} });
+  });
+
+  graphVersion = diff.version;
+  return true;
+}
+
+export function getGraphVersion() {
+  return cy ? graphVersion : null;
+}
+
 export function resetGraphLayout() {
   if (cy) {
-    const layoutName = (typeof cytoscapeDagre !== 'undefined') ? 'dagre' : 'breadthfirst';
-    cy.layout({
-      name: layoutName,
-      rankDir: 'TB',
-      spacingFactor: 1.1,
-      nodeSep: 60,
-      edgeSep: 30,
-      rankSep: 100
-    }).run();
+    cy.layout(getLayoutOptions(lastPositions)).run();
   }
 }
 
@@ -1,4 +1,6 @@
 /** 서버 그래프 렌더링 컴포넌트 */
+import { placeNewNodes } from '../../utils/graph.js';
+
 let serverCy = null; // 서버 그래프 인스턴스
 
 // 상태 아이콘 매핑 함수
@@ -14,14 +16,9 @@ export function renderServerGraph(servers) {
     return;
   }
 
-  // 기존 그래프 제거
-  if (serverCy) {
-    serverCy.destroy();
-    serverCy = null;
-  }
-
   // 서버가 없을 때 처리
   if (!servers || servers.length === 0) {
+    destroyServerGraph();
     container.innerHTML = `
       <div class="graph-empty-state">
         <i class="fas fa-server" style="font-size: 4rem; color: #9ca3af; margin-bottom: 1.5rem;"></i>
@@ -54,6 +51,7 @@ export function renderServerGraph(servers) {
 
   // 클라이언트 서버가 없을 때 처리 (실무 패턴: 조건부 빈 상태)
   if (clientServers.length === 0) {
+    destroyServerGraph();
     container.innerHTML = `
       <div class="graph-empty-state">
         <i class="fas fa-network-wired" style="font-size: 4rem; color: #9ca3af; margin-bottom: 1.5rem;"></i>
@@ -100,6 +98,12 @@ export function renderServerGraph(servers) {
     });
   }
 
+  // 이미 그래프가 있으면 다시 만들지 않고 변경분만 반영 (노드 위치와 뷰포트 유지)
+  if (serverCy) {
+    patchServerGraph([...nodes, ...edges]);
+    return;
+  }
+
   try {
     // Cytoscape 초기화
     serverCy = cytoscape({
@@ -313,10 +317,53 @@ export function renderServerGraph(servers) {
     console.log('서버 그래프 렌더링 완료:', nodes.length, '노드,', edges.length, '엣지');
   } catch (error) {
     console.error('서버 그래프 렌더링 오류:', error);
+    destroyServerGraph();
     container.innerHTML = '<div style="padding: 20px; text-align: center; color: #f00;">그래프를 렌더링하는 중 오류가 발생했습니다. 콘솔을 확인하세요.</div>';
   }
 }
 
+function destroyServerGraph() {
+  if (serverCy) {
+    serverCy.destroy();
+    serverCy = null;
+  }
+}
+
+// 새 요소 목록과 기존 그래프를 id로 비교해 추가/삭제/데이터 변경만 적용
+function patchServerGraph(elements) {
+  const wanted = new Map(elements.map(ele => [ele.data.id, ele]));
+  let added = serverCy.collection();
+  let removed = 0;
+  let changed = 0;
+
+  serverCy.batch(() => {
+    serverCy.elements().filter(ele => !wanted.has(ele.id())).forEach(ele => {
+      ele.remove();
+      removed++;
+    });
+
+    wanted.forEach((ele, id) => {
+      const existing = serverCy.getElementById(id);
+      if (existing.empty()) {
+        added = added.union(serverCy.add(ele));
+        return;
+      }
+      const before = existing.data();
+      if (Object.keys(ele.data).some(key => before[key] !== ele.data[key])) {
+        existing.data(ele.data);
+        changed++;
+      }
+    });
+
+    // 새 클라이언트 서버만 기존 클라이언트 옆에 배치
+    placeNewNodes(serverCy, added.nodes(), { spacingX: 200, rankGap: 200 });
+  });
+
+  if (added.length || removed || changed) {
+    console.log('서버 그래프 갱신:', added.length, '추가,', removed, '삭제,', changed, '변경');
+  }
+}
+
 export function resetServerGraphLayout() {
   if (serverCy) {
     const centralNode = serverCy.nodes('[isCentral = true]');
@@ -3,6 +3,8 @@ import * as nodesAPI from '../../api/nodes.js';
 import { showToast } from '../../utils/toast.js';
 
 let currentEditingServerId = null;
+// 수정 폼을 연 시점의 서버 버전 (그 사이 다른 변경이 있으면 서버가 409로 거부)
+let currentEditingVersion = null;
 
 export function getCurrentEditingServerId() {
   return currentEditingServerId;
@@ -27,6 +29,7 @@ export function closeServerFormModal() {
   modal.style.display = 'none';
   document.getElementById('serverForm').reset();
   currentEditingServerId = null;
+  currentEditingVersion = null;
   document.getElementById('serverTestResult').style.display = 'none';
 }
 
@@ -53,6 +56,7 @@ export async function editServer(serverId) {
     const formTitle = document.getElementById('serverFormTitle');
     formTitle.innerHTML = '<i class="fas fa-server"></i> 서버 수정';
     currentEditingServerId = serverId;
+    currentEditingVersion = server.version ?? null;
     document.getElementById('serverTestResult').style.display = 'none';
     modal.style.display = 'flex';
   } catch (error) {
@@ -81,7 +85,7 @@ export async function saveServer(event, onSuccess) {
     let result;
     if (currentEditingServerId) {
       // 수정
-      result = await nodesAPI.updateNode(currentEditingServerId, formData);
+      result = await nodesAPI.updateNode(currentEditingServerId, { ...formData, version: currentEditingVersion });
     } else {
       // 추가
       result = await nodesAPI.addNode(formData);
@@ -15,9 +15,31 @@ export function setServerStateSetter(setter) {
   setCurrentServers = setter;
 }
 
+// 상태 목록 diff 조회 상태 (마지막 응답 버전과 목록)
+let statusVersion = 0;
+let statusList = [];
+
+// 마지막 버전 이후 변경분만 받아 목록에 반영 (처음이거나 서버가 버전을 모르면 전체)
+async function fetchServerStatuses() {
+  const diff = await nodesAPI.getNodesStatusChanges(statusVersion);
+  if (diff.reset) {
+    statusList = diff.added;
+  } else {
+    const removed = new Set(diff.removed);
+    const changed = new Map(diff.changed.map(s => [s.id, s]));
+    statusList = statusList
+      .filter(s => !removed.has(s.id))
+      .map(s => changed.get(s.id) || s)
+      .concat(diff.added);
+  }
+  statusVersion = diff.version;
+  // 이벤트 처리에서 항목을 직접 고치므로 사본을 넘긴다
+  return statusList.map(s => ({ ...s }));
+}
+
 export async function loadServerList() {
   try {
-    const servers = await nodesAPI.getNodesStatus();
+    const servers = await fetchServerStatuses();
     
     // 응답이 배열인지 확인
     if (!Array.isArray(servers)) {
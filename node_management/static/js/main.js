@@ -3,7 +3,9 @@ import { showToast as _showToast } from './utils/toast.js';
 import { showLoading as _showLoading, hideLoading as _hideLoading } from './utils/loading.js';
 import * as nodesAPI from './api/nodes.js';
 import * as containersAPI from './api/containers.js';
-import { renderGraph, resetGraphLayout, fitGraph } from './components/graph/containerGraph.js';
+import * as topologyAPI from './api/topology.js';
+import { subscribeEvents } from './api/stream.js';
+import { renderGraph, patchGraph, getGraphVersion, resetGraphLayout, fitGraph } from './components/graph/containerGraph.js';
 import { renderServerGraph, resetServerGraphLayout, fitServerGraph } from './components/graph/serverGraph.js';
 import { showServerDetailsPanel, closeServerDetailsPanel, setCurrentServersGetter } from './components/server/serverDetails.js';
 import { loadServerList, setServerStateGetter, setServerStateSetter } from './components/server/serverList.js';
@@ -122,7 +124,7 @@ async function reloadContainers() {
 
     // 그래프 뷰가 활성화되어 있으면 그래프도 업데이트
     if (document.getElementById('graphView').style.display !== 'none') {
-      renderGraph(data);
+      reloadTopology(nodeId);
     }
 
     const now = new Date();
@@ -143,6 +145,28 @@ async function reloadContainers() {
   }
 }
 
+let topologyNodeId = null; // 현재 그래프에 표시 중인 노드
+let topologyQueue = Promise.resolve(); // 갱신 요청을 순서대로 처리 (같은 버전 diff 중복 적용 방지)
+
+// 네트워크 토폴로지 그래프 갱신
+// 같은 노드의 그래프가 이미 있으면 since 버전 이후 변경분만 받아 제자리에서 패치한다
+function reloadTopology(nodeId) {
+  topologyQueue = topologyQueue.then(async () => {
+    try {
+      const version = getGraphVersion();
+      if (version !== null && topologyNodeId === nodeId) {
+        const diff = await topologyAPI.getTopologyChanges(nodeId, version);
+        if (patchGraph(diff)) return;
+      }
+      renderGraph(await topologyAPI.getTopology(nodeId, true));
+      topologyNodeId = nodeId;
+    } catch (e) {
+      console.error('토폴로지 조회 오류:', e);
+    }
+  });
+  return topologyQueue;
+}
+
 async function doAction(action, nodeId, containerId) {
   const actionNames = {
     'start': '시작',
@@ -184,6 +208,7 @@ async function doAction(action, nodeId, containerId) {
 window.switchView = switchView;
 window.loadServerList = loadServerList;
 window.renderGraph = renderGraph;
+window.patchGraph = patchGraph;
 window.resetGraphLayout = resetGraphLayout;
 window.fitGraph = fitGraph;
 window.renderServerGraph = renderServerGraph;
@@ -192,6 +217,7 @@ window.showServerDetailsPanel = showServerDetailsPanel;
 window.closeServerDetailsPanel = closeServerDetailsPanel;
 window.fitServerGraph = fitServerGraph;
 window.reloadContainers = reloadContainers;
+window.reloadTopology = reloadTopology;
 window.doAction = doAction;
 window.openServerManager = openServerManager;
 window.showAddServerForm = showAddServerForm;
@@ -212,8 +238,114 @@ function getCurrentServers() {
 // 페이지 로드 시 기본 뷰를 서버 그래프로 설정
 window.addEventListener("load", function() {
   switchView('serverGraph');
+  startEventStream();
 });
 
+// ============================================
+// 실시간 이벤트 반영 (SSE)
+// ============================================
+
+// 컨테이너 이벤트 -> 표시 상태
+const CONTAINER_ACTION_STATUS = {
+  'start': 'running',
+  'restart': 'running',
+  'unpause': 'running',
+  'pause': 'paused',
+  'stop': 'exited',
+  'die': 'exited',
+  'kill': 'exited'
+};
+
+let reloadTimer = null;
+
+// 이벤트가 몰려도 목록 재조회는 한 번만
+function scheduleReloadContainers() {
+  if (reloadTimer) return;
+  reloadTimer = setTimeout(() => {
+    reloadTimer = null;
+    reloadContainers();
+  }, 500);
+}
+
+function isVisible(elementId) {
+  const el = document.getElementById(elementId);
+  return el && el.style.display !== 'none';
+}
+
+function refreshContainerViews(nodeId) {
+  renderContainerCards(currentContainers, nodeId);
+  if (isVisible('graphView')) {
+    reloadTopology(nodeId);
+  }
+}
+
+// 컨테이너 목록 화면이 있을 때만 컨테이너 이벤트 반영
+function hasContainerView() {
+  return !!document.getElementById('containerGrid');
+}
+
+function handleContainerEvent(event) {
+  const nodeSelect = document.getElementById('nodeSelect');
+  if (!hasContainerView() || !nodeSelect || nodeSelect.value !== event.node_id) return;
+
+  const target = currentContainers.find(c => c.id === event.id);
+  const status = CONTAINER_ACTION_STATUS[event.action];
+
+  if (target && status) {
+    // 상태만 바뀐 경우 목록을 다시 받지 않고 제자리에서 갱신
+    target.status = status;
+    refreshContainerViews(event.node_id);
+  } else if (!target || event.action === 'destroy' || event.action === 'rename') {
+    // 생성/삭제 등 목록 구성이 바뀐 경우에만 재조회
+    scheduleReloadContainers();
+  }
+}
+
+// 네트워크 연결/해제는 토폴로지 그래프에만 반영
+function handleNetworkEvent(event) {
+  const nodeSelect = document.getElementById('nodeSelect');
+  if (!isVisible('graphView') || !nodeSelect || nodeSelect.value !== event.node_id) return;
+  reloadTopology(event.node_id);
+}
+
+function handleNodeEvent(event) {
+  const server = currentServers.find(s => s.id === event.node_id);
+  if (!server) return;
+
+  server.status = event.status;
+  if (event.error) {
+    server.error = event.error;
+  } else {
+    delete server.error;
+  }
+
+  if (isVisible('serverGraphView')) {
+    renderServerGraph(currentServers);
+  }
+  if (isVisible('serverView')) {
+    loadServerList();
+  }
+}
+
+function handleResync(event) {
+  const nodeSelect = document.getElementById('nodeSelect');
+  if (hasContainerView() && (!event.node_id || (nodeSelect && nodeSelect.value === event.node_id))) {
+    scheduleReloadContainers();
+  }
+  if (!event.node_id && (isVisible('serverView') || isVisible('serverGraphView'))) {
+    loadServerList();
+  }
+}
+
+function startEventStream() {
+  subscribeEvents({
+    container: handleContainerEvent,
+    network: handleNetworkEvent,
+    node: handleNodeEvent,
+    resync: handleResync
+  });
+}
+
 // ============================================
 // 서버 관리 함수
 // ============================================
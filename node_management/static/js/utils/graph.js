@@ -0,0 +1,33 @@
+/** Cytoscape 그래프 공통 유틸리티 */
+
+// 새로 추가된 노드만 배치 (기존 노드 위치와 뷰포트는 유지)
+// 부모(들어오는 엣지의 출발 노드) 아래의 형제 노드 옆에 차례로 놓고,
+// 부모가 없는 노드는 fallbackPositions 좌표나 그래프 오른쪽에 놓는다.
+export function placeNewNodes(cy, nodes, options = {}) {
+  const spacingX = options.spacingX || 150;
+  const rankGap = options.rankGap || 180;
+  const fallbackPositions = options.fallbackPositions || {};
+  const pending = new Set(nodes.map(n => n.id()));
+
+  nodes.forEach(node => {
+    const parent = node.incomers().nodes().filter(p => !pending.has(p.id()))[0];
+    if (parent) {
+      const siblings = parent.outgoers().nodes().filter(s => s.id() !== node.id() && !pending.has(s.id()));
+      if (siblings.length > 0) {
+        // 가장 아래 줄의 오른쪽 끝에 이어서 배치
+        const bottom = Math.max(...siblings.map(s => s.position('y')));
+        const right = Math.max(...siblings.filter(s => s.position('y') === bottom).map(s => s.position('x')));
+        node.position({ x: right + spacingX, y: bottom });
+      } else {
+        node.position({ x: parent.position('x'), y: parent.position('y') + rankGap });
+      }
+    } else if (fallbackPositions[node.id()]) {
+      node.position(fallbackPositions[node.id()]);
+    } else {
+      const placed = cy.nodes().filter(n => !pending.has(n.id()));
+      const box = placed.length > 0 ? placed.boundingBox() : { x2: 0, y1: 0 };
+      node.position({ x: box.x2 + spacingX, y: box.y1 });
+    }
+    pending.delete(node.id());
+  });
+}